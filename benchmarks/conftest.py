@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from habitat.config.default import get_config
+from habitat.sims.mock.mock_simulator import (  # noqa: F401
+    make_mock_dataset,
+)
+
+CFG_MOCK = "configs/test/habitat_mock_sim_pointnav.yaml"
+
+
+def make_mock_config(resolution: int):
+    r"""Config of the mock simulator with square visual observations of
+    the given resolution.
+    """
+    config = get_config(CFG_MOCK)
+    config.defrost()
+    for sensor in config.SIMULATOR.AGENT_0.SENSORS:
+        getattr(config.SIMULATOR, sensor).HEIGHT = resolution
+        getattr(config.SIMULATOR, sensor).WIDTH = resolution
+    config.freeze()
+    return config
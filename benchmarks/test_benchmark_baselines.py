@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import itertools
+
+import pytest
+
+import habitat
+
+pytest.importorskip("pytest_benchmark")
+torch = pytest.importorskip("torch")
+
+from conftest import make_mock_config, make_mock_dataset  # noqa: E402
+
+from habitat_baselines.common.rollout_storage import (  # noqa: E402
+    RolloutStorage,
+)
+from habitat_baselines.common.tensor_dict import TensorDict  # noqa: E402
+from habitat_baselines.config.default import (  # noqa: E402
+    get_config as get_baselines_config,
+)
+from habitat_baselines.rl.ppo import PPO, PointNavBaselinePolicy  # noqa: E402
+from habitat_baselines.utils.common import (  # noqa: E402
+    ObservationBatchingCache,
+    batch_obs,
+)
+
+CFG_PPO = "habitat_baselines/config/test/ppo_pointnav_test.yaml"
+RESOLUTION = 64
+NUM_STEPS = 16
+
+
+@pytest.fixture(scope="module")
+def mock_env_data():
+    r"""Observation space, action space and observations of the mock
+    environment, shared by the benchmarks of this module.
+    """
+    config = make_mock_config(RESOLUTION)
+    dataset = make_mock_dataset(config)
+    with habitat.Env(config=config, dataset=dataset) as env:
+        observations = [env.reset()]
+        for _ in range(NUM_STEPS - 1):
+            observations.append(env.step(env.action_space.sample()))
+            if env.episode_over:
+                observations.append(env.reset())
+        return env.observation_space, env.action_space, observations
+
+
+def _make_rollouts(mock_env_data, num_envs):
+    observation_space, action_space, observations = mock_env_data
+    ppo_config = get_baselines_config(CFG_PPO).RL.PPO
+    rollouts = RolloutStorage(
+        NUM_STEPS,
+        num_envs,
+        observation_space,
+        action_space,
+        ppo_config.hidden_size,
+    )
+    rollouts.buffers["observations"][0] = batch_obs(
+        [observations[0]] * num_envs
+    )
+    return rollouts
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+@pytest.mark.parametrize("num_envs", [1, 4, 16])
+def test_batch_obs(benchmark, mock_env_data, num_envs, use_cache):
+    _, _, observations = mock_env_data
+    batch = list(itertools.islice(itertools.cycle(observations), num_envs))
+    cache = ObservationBatchingCache() if use_cache else None
+    benchmark(batch_obs, batch, device=torch.device("cpu"), cache=cache)
+
+
+@pytest.mark.parametrize("num_envs", [1, 4, 16])
+def test_rollout_storage_insert(benchmark, mock_env_data, num_envs):
+    _, _, observations = mock_env_data
+    rollouts = _make_rollouts(mock_env_data, num_envs)
+    step_batch = batch_obs([observations[-1]] * num_envs)
+    hidden_states = torch.zeros_like(
+        rollouts.buffers["recurrent_hidden_states"][0]
+    )
+
+    def insert():
+        if rollouts.current_rollout_step_idx == NUM_STEPS:
+            rollouts.after_update()
+        rollouts.insert(
+            next_observations=step_batch,
+            next_recurrent_hidden_states=hidden_states,
+            actions=torch.ones(num_envs, 1, dtype=torch.long),
+            action_log_probs=torch.zeros(num_envs, 1),
+            value_preds=torch.zeros(num_envs, 1),
+            rewards=torch.ones(num_envs, 1),
+            next_masks=torch.ones(num_envs, 1, dtype=torch.bool),
+        )
+        rollouts.advance_rollout()
+
+    benchmark(insert)
+
+
+@pytest.mark.parametrize("use_view", [False, True])
+@pytest.mark.parametrize("num_envs", [1, 4, 16])
+def test_tensor_dict_set(benchmark, mock_env_data, num_envs, use_view):
+    _, _, observations = mock_env_data
+    rollouts = _make_rollouts(mock_env_data, num_envs)
+    step = TensorDict(
+        observations=batch_obs([observations[-1]] * num_envs),
+        recurrent_hidden_states=torch.zeros_like(
+            rollouts.buffers["recurrent_hidden_states"][0]
+        ),
+        masks=torch.ones(num_envs, 1, dtype=torch.bool),
+    )
+    index = (1, slice(0, num_envs))
+    if use_view:
+        benchmark(rollouts.buffers.view_at(index).set, step)
+    else:
+        benchmark(rollouts.buffers.set, index, step, strict=False)
+
+
+@pytest.mark.parametrize("num_envs", [1, 4, 16])
+def test_ppo_update(benchmark, mock_env_data, num_envs):
+    observation_space, action_space, _ = mock_env_data
+    config = get_baselines_config(CFG_PPO)
+    ppo_config = config.RL.PPO
+    actor_critic = PointNavBaselinePolicy.from_config(
+        config, observation_space, action_space
+    )
+    agent = PPO(
+        actor_critic=actor_critic,
+        clip_param=ppo_config.clip_param,
+        ppo_epoch=ppo_config.ppo_epoch,
+        num_mini_batch=ppo_config.num_mini_batch,
+        value_loss_coef=ppo_config.value_loss_coef,
+        entropy_coef=ppo_config.entropy_coef,
+        lr=ppo_config.lr,
+        eps=ppo_config.eps,
+        max_grad_norm=ppo_config.max_grad_norm,
+    )
+    rollouts = _make_rollouts(mock_env_data, num_envs)
+    rollouts.current_rollout_step_idxs = [NUM_STEPS]
+    rollouts.buffers["masks"].fill_(True)
+    rollouts.buffers["rewards"].normal_()
+    rollouts.compute_returns(
+        torch.zeros(num_envs, 1),
+        ppo_config.use_gae,
+        ppo_config.gamma,
+        ppo_config.tau,
+    )
+
+    benchmark.pedantic(agent.update, args=(rollouts,), rounds=3)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import itertools
+
+import pytest
+
+import habitat
+from habitat.sims.mock.mock_simulator import MockSimActions
+
+pytest.importorskip("pytest_benchmark")
+
+from conftest import make_mock_config, make_mock_dataset  # noqa: E402
+
+# Never STOP, so that episodes only end after MAX_EPISODE_STEPS
+ACTIONS = [
+    MockSimActions.MOVE_FORWARD,
+    MockSimActions.TURN_LEFT,
+    MockSimActions.TURN_RIGHT,
+]
+
+
+@pytest.mark.parametrize("resolution", [64, 256])
+def test_env_step(benchmark, resolution):
+    config = make_mock_config(resolution)
+    dataset = make_mock_dataset(config)
+    actions = itertools.cycle(ACTIONS)
+    with habitat.Env(config=config, dataset=dataset) as env:
+        env.reset()
+
+        def step():
+            if env.episode_over:
+                env.reset()
+            env.step(next(actions))
+
+        benchmark(step)
+
+
+@pytest.mark.parametrize("resolution", [64, 256])
+def test_env_reset(benchmark, resolution):
+    config = make_mock_config(resolution)
+    dataset = make_mock_dataset(config)
+    with habitat.Env(config=config, dataset=dataset) as env:
+        benchmark(env.reset)
+
+
+@pytest.mark.parametrize("num_envs", [1, 4, 8])
+@pytest.mark.parametrize(
+    "vector_env_cls", [habitat.VectorEnv, habitat.ThreadedVectorEnv]
+)
+def test_vector_env_step(benchmark, vector_env_cls, num_envs):
+    config = make_mock_config(128)
+    dataset = make_mock_dataset(config)
+    actions = itertools.cycle(ACTIONS)
+    with vector_env_cls(
+        env_fn_args=[(config, dataset, rank) for rank in range(num_envs)]
+    ) as envs:
+        envs.reset()
+        benchmark(lambda: envs.step([next(actions)] * num_envs))
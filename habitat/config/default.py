@@ -544,6 +544,11 @@ _C.SIMULATOR.ROBOT_URDF = "data/robots/hab_fetch/robots/hab_fetch.urdf"
 _C.SIMULATOR.ROBOT_TYPE = "FetchRobot"
 _C.SIMULATOR.EE_LINK_NAME = None
 _C.SIMULATOR.LOAD_OBJS = False
+# Number of NavMeshes of rearrange scene layouts kept in memory
+_C.SIMULATOR.NAVMESH_CACHE_SIZE = 8
+# Directory of the NavMeshes of rearrange scene layouts shared by the workers,
+# not used if empty
+_C.SIMULATOR.NAVMESH_CACHE_DIR = ""
 # Rearrange Agent Grasping
 _C.SIMULATOR.HOLD_THRESH = 0.09
 _C.SIMULATOR.GRASP_IMPULSE = 1000.0
@@ -701,6 +706,15 @@ _C.SIMULATOR.HABITAT_SIM_V0.PHYSICS_CONFIG_FILE = (
 # Possibly unstable optimization for extra performance with concurrent rendering
 _C.SIMULATOR.HABITAT_SIM_V0.LEAVE_CONTEXT_WITH_BACKGROUND_RENDERER = False
 # -----------------------------------------------------------------------------
+# SIMULATOR MOCK_SIM
+# -----------------------------------------------------------------------------
+# Stand-in for the simulator with synthetic observations, used to benchmark
+# the code around the simulator. Its sensor types are MockRGBSensor and
+# MockDepthSensor
+_C.SIMULATOR.MOCK_SIM = CN()
+# Side of the obstacle-free square floor, in metres
+_C.SIMULATOR.MOCK_SIM.SCENE_SIZE = 20.0
+# -----------------------------------------------------------------------------
 # PYROBOT
 # -----------------------------------------------------------------------------
 _C.PYROBOT = CN()
@@ -12,7 +12,7 @@ import copy
 import json
 import os
 import random
-from itertools import groupby
+from itertools import chain, groupby
 from typing import (
     Any,
     Callable,
@@ -227,6 +227,55 @@ class Dataset(Generic[T]):
         new_dataset.episodes = new_episodes
         return new_dataset
 
+    @staticmethod
+    def _get_split_lengths(
+        num_episodes: int,
+        num_splits: int,
+        episodes_per_split: Optional[int] = None,
+        allow_uneven_splits: bool = False,
+    ) -> List[int]:
+        if num_episodes < num_splits:
+            raise ValueError(
+                "Not enough episodes to create those many splits."
+            )
+
+        if episodes_per_split is not None:
+            if allow_uneven_splits:
+                raise ValueError(
+                    "You probably don't want to specify allow_uneven_splits"
+                    " and episodes_per_split."
+                )
+
+            if num_splits * episodes_per_split > num_episodes:
+                raise ValueError(
+                    "Not enough episodes to create those many splits."
+                )
+
+        if episodes_per_split is not None:
+            stride = episodes_per_split
+        else:
+            stride = num_episodes // num_splits
+        split_lengths = [stride] * num_splits
+
+        if allow_uneven_splits:
+            episodes_left = num_episodes - stride * num_splits
+            split_lengths[:episodes_left] = [stride + 1] * episodes_left
+            assert sum(split_lengths) == num_episodes
+
+        return split_lengths
+
+    @staticmethod
+    def _collate_scene_ids(episodes: List[T]) -> List[T]:
+        r"""Groups the episodes by scene id, scenes are kept in the order of
+        their first episode and episodes in their original order.
+        """
+        scene_episodes: Dict[str, List[T]] = {}
+        for episode in episodes:
+            scene_episodes.setdefault(episode.scene_id, []).append(episode)
+        collated_episodes: List[T] = []
+        list(map(collated_episodes.extend, scene_episodes.values()))
+        return collated_episodes
+
     def get_splits(
         self,
         num_splits: int,
@@ -262,68 +311,165 @@ class Dataset(Generic[T]):
             episodes.
 
         All splits will have the same number of episodes, but no episodes will
-        be duplicated.
+        be duplicated. When a single split is needed, e.g. by one of many
+        distributed workers, prefer :ref:`get_split`.
         """
-        if self.num_episodes < num_splits:
-            raise ValueError(
-                "Not enough episodes to create those many splits."
-            )
-
-        if episodes_per_split is not None:
-            if allow_uneven_splits:
-                raise ValueError(
-                    "You probably don't want to specify allow_uneven_splits"
-                    " and episodes_per_split."
-                )
-
-            if num_splits * episodes_per_split > self.num_episodes:
-                raise ValueError(
-                    "Not enough episodes to create those many splits."
-                )
-
-        new_datasets = []
-
-        if episodes_per_split is not None:
-            stride = episodes_per_split
-        else:
-            stride = self.num_episodes // num_splits
-        split_lengths = [stride] * num_splits
-
-        if allow_uneven_splits:
-            episodes_left = self.num_episodes - stride * num_splits
-            split_lengths[:episodes_left] = [stride + 1] * episodes_left
-            assert sum(split_lengths) == self.num_episodes
-
+        split_lengths = self._get_split_lengths(
+            self.num_episodes,
+            num_splits,
+            episodes_per_split,
+            allow_uneven_splits,
+        )
         num_episodes = sum(split_lengths)
 
         rand_items = np.random.choice(
             self.num_episodes, num_episodes, replace=False
-        ).tolist()
+        )
+        episodes = [self.episodes[ind] for ind in rand_items.tolist()]
         if collate_scene_ids:
-            scene_ids: Dict[str, List[int]] = {}
-            for rand_ind in rand_items:
-                scene = self.episodes[rand_ind].scene_id
-                if scene not in scene_ids:
-                    scene_ids[scene] = []
-                scene_ids[scene].append(rand_ind)
-            rand_items = []
-            list(map(rand_items.extend, scene_ids.values()))
-        ep_ind = 0
-        new_episodes = []
-        for nn in range(num_splits):
+            episodes = self._collate_scene_ids(episodes)
+
+        new_datasets = []
+        split_start = 0
+        for split_length in split_lengths:
             new_dataset = copy.copy(self)  # Creates a shallow copy
-            new_dataset.episodes = []
-            new_datasets.append(new_dataset)
-            for _ii in range(split_lengths[nn]):
-                new_dataset.episodes.append(self.episodes[rand_items[ep_ind]])
-                ep_ind += 1
+            new_dataset.episodes = episodes[
+                split_start : split_start + split_length
+            ]
+            split_start += split_length
             if sort_by_episode_id:
                 new_dataset.episodes.sort(key=lambda ep: ep.episode_id)
-            new_episodes.extend(new_dataset.episodes)
+            new_datasets.append(new_dataset)
         if remove_unused_episodes:
-            self.episodes = new_episodes
+            self.episodes = list(
+                chain.from_iterable(
+                    new_dataset.episodes for new_dataset in new_datasets
+                )
+            )
         return new_datasets
 
+    @classmethod
+    def get_split_episode_indices(
+        cls,
+        num_episodes: int,
+        num_splits: int,
+        split_index: int,
+        seed: int,
+        episodes_per_split: Optional[int] = None,
+        allow_uneven_splits: bool = False,
+    ) -> ndarray:
+        r"""Returns the indices of the episodes of one split of a dataset.
+
+        :param num_episodes: number of episodes in the dataset.
+        :param num_splits: the number of splits.
+        :param split_index: index of the split, e.g. the rank of a
+            distributed worker.
+        :param seed: seed of the shuffling of the episodes, must be the same
+            for all the splits.
+        :param episodes_per_split: see :ref:`get_splits`.
+        :param allow_uneven_splits: see :ref:`get_splits`.
+        :return: indices of the episodes of the split, in random order.
+
+        Only depends on its arguments, so every worker computes its own split
+        without building the others, and the splits computed with the same
+        :p:`seed` never share an episode.
+        """
+        if not 0 <= split_index < num_splits:
+            raise ValueError(
+                f"Invalid split index {split_index} for {num_splits} splits."
+            )
+
+        split_lengths = cls._get_split_lengths(
+            num_episodes, num_splits, episodes_per_split, allow_uneven_splits
+        )
+        split_start = sum(split_lengths[:split_index])
+        permutation = np.random.RandomState(seed).permutation(num_episodes)
+        return permutation[
+            split_start : split_start + split_lengths[split_index]
+        ]
+
+    def get_split(
+        self,
+        num_splits: int,
+        split_index: int,
+        seed: int,
+        episodes_per_split: Optional[int] = None,
+        collate_scene_ids: bool = True,
+        sort_by_episode_id: bool = False,
+        allow_uneven_splits: bool = False,
+    ) -> "Dataset":
+        r"""Returns a new dataset with the episodes of one split of the
+        original dataset, see :ref:`get_split_episode_indices`.
+
+        :param num_splits: the number of splits.
+        :param split_index: index of the split to return.
+        :param seed: seed of the shuffling of the episodes, must be the same
+            for all the splits.
+        :param episodes_per_split: see :ref:`get_splits`.
+        :param collate_scene_ids: see :ref:`get_splits`, only the episodes of
+            the split are collated.
+        :param sort_by_episode_id: see :ref:`get_splits`.
+        :param allow_uneven_splits: see :ref:`get_splits`.
+        :return: the new dataset.
+
+        Unlike :ref:`get_splits`, the other splits are not built and the
+        global random state is not used. To avoid loading the whole dataset
+        on every worker, datasets with separate content files per scene can
+        instead be split by scene with :ref:`get_scene_split`.
+        """
+        indices = self.get_split_episode_indices(
+            self.num_episodes,
+            num_splits,
+            split_index,
+            seed,
+            episodes_per_split,
+            allow_uneven_splits,
+        )
+        episodes = [self.episodes[ind] for ind in indices.tolist()]
+        if collate_scene_ids:
+            episodes = self._collate_scene_ids(episodes)
+        if sort_by_episode_id:
+            episodes.sort(key=lambda ep: ep.episode_id)
+
+        new_dataset = copy.copy(self)  # Creates a shallow copy
+        new_dataset.episodes = episodes
+        return new_dataset
+
+    @staticmethod
+    def get_scene_split(
+        scenes: Sequence[str], num_splits: int, split_index: int, seed: int
+    ) -> List[str]:
+        r"""Returns the scenes of one split of a list of scenes.
+
+        :param scenes: names of the scenes to split, e.g. from
+            :ref:`get_scenes_to_load`.
+        :param num_splits: the number of splits.
+        :param split_index: index of the split to return.
+        :param seed: seed of the shuffling of the scenes, must be the same for
+            all the splits.
+        :return: the scenes of the split.
+
+        Scenes are shuffled with :p:`seed` then dealt to the splits in turn,
+        the order of :p:`scenes` does not matter. Setting the
+        :py:`CONTENT_SCENES` of a dataset with separate content files per
+        scene to the split only loads the episodes of its scenes.
+        """
+        if len(scenes) < num_splits:
+            raise ValueError("Not enough scenes to create those many splits.")
+        if not 0 <= split_index < num_splits:
+            raise ValueError(
+                f"Invalid split index {split_index} for {num_splits} splits."
+            )
+
+        sorted_scenes = sorted(scenes)
+        permutation = np.random.RandomState(seed).permutation(
+            len(sorted_scenes)
+        )
+        return [
+            sorted_scenes[ind]
+            for ind in permutation[split_index::num_splits].tolist()
+        ]
+
 
 class EpisodeIterator(Iterator[T]):
     r"""Episode Iterator class that gives options for how a list of episodes
@@ -9,10 +9,21 @@ considered  as a target or source location. Used to filter isolated points
 that aren't part of a floor.
 """
 
-from typing import Dict, Generator, List, Optional, Sequence, Tuple, Union
+import multiprocessing
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 
+from habitat.config import Config
 from habitat.core.simulator import ShortestPathPoint
 from habitat.datasets.utils import get_action_shortest_path
 from habitat.tasks.nav.nav import NavigationEpisode, NavigationGoal
@@ -188,3 +199,183 @@ def generate_pointnav_episode(
 
             episode_count += 1
             yield episode
+
+
+def _sample_navigable_points(
+    sim: "HabitatSim", num_points: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    r"""Samples a batch of navigable points and filters out the ones on
+    islands smaller than :ref:`ISLAND_RADIUS_LIMIT`.
+
+    :return: array of navigable points of shape :py:`(N, 3)` and a boolean
+        mask of valid points of shape :py:`(N,)`.
+    """
+    points = np.array(
+        [sim.sample_navigable_point() for _ in range(num_points)],
+        dtype=np.float32,
+    )
+    valid = np.array(
+        [sim.island_radius(point) >= ISLAND_RADIUS_LIMIT for point in points],
+        dtype=bool,
+    )
+    return points, valid
+
+
+def generate_pointnav_episode_batched(
+    sim: "HabitatSim",
+    num_episodes: int = -1,
+    is_gen_shortest_path: bool = True,
+    shortest_path_success_distance: float = 0.2,
+    shortest_path_max_steps: int = 500,
+    closest_dist_limit: float = 1,
+    furthest_dist_limit: float = 30,
+    geodesic_to_euclid_min_ratio: float = 1.1,
+    number_retries_per_target: int = 10,
+    batch_size: int = 256,
+) -> Generator[NavigationEpisode, None, None]:
+    r"""Batched version of :ref:`generate_pointnav_episode` that applies the
+    same episode acceptance criteria.
+
+    Navigable points are sampled :p:`batch_size` at a time and the island
+    radius of every point is queried once. Each valid point is then used as a
+    target and the other points of the batch as source candidates, which are
+    cheaply prefiltered by height difference and Euclidean distance
+    (a lower bound of the geodesic distance) before any geodesic distance is
+    computed. Up to :p:`number_retries_per_target` surviving sources, drawn
+    at random, are checked with geodesic queries per target.
+
+    :param batch_size: number of navigable points sampled at once.
+
+    See :ref:`generate_pointnav_episode` for the other parameters.
+    """
+    episode_count = 0
+    while episode_count < num_episodes or num_episodes < 0:
+        points, valid = _sample_navigable_points(sim, batch_size)
+        points = points[valid]
+        if len(points) < 2:
+            continue
+
+        # pairwise prefilter, [target, source]
+        deltas = points[None, :, :] - points[:, None, :]
+        euclid_dists = np.linalg.norm(deltas, axis=-1)
+        candidates = (
+            (np.abs(deltas[..., 1]) <= 0.5)
+            & (euclid_dists > 0)
+            & (euclid_dists <= furthest_dist_limit)
+        )
+
+        for target_idx, target in enumerate(points):
+            source_indices = np.random.permutation(
+                np.nonzero(candidates[target_idx])[0]
+            )[:number_retries_per_target]
+            target_position = target.tolist()
+            for source_idx in source_indices:
+                source_position = points[source_idx].tolist()
+                d_separation = sim.geodesic_distance(
+                    source_position, [target_position]
+                )
+                if d_separation == np.inf or not (
+                    closest_dist_limit <= d_separation <= furthest_dist_limit
+                ):
+                    continue
+                distances_ratio = (
+                    d_separation / euclid_dists[target_idx, source_idx]
+                )
+                if distances_ratio < geodesic_to_euclid_min_ratio and (
+                    np.random.rand()
+                    > _ratio_sample_rate(
+                        distances_ratio, geodesic_to_euclid_min_ratio
+                    )
+                ):
+                    continue
+                break
+            else:
+                continue
+
+            angle = np.random.uniform(0, 2 * np.pi)
+            source_rotation = [0.0, np.sin(angle / 2), 0, np.cos(angle / 2)]
+
+            shortest_paths = None
+            if is_gen_shortest_path:
+                try:
+                    shortest_paths = [
+                        get_action_shortest_path(
+                            sim,
+                            source_position=source_position,
+                            source_rotation=source_rotation,
+                            goal_position=target_position,
+                            success_distance=shortest_path_success_distance,
+                            max_episode_steps=shortest_path_max_steps,
+                        )
+                    ]
+                # Throws an error when it can't find a path
+                except GreedyFollowerError:
+                    continue
+
+            episode = _create_episode(
+                episode_id=episode_count,
+                scene_id=sim.habitat_config.SCENE,
+                start_position=source_position,
+                start_rotation=source_rotation,
+                target_position=target_position,
+                shortest_paths=shortest_paths,
+                radius=shortest_path_success_distance,
+                info={"geodesic_distance": d_separation},
+            )
+
+            episode_count += 1
+            yield episode
+            if 0 <= num_episodes <= episode_count:
+                return
+
+
+def _generate_scene_episodes(
+    args: Tuple[Config, str, int, int, Dict[str, Any]]
+) -> Tuple[str, List[NavigationEpisode]]:
+    sim_config, scene, num_episodes, seed, generator_kwargs = args
+    from habitat.sims import make_sim
+
+    sim_config = sim_config.clone()
+    sim_config.defrost()
+    sim_config.SCENE = scene
+    sim_config.freeze()
+
+    np.random.seed(seed)
+    with make_sim(id_sim=sim_config.TYPE, config=sim_config) as sim:
+        sim.seed(seed)
+        episodes = list(
+            generate_pointnav_episode_batched(
+                sim, num_episodes, **generator_kwargs
+            )
+        )
+    return scene, episodes
+
+
+def generate_pointnav_episodes_parallel(
+    sim_config: Config,
+    scenes: List[str],
+    num_episodes_per_scene: int,
+    num_processes: int = 8,
+    seed: int = 0,
+    **generator_kwargs: Any,
+) -> Generator[Tuple[str, List[NavigationEpisode]], None, None]:
+    r"""Generates PointGoal navigation episodes for many scenes in parallel
+    with a process pool, one simulator per scene.
+
+    :param sim_config: simulator config, :py:`SCENE` is overwritten for each
+        scene. Sensors can be removed for faster generation.
+    :param scenes: scene paths to generate episodes for.
+    :param num_episodes_per_scene: number of episodes generated per scene.
+    :param num_processes: number of worker processes.
+    :param seed: base seed, scene :py:`i` is generated with seed
+        :py:`seed + i`.
+    :param generator_kwargs: forwarded to
+        :ref:`generate_pointnav_episode_batched`.
+    :return: generator of :py:`(scene, episodes)` tuples in completion order.
+    """
+    tasks = [
+        (sim_config, scene, num_episodes_per_scene, seed + i, generator_kwargs)
+        for i, scene in enumerate(scenes)
+    ]
+    with multiprocessing.Pool(num_processes) as pool:
+        yield from pool.imap_unordered(_generate_scene_episodes, tasks)
@@ -22,6 +22,7 @@ from habitat.datasets.rearrange.rearrange_dataset import (
     RearrangeEpisode,
 )
 from habitat.datasets.rearrange.receptacle import (
+    ReceptacleIndex,
     find_receptacles,
     get_all_scenedataset_receptacles,
 )
@@ -79,6 +80,11 @@ class RearrangeEpisodeGenerator:
         ] = []
         self.num_ep_generated = 0
 
+        # persistent receptacle caches for re-use across episodes in the same scene
+        # {scene handle -> ReceptacleIndex}
+        self._receptacle_indices: Dict[str, ReceptacleIndex] = {}
+        self._receptacle_index: Optional[ReceptacleIndex] = None
+
     def _get_resource_sets(self) -> None:
         """
         Extracts and validates scene, object, and receptacle sets from the config and fills internal datastructures for later reference.
@@ -207,6 +213,7 @@ class RearrangeEpisodeGenerator:
                     ),
                     obj_sampler_info["params"]["orientation_sampling"],
                     obj_sampler_info["params"].get("sample_region_ratio", 1.0),
+                    obj_sampler_info["params"].get("batched_placement", False),
                 )
             else:
                 logger.info(
@@ -248,7 +255,13 @@ class RearrangeEpisodeGenerator:
                         target_sampler_info["params"]["num_samples"][1],
                     ),
                     target_sampler_info["params"]["orientation_sampling"],
+                    target_sampler_info["params"].get(
+                        "batched_placement", False
+                    ),
                 )
+                self._target_samplers[
+                    target_sampler_info["name"]
+                ].receptacle_index = self._receptacle_index
             else:
                 logger.info(
                     f"Requested target sampler '{target_sampler_info['type']}' is not implemented."
@@ -354,6 +367,17 @@ class RearrangeEpisodeGenerator:
         cur_scene_name = self._scene_sampler.sample()
         self.initialize_sim(cur_scene_name, self.cfg.dataset_path)
 
+        # scrape the scene's receptacles once and re-use them for all episodes in the scene
+        if cur_scene_name not in self._receptacle_indices or not (
+            self._receptacle_indices[cur_scene_name].is_valid_for(self.sim)
+        ):
+            self._receptacle_indices[cur_scene_name] = ReceptacleIndex(
+                self.sim
+            )
+        self._receptacle_index = self._receptacle_indices[cur_scene_name]
+        for sampler in self._obj_samplers.values():
+            sampler.receptacle_index = self._receptacle_index
+
         return cur_scene_name
 
     def visualize_scene_receptacles(self) -> None:
@@ -468,7 +492,7 @@ class RearrangeEpisodeGenerator:
                     self.vdb.get_observation()
 
         # simulate the world for a few seconds to validate the placements
-        if not self.settle_sim():
+        if not self.settle_sim(adaptive=self.cfg.adaptive_settle):
             logger.warning(
                 "Aborting episode generation due to unstable state."
             )
@@ -623,11 +647,24 @@ class RearrangeEpisodeGenerator:
         )
 
     def settle_sim(
-        self, duration: float = 5.0, make_video: bool = True
+        self,
+        duration: float = 5.0,
+        make_video: bool = True,
+        adaptive: bool = False,
+        error_eps: float = 0.1,
+        rest_velocity_eps: float = 0.01,
+        rest_duration: float = 0.25,
     ) -> bool:
         """
         Run dynamics for a few seconds to check for stability of newly placed objects and optionally produce a video.
         Returns whether or not the simulation was stable.
+
+        :param duration: The maximum world time to simulate.
+        :param make_video: Produce a video of the settling process if rendering debug observations.
+        :param adaptive: Track object displacement and velocity while stepping. Stop early once all objects have been at rest for rest_duration or abort as soon as any object moves more than error_eps from its placement.
+        :param error_eps: The maximum displacement from placement for a stable object.
+        :param rest_velocity_eps: Linear (units/sec) and angular (rad/sec) speed below which an object is considered at rest in adaptive mode.
+        :param rest_duration: Time all objects must remain at rest before adaptive mode stops early.
         """
         if len(self.ep_sampled_objects) == 0:
             return True
@@ -650,15 +687,44 @@ class RearrangeEpisodeGenerator:
                 obs_cache=settle_db_obs,
             )
 
+        step_size = 1.0 / 30.0
+        time_at_rest = 0.0
         while self.sim.get_world_time() < duration:
-            self.sim.step_world(1.0 / 30.0)
+            self.sim.step_world(step_size)
             if self._render_debug_obs:
                 self.vdb.get_observation(obs_cache=settle_db_obs)
 
+            if adaptive:
+                all_at_rest = True
+                any_unstable = False
+                for new_object in self.ep_sampled_objects:
+                    if (
+                        spawn_positions[new_object.handle]
+                        - new_object.translation
+                    ).length() > error_eps:
+                        any_unstable = True
+                        break
+                    if new_object.awake and (
+                        new_object.linear_velocity.length() > rest_velocity_eps
+                        or new_object.angular_velocity.length()
+                        > rest_velocity_eps
+                    ):
+                        all_at_rest = False
+                if any_unstable:
+                    logger.info(
+                        f"Aborting settling early at {self.sim.get_world_time()} sec, displacement exceeded {error_eps}."
+                    )
+                    break
+                time_at_rest = time_at_rest + step_size if all_at_rest else 0.0
+                if time_at_rest >= rest_duration:
+                    logger.info(
+                        f"Settled early at {self.sim.get_world_time()} sec, all objects at rest."
+                    )
+                    break
+
         # check stability of placements
         logger.info("Computing placement stability report:")
         max_settle_displacement = 0
-        error_eps = 0.1
         unstable_placements = []
         for new_object in self.ep_sampled_objects:
             error = (
@@ -770,6 +836,7 @@ def get_config_defaults() -> CN:
         # {"name":str, "type:str", "params":{})
         # - uniform sampler params: {"object_sets":[str], "receptacle_sets":[str], "num_samples":[min, max], "orientation_sampling":str)
         # NOTE: "orientation_sampling" options: "none", "up", "all"
+        # NOTE: optional "batched_placement": bool prescreens the placement candidates for a pairing with ray casts before contact testing and culls receptacles which never accept placements
         # TODO: convert some special examples to yaml:
         # (
         #     "fridge_middle",
@@ -843,6 +910,10 @@ def get_config_defaults() -> CN:
     #  }
     _C.markers = []
 
+    # ----- stability check ------
+    # If True, physics settling of sampled objects stops as soon as all objects are at rest and aborts as soon as any object moves too far from its placement instead of always simulating the full duration.
+    _C.adaptive_settle = False
+
     return _C.clone()
 
 
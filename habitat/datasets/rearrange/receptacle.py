@@ -4,8 +4,9 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Pattern, Set, Tuple, Union
 
 import magnum as mn
 import numpy as np
@@ -64,6 +65,21 @@ class Receptacle(ABC):
         :param sample_region_scale: defines a XZ scaling of the sample region around its center. For example to constrain object spawning toward the center of a receptacle.
         """
 
+    def sample_uniform_local_batch(
+        self, num_samples: int, sample_region_scale: float = 1.0
+    ) -> np.ndarray:
+        """
+        Sample an (num_samples,3) array of uniform random points within Receptacle in local space.
+
+        :param sample_region_scale: defines a XZ scaling of the sample region around its center.
+        """
+        return np.array(
+            [
+                self.sample_uniform_local(sample_region_scale)
+                for _ in range(num_samples)
+            ]
+        ).reshape(num_samples, 3)
+
     @abstractmethod
     def get_global_transform(self, sim: habitat_sim.Simulator) -> mn.Matrix4:
         """
@@ -135,6 +151,26 @@ class AABBReceptacle(Receptacle):
 
         return np.random.uniform(sample_range[0], sample_range[1])
 
+    def sample_uniform_local_batch(
+        self, num_samples: int, sample_region_scale: float = 1.0
+    ) -> np.ndarray:
+        """
+        Sample an (num_samples,3) array of uniform random points in the local AABB at once.
+
+        :param sample_region_scale: defines a XZ scaling of the sample region around its center.
+        """
+        scaled_region = mn.Range3D.from_center(
+            self.bounds.center(), sample_region_scale * self.bounds.size() / 2
+        )
+
+        # NOTE: does not scale the "up" direction
+        sample_min = np.array(scaled_region.min)
+        sample_max = np.array(scaled_region.max)
+        sample_min[self.up_axis] = self.bounds.min[self.up_axis]
+        sample_max[self.up_axis] = self.bounds.max[self.up_axis]
+
+        return np.random.uniform(sample_min, sample_max, size=(num_samples, 3))
+
     def get_global_transform(self, sim: habitat_sim.Simulator) -> mn.Matrix4:
         """
         Isolates boilerplate necessary to extract receptacle global transform of the Receptacle at the current state.
@@ -219,6 +255,10 @@ class AABBReceptacle(Receptacle):
         return [box_obj]
 
 
+# {urdf path -> [receptacle subconfig names]}
+_urdf_receptacle_names_cache: Dict[str, List[str]] = {}
+
+
 def get_all_scenedataset_receptacles(sim) -> Dict[str, Dict[str, List[str]]]:
     """
     Scrapes the active SceneDataset from a Simulator for all receptacle names defined in rigid/articulated object and stage templates for investigation and preview purposes.
@@ -254,15 +294,21 @@ def get_all_scenedataset_receptacles(sim) -> Dict[str, Dict[str, List[str]]]:
                 receptacles["rigid"][template_handle].append(item)
 
     # TODO: we currently need to load every URDF to get at the configs. This should change once AO templates are better managed.
+    # NOTE: the scraped receptacle names are cached by URDF path so each URDF is only instanced once per process.
     aom = sim.get_articulated_object_manager()
     for urdf_handle, urdf_path in sim.metadata_mediator.urdf_paths.items():
-        ao = aom.add_articulated_object_from_urdf(urdf_path)
-        for item in ao.user_attributes.get_subconfig_keys():
-            if item.startswith("receptacle_"):
-                if urdf_handle not in receptacles["articulated"]:
-                    receptacles["articulated"][urdf_handle] = []
-                receptacles["articulated"][urdf_handle].append(item)
-        aom.remove_object_by_handle(ao.handle)
+        if urdf_path not in _urdf_receptacle_names_cache:
+            ao = aom.add_articulated_object_from_urdf(urdf_path)
+            _urdf_receptacle_names_cache[urdf_path] = [
+                item
+                for item in ao.user_attributes.get_subconfig_keys()
+                if item.startswith("receptacle_")
+            ]
+            aom.remove_object_by_handle(ao.handle)
+        if len(_urdf_receptacle_names_cache[urdf_path]) > 0:
+            receptacles["articulated"][urdf_handle] = list(
+                _urdf_receptacle_names_cache[urdf_path]
+            )
 
     return receptacles
 
@@ -403,3 +449,194 @@ def find_receptacles(
         )
 
     return receptacles
+
+
+def _compile_substrings(substrings: List[str]) -> Optional[Pattern]:
+    """
+    Compile a list of substrings into a single pattern matching any of them. Returns None for an empty list, which never matches.
+    """
+    if len(substrings) == 0:
+        return None
+    return re.compile("|".join(re.escape(substr) for substr in substrings))
+
+
+class ReceptacleSetMatcher:
+    """
+    Precompiled substring matcher for a single receptacle set tuple: (included_object_substrings, excluded_object_substrings, included_receptacle_substrings, excluded_receptacle_substrings).
+    """
+
+    def __init__(
+        self, receptacle_set: Tuple[List[str], List[str], List[str], List[str]]
+    ) -> None:
+        # hashable identifier of the receptacle set for caching match results
+        self.key = tuple(tuple(substrings) for substrings in receptacle_set)
+        self._included_objects = _compile_substrings(receptacle_set[0])
+        self._excluded_objects = _compile_substrings(receptacle_set[1])
+        self._included_receptacles = _compile_substrings(receptacle_set[2])
+        self._excluded_receptacles = _compile_substrings(receptacle_set[3])
+
+    def excludes(self, receptacle: Receptacle) -> bool:
+        """
+        Whether or not the Receptacle is culled by the exclusion substrings of this set.
+        """
+        if (
+            self._excluded_objects is not None
+            and receptacle.parent_object_handle is not None
+            and self._excluded_objects.search(receptacle.parent_object_handle)
+        ):
+            return True
+        return bool(
+            self._excluded_receptacles is not None
+            and self._excluded_receptacles.search(receptacle.name)
+        )
+
+    def includes(self, receptacle: Receptacle) -> bool:
+        """
+        Whether or not the Receptacle matches the inclusion substrings of this set. Stage Receptacles (no parent object) are matched by name only.
+        """
+        if self._included_receptacles is None or not (
+            self._included_receptacles.search(receptacle.name)
+        ):
+            return False
+        if receptacle.parent_object_handle is None:
+            return True
+        return bool(
+            self._included_objects is not None
+            and self._included_objects.search(receptacle.parent_object_handle)
+        )
+
+
+def match_receptacle_sets(
+    matchers: List[ReceptacleSetMatcher], receptacle: Receptacle
+) -> bool:
+    """
+    Check a Receptacle against an ordered list of receptacle set matchers. The first set which either excludes or includes the Receptacle decides the result.
+    Stage Receptacles (no parent object) are decided by the first set which does not exclude them.
+    """
+    for matcher in matchers:
+        if matcher.excludes(receptacle):
+            return False
+        if matcher.includes(receptacle):
+            return True
+        if receptacle.parent_object_handle is None:
+            return False
+    return False
+
+
+class ReceptacleIndex:
+    """
+    Persistent cache of the Receptacles defined by a scene's initial content, built once per scene and re-used across episodes.
+
+    Caches receptacle set matching results and the global transforms of Receptacles which cannot move (stage Receptacles and those attached to STATIC rigid objects). Receptacles attached to objects added after the index was built (e.g. by previous samplers in the same episode) are scraped incrementally on request.
+    """
+
+    def __init__(self, sim: habitat_sim.Simulator) -> None:
+        """
+        Scrape the scene currently loaded in the Simulator. Should be constructed before any objects are added to the scene.
+        """
+        self.scene_key = ReceptacleIndex.get_scene_key(sim)
+        self.receptacles = find_receptacles(sim)
+        self._indexed_object_handles: Set[str] = set(
+            sim.get_rigid_object_manager().get_object_handles()
+        )
+        self._indexed_object_handles.update(
+            sim.get_articulated_object_manager().get_object_handles()
+        )
+        # {(parent handle, receptacle name) -> global transform}
+        self._static_transforms: Dict[
+            Tuple[Optional[str], str], mn.Matrix4
+        ] = {}
+        rom = sim.get_rigid_object_manager()
+        for receptacle in self.receptacles:
+            if receptacle.is_parent_object_articulated:
+                continue
+            if (
+                receptacle.parent_object_handle is None
+                or rom.get_object_by_handle(
+                    receptacle.parent_object_handle
+                ).motion_type
+                == habitat_sim.physics.MotionType.STATIC
+            ):
+                self._static_transforms[
+                    (receptacle.parent_object_handle, receptacle.name)
+                ] = receptacle.get_global_transform(sim)
+        # {receptacle sets -> [is candidate] per indexed Receptacle}
+        self._set_matches: Dict[Tuple, List[bool]] = {}
+
+    @staticmethod
+    def get_scene_key(sim: habitat_sim.Simulator) -> Tuple[str, str]:
+        """
+        Key identifying the scene content an index was built from.
+        """
+        return (
+            sim.config.sim_cfg.scene_dataset_config_file,
+            sim.config.sim_cfg.scene_id,
+        )
+
+    def is_valid_for(self, sim: habitat_sim.Simulator) -> bool:
+        """
+        Whether or not this index was built from the scene currently loaded in the Simulator.
+        """
+        return self.scene_key == ReceptacleIndex.get_scene_key(sim)
+
+    def get_receptacles(
+        self, sim: habitat_sim.Simulator
+    ) -> List[Union[Receptacle, AABBReceptacle]]:
+        """
+        Return all Receptacles in the scene: the indexed Receptacles followed by those defined on rigid objects added since the index was built.
+        """
+        receptacles = list(self.receptacles)
+        rom = sim.get_rigid_object_manager()
+        for obj_handle in rom.get_object_handles():
+            if obj_handle in self._indexed_object_handles:
+                continue
+            receptacles.extend(
+                parse_receptacles_from_user_config(
+                    rom.get_object_by_handle(obj_handle).user_attributes,
+                    parent_object_handle=obj_handle,
+                )
+            )
+        return receptacles
+
+    def get_global_transform(
+        self, receptacle: Receptacle, sim: habitat_sim.Simulator
+    ) -> mn.Matrix4:
+        """
+        Return the cached global transform of a static Receptacle or query the current transform otherwise.
+        """
+        key = (receptacle.parent_object_handle, receptacle.name)
+        if key in self._static_transforms:
+            return self._static_transforms[key]
+        return receptacle.get_global_transform(sim)
+
+    def get_gravity_alignment(
+        self, receptacle: Receptacle, sim: habitat_sim.Simulator
+    ) -> float:
+        """
+        Dot product of the Receptacle's global "down" direction and gravity. 1.0 for perfectly aligned Receptacles.
+        """
+        obj_down = (
+            self.get_global_transform(receptacle, sim)
+            .transform_vector(-receptacle.up)
+            .normalized()
+        )
+        return mn.math.dot(obj_down, sim.get_gravity().normalized())
+
+    def match_receptacle_sets(
+        self,
+        matchers: List[ReceptacleSetMatcher],
+        receptacles: List[Receptacle],
+    ) -> List[bool]:
+        """
+        Match a list of Receptacles (as returned by get_receptacles) against receptacle set matchers. Results for indexed Receptacles are computed once per matcher combination and cached.
+        """
+        set_key = tuple(matcher.key for matcher in matchers)
+        if set_key not in self._set_matches:
+            self._set_matches[set_key] = [
+                match_receptacle_sets(matchers, receptacle)
+                for receptacle in self.receptacles
+            ]
+        return self._set_matches[set_key] + [
+            match_receptacle_sets(matchers, receptacle)
+            for receptacle in receptacles[len(self.receptacles) :]
+        ]
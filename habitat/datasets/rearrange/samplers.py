@@ -10,14 +10,61 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Tuple
 
 import magnum as mn
+import numpy as np
 
 import habitat.sims.habitat_simulator.sim_utilities as sutils
 import habitat_sim
 from habitat.core.logging import logger
-from habitat.datasets.rearrange.receptacle import Receptacle, find_receptacles
+from habitat.datasets.rearrange.receptacle import (
+    Receptacle,
+    ReceptacleIndex,
+    ReceptacleSetMatcher,
+    find_receptacles,
+    match_receptacle_sets,
+)
 from habitat.sims.habitat_simulator.debug_visualizer import DebugVisualizer
 
 
+def transform_points(transform: mn.Matrix4, points: np.ndarray) -> np.ndarray:
+    """
+    Apply a rigid transform to an (N,3) array of points at once.
+    """
+    rotation_scaling = np.stack(
+        [
+            np.array(transform.transform_vector(axis))
+            for axis in [
+                mn.Vector3.x_axis(),
+                mn.Vector3.y_axis(),
+                mn.Vector3.z_axis(),
+            ]
+        ],
+        axis=1,
+    )
+    return points @ rotation_scaling.T + np.array(transform.translation)
+
+
+def prescreen_support_rays(
+    sim: habitat_sim.Simulator,
+    positions: np.ndarray,
+    support_object_ids: List[int],
+) -> np.ndarray:
+    """
+    Cast a ray in the gravity direction from each of an (N,3) array of candidate positions before any object is instanced.
+    Returns a boolean mask of candidates whose first hit is one of the support objects. Others cannot pass snap_down and are culled.
+    """
+    gravity_dir = sim.get_gravity().normalized()
+    mask = np.zeros(len(positions), dtype=bool)
+    for ix, position in enumerate(positions):
+        raycast_results = sim.cast_ray(
+            habitat_sim.geo.Ray(mn.Vector3(*position), gravity_dir)
+        )
+        mask[ix] = (
+            raycast_results.has_hits()
+            and raycast_results.hits[0].object_id in support_object_ids
+        )
+    return mask
+
+
 class SceneSampler(ABC):
     @abstractmethod
     def num_scenes(self):
@@ -76,6 +123,7 @@ class ObjectSampler:
         num_objects: Tuple[int, int] = (1, 1),
         orientation_sample: Optional[str] = None,
         sample_region_ratio: float = 1.0,
+        batched_placement: bool = False,
     ) -> None:
         self.object_set = object_set
         self.receptacle_sets = receptacle_sets
@@ -85,8 +133,13 @@ class ObjectSampler:
         self.receptacle_candidates: Optional[
             List[Receptacle]
         ] = None  # the specific receptacle instances relevant to this sampler
+        # optional per-scene cache of receptacles shared between samplers, see ReceptacleIndex
+        self.receptacle_index: Optional[ReceptacleIndex] = None
         assert len(self.object_set) > 0
         assert len(self.receptacle_sets) > 0
+        self._receptacle_set_matchers = [
+            ReceptacleSetMatcher(r_set) for r_set in self.receptacle_sets
+        ]
         self.max_sample_attempts = 1000  # number of distinct object|receptacle pairings to try before giving up
         self.max_placement_attempts = 50  # number of times to attempt a single object|receptacle placement pairing
         self.num_objects = num_objects  # tuple of [min,max] objects to sample
@@ -95,6 +148,18 @@ class ObjectSampler:
             orientation_sample  # None, "up" (1D), "all" (rand quat)
         )
         self.sample_region_ratio = sample_region_ratio
+        # batched placement prescreens the candidates for a pairing in chunks, see sample_placement_batched
+        self.batched_placement = batched_placement
+        # number of candidates prescreened at once in batched placement
+        self.prescreen_chunk_size = 8
+        # {(parent object handle, receptacle name) -> {"attempts", "tried", "accepted"}}
+        # counting the candidates sampled up to the accepted one in batched placement, those of them tried after passing prescreening and the accepted ones
+        self.receptacle_stats: Dict[
+            Tuple[Optional[str], str], Dict[str, int]
+        ] = {}
+        self.receptacle_cull_min_attempts = 200  # number of batched candidates to try before a receptacle can be culled
+        # receptacles with this acceptance rate or lower are culled
+        self.receptacle_cull_acceptance_rate = 0.0
         # More possible parameters of note:
         # - surface vs volume
         # - apply physics stabilization: none, dynamic, projection
@@ -106,6 +171,7 @@ class ObjectSampler:
         # receptacle instances should be scraped for every new scene
         self.receptacle_instances = None
         self.receptacle_candidates = None
+        self.receptacle_stats = {}
 
     def sample_receptacle(
         self,
@@ -116,58 +182,47 @@ class ObjectSampler:
         """
         Sample a receptacle from the receptacle_set and return relevant information.
         If cull_tilted_receptacles is True, receptacles are culled for objects with local "down" (-Y), not aligned with gravity (unit dot product compared to tilt_tolerance).
+        If a receptacle_index for the current scene is provided, receptacle scraping, set matching and static transforms are re-used from the index instead of recomputed.
         """
+        use_index = (
+            self.receptacle_index is not None
+            and self.receptacle_index.is_valid_for(sim)
+        )
         if self.receptacle_instances is None:
-            self.receptacle_instances = find_receptacles(sim)
+            self.receptacle_instances = (
+                self.receptacle_index.get_receptacles(sim)
+                if use_index
+                else find_receptacles(sim)
+            )
 
         if self.receptacle_candidates is None:
             self.receptacle_candidates = []
-            for receptacle in self.receptacle_instances:
-                found_match = False
-                for r_set_tuple in self.receptacle_sets:
-                    # r_set_tuple = (included_obj_substrs, excluded_obj_substrs, included_receptacle_substrs, excluded_receptacle_substrs)
-                    culled = False
-                    # first try to cull by exclusion
-                    for ex_object_substr in (
-                        r_set_tuple[1] and receptacle.parent_object_handle
-                    ):
-                        if ex_object_substr in receptacle.parent_object_handle:
-                            culled = True
-                            break
-                    for ex_receptacle_substr in r_set_tuple[3]:
-                        if ex_receptacle_substr in receptacle.name:
-                            culled = True
-                            break
-                    if culled:
-                        break
-
-                    # if the receptacle is stage/global (no object handle) then always a match
-                    if receptacle.parent_object_handle is None:
-                        # check the inclusion name constraints
-                        for name_constraint in r_set_tuple[2]:
-                            if name_constraint in receptacle.name:
-                                found_match = True
-                                break
-                        break
-
-                    # then search for inclusion
-                    for object_substr in r_set_tuple[0]:
-                        if object_substr in receptacle.parent_object_handle:
-                            # object substring is valid, try receptacle name constraint
-                            for name_constraint in r_set_tuple[2]:
-                                if name_constraint in receptacle.name:
-                                    # found a valid substring match for this receptacle, stop the search
-                                    found_match = True
-                                    break
-                        if found_match:
-                            # break object substr search
-                            break
-                    if found_match:
-                        # break receptacle set search
-                        break
-                if found_match:
-                    # substring match was found, check orientation constraint
-                    if cull_tilted_receptacles:
+            set_matches = (
+                self.receptacle_index.match_receptacle_sets(
+                    self._receptacle_set_matchers, self.receptacle_instances
+                )
+                if use_index
+                else [
+                    match_receptacle_sets(
+                        self._receptacle_set_matchers, receptacle
+                    )
+                    for receptacle in self.receptacle_instances
+                ]
+            )
+            for receptacle, found_match in zip(
+                self.receptacle_instances, set_matches
+            ):
+                if not found_match:
+                    continue
+                # substring match was found, check orientation constraint
+                if cull_tilted_receptacles:
+                    if use_index:
+                        gravity_alignment = (
+                            self.receptacle_index.get_gravity_alignment(
+                                receptacle, sim
+                            )
+                        )
+                    else:
                         obj_down = (
                             receptacle.get_global_transform(sim)
                             .transform_vector(-receptacle.up)
@@ -176,14 +231,13 @@ class ObjectSampler:
                         gravity_alignment = mn.math.dot(
                             obj_down, sim.get_gravity().normalized()
                         )
-                        if gravity_alignment < tilt_tolerance:
-                            culled = True
-                            logger.info(
-                                f"Culled by tilt: '{receptacle.name}', {gravity_alignment}"
-                            )
-                    if not culled:
-                        # found a valid receptacle
-                        self.receptacle_candidates.append(receptacle)
+                    if gravity_alignment < tilt_tolerance:
+                        logger.info(
+                            f"Culled by tilt: '{receptacle.name}', {gravity_alignment}"
+                        )
+                        continue
+                # found a valid receptacle
+                self.receptacle_candidates.append(receptacle)
 
         assert (
             len(self.receptacle_candidates) > 0
@@ -199,6 +253,83 @@ class ObjectSampler:
         """
         return self.object_set[random.randrange(0, len(self.object_set))]
 
+    def _get_receptacle_transform(
+        self, sim: habitat_sim.Simulator, receptacle: Receptacle
+    ) -> mn.Matrix4:
+        """
+        Get the global transform of a receptacle, re-using the cached transform from the receptacle_index when possible.
+        """
+        if (
+            self.receptacle_index is not None
+            and self.receptacle_index.is_valid_for(sim)
+        ):
+            return self.receptacle_index.get_global_transform(receptacle, sim)
+        return receptacle.get_global_transform(sim)
+
+    def _get_support_object_ids(
+        self, sim: habitat_sim.Simulator, receptacle: Receptacle
+    ) -> List[int]:
+        """
+        Get the object ids of the valid support surfaces for placements on a receptacle.
+        """
+        support_object_ids = [-1]
+        # add support object ids for non-stage receptacles
+        if receptacle.is_parent_object_articulated:
+            ao_instance = (
+                sim.get_articulated_object_manager().get_object_by_handle(
+                    receptacle.parent_object_handle
+                )
+            )
+            for (
+                object_id,
+                link_ix,
+            ) in ao_instance.link_object_ids.items():
+                if receptacle.parent_link == link_ix:
+                    support_object_ids = [
+                        object_id,
+                        ao_instance.object_id,
+                    ]
+                    break
+        elif receptacle.parent_object_handle is not None:
+            support_object_ids = [
+                sim.get_rigid_object_manager()
+                .get_object_by_handle(receptacle.parent_object_handle)
+                .object_id
+            ]
+        return support_object_ids
+
+    def _sample_orientation(
+        self, new_object: habitat_sim.physics.ManagedRigidObject
+    ) -> None:
+        """
+        Apply the configured orientation sampling to a new object.
+        """
+        if self.orientation_sample is not None:
+            if self.orientation_sample == "up":
+                # rotate the object around the gravity direction
+                rot = random.uniform(0, math.pi * 2.0)
+                new_object.rotation = mn.Quaternion.rotation(
+                    mn.Rad(rot), mn.Vector3.y_axis()
+                )
+            elif self.orientation_sample == "all":
+                # set the object's orientation to a random quaternion
+                new_object.rotation = (
+                    habitat_sim.utils.common.random_quaternion()
+                )
+
+    def _add_new_object(
+        self, sim: habitat_sim.Simulator, object_handle: str
+    ) -> habitat_sim.physics.ManagedRigidObject:
+        """
+        Instance the new potential object from the handle.
+        """
+        assert sim.get_object_template_manager().get_library_has_handle(
+            object_handle
+        ), f"Found no object in the SceneDataset with handle '{object_handle}'."
+        return sim.get_rigid_object_manager().add_object_by_template_handle(
+            object_handle
+        )
+
     def sample_placement(
         self,
         sim: habitat_sim.Simulator,
@@ -210,62 +341,34 @@ class ObjectSampler:
         """
         Attempt to sample a valid placement of the object in/on a receptacle given an object handle and receptacle information.
         """
+        if self.batched_placement:
+            return self.sample_placement_batched(
+                sim, object_handle, receptacle, snap_down, vdb
+            )
+
         num_placement_tries = 0
         new_object = None
         while num_placement_tries < self.max_placement_attempts:
             num_placement_tries += 1
 
             # sample the object location
-            target_object_position = receptacle.sample_uniform_global(
-                sim, self.sample_region_ratio
+            target_object_position = self._get_receptacle_transform(
+                sim, receptacle
+            ).transform_point(
+                receptacle.sample_uniform_local(self.sample_region_ratio)
             )
 
             # instance the new potential object from the handle
             if new_object == None:
-                assert sim.get_object_template_manager().get_library_has_handle(
-                    object_handle
-                ), f"Found no object in the SceneDataset with handle '{object_handle}'."
-                new_object = sim.get_rigid_object_manager().add_object_by_template_handle(
-                    object_handle
-                )
+                new_object = self._add_new_object(sim, object_handle)
 
             # try to place the object
             new_object.translation = target_object_position
-            if self.orientation_sample is not None:
-                if self.orientation_sample == "up":
-                    # rotate the object around the gravity direction
-                    rot = random.uniform(0, math.pi * 2.0)
-                    new_object.rotation = mn.Quaternion.rotation(
-                        mn.Rad(rot), mn.Vector3.y_axis()
-                    )
-                elif self.orientation_sample == "all":
-                    # set the object's orientation to a random quaternion
-                    new_object.rotation = (
-                        habitat_sim.utils.common.random_quaternion()
-                    )
+            self._sample_orientation(new_object)
             if snap_down:
-                support_object_ids = [-1]
-                # add support object ids for non-stage receptacles
-                if receptacle.is_parent_object_articulated:
-                    ao_instance = sim.get_articulated_object_manager().get_object_by_handle(
-                        receptacle.parent_object_handle
-                    )
-                    for (
-                        object_id,
-                        link_ix,
-                    ) in ao_instance.link_object_ids.items():
-                        if receptacle.parent_link == link_ix:
-                            support_object_ids = [
-                                object_id,
-                                ao_instance.object_id,
-                            ]
-                            break
-                elif receptacle.parent_object_handle is not None:
-                    support_object_ids = [
-                        sim.get_rigid_object_manager()
-                        .get_object_by_handle(receptacle.parent_object_handle)
-                        .object_id
-                    ]
+                support_object_ids = self._get_support_object_ids(
+                    sim, receptacle
+                )
                 snap_success = sutils.snap_down(
                     sim,
                     new_object,
@@ -293,12 +396,143 @@ class ObjectSampler:
         )
         return None
 
+    def sample_placement_batched(
+        self,
+        sim: habitat_sim.Simulator,
+        object_handle: str,
+        receptacle: Receptacle,
+        snap_down: bool = False,
+        vdb: Optional[DebugVisualizer] = None,
+    ) -> Optional[habitat_sim.physics.ManagedRigidObject]:
+        """
+        Batched variant of sample_placement. Samples max_placement_attempts candidate positions at once and, if snapping, prescreens them with gravity-direction ray casts before instancing the object, prescreen_chunk_size candidates at a time so that no rays are cast past the accepted candidate. Expensive snap and contact tests are only run on the surviving candidates.
+        Acceptance statistics are recorded per receptacle, see get_receptacle_acceptance_rates.
+        """
+        stats = self.receptacle_stats.setdefault(
+            (receptacle.parent_object_handle, receptacle.name),
+            {"attempts": 0, "tried": 0, "accepted": 0},
+        )
+
+        # sample and transform all candidates at once
+        candidate_positions = transform_points(
+            self._get_receptacle_transform(sim, receptacle),
+            receptacle.sample_uniform_local_batch(
+                self.max_placement_attempts, self.sample_region_ratio
+            ),
+        )
+
+        support_object_ids = None
+        if snap_down:
+            support_object_ids = self._get_support_object_ids(sim, receptacle)
+
+        new_object = None
+        placement_success = False
+        # only the candidates up to the accepted one count as attempts
+        num_attempts = len(candidate_positions)
+        num_placement_tries = 0
+        for chunk_start in range(
+            0, len(candidate_positions), self.prescreen_chunk_size
+        ):
+            chunk_positions = candidate_positions[
+                chunk_start : chunk_start + self.prescreen_chunk_size
+            ]
+            if snap_down:
+                prescreen_mask = prescreen_support_rays(
+                    sim, chunk_positions, support_object_ids
+                )
+            else:
+                prescreen_mask = np.ones(len(chunk_positions), dtype=bool)
+
+            for chunk_ix in np.nonzero(prescreen_mask)[0]:
+                num_placement_tries += 1
+                # instance the new potential object from the handle
+                if new_object is None:
+                    new_object = self._add_new_object(sim, object_handle)
+
+                # try to place the object
+                new_object.translation = mn.Vector3(*chunk_positions[chunk_ix])
+                self._sample_orientation(new_object)
+                if snap_down:
+                    placement_success = sutils.snap_down(
+                        sim,
+                        new_object,
+                        support_object_ids,
+                        vdb=vdb,
+                    )
+                else:
+                    placement_success = not new_object.contact_test()
+                if placement_success:
+                    num_attempts = chunk_start + chunk_ix + 1
+                    break
+            if placement_success:
+                break
+
+        stats["attempts"] += int(num_attempts)
+        stats["tried"] += num_placement_tries
+        if placement_success:
+            stats["accepted"] += 1
+            logger.info(
+                f"Successfully sampled object placement in {num_placement_tries} tries out of {num_attempts} candidates."
+            )
+            return new_object
+
+        if new_object is not None:
+            sim.get_rigid_object_manager().remove_object_by_handle(
+                new_object.handle
+            )
+        logger.info(
+            f"Failed to sample object placement from {self.max_placement_attempts} candidates ({num_placement_tries} passed prescreening)."
+        )
+        self._cull_hopeless_receptacle(receptacle)
+        return None
+
+    def get_receptacle_acceptance_rates(
+        self,
+    ) -> Dict[Tuple[Optional[str], str], float]:
+        """
+        Get the fraction of batched placement candidates accepted per receptacle, keyed by (parent object handle, receptacle name).
+        """
+        return {
+            receptacle_key: stats["accepted"] / stats["attempts"]
+            for receptacle_key, stats in self.receptacle_stats.items()
+            if stats["attempts"] > 0
+        }
+
+    def _cull_hopeless_receptacle(self, receptacle: Receptacle) -> None:
+        """
+        Remove a receptacle from the candidates if its acceptance rate after enough attempts shows it cannot support placements.
+        """
+        stats = self.receptacle_stats[
+            (receptacle.parent_object_handle, receptacle.name)
+        ]
+        if (
+            self.receptacle_candidates is not None
+            and stats["attempts"] >= self.receptacle_cull_min_attempts
+            and stats["accepted"] / stats["attempts"]
+            <= self.receptacle_cull_acceptance_rate
+        ):
+            logger.info(
+                f"Culled by acceptance rate: '{receptacle.name}', {stats}"
+            )
+            self.receptacle_candidates = [
+                candidate
+                for candidate in self.receptacle_candidates
+                if candidate is not receptacle
+            ]
+
     def single_sample(
         self,
         sim: habitat_sim.Simulator,
         snap_down: bool = False,
         vdb: Optional[DebugVisualizer] = None,
     ) -> Optional[habitat_sim.physics.ManagedRigidObject]:
+        if (
+            self.receptacle_candidates is not None
+            and len(self.receptacle_candidates) == 0
+        ):
+            # all receptacles were culled as hopeless during batched placement
+            return None
+
         # draw a new pairing
         object_handle = self.sample_object()
         target_receptacle = self.sample_receptacle(sim)
@@ -374,6 +608,7 @@ class ObjectTargetSampler(ObjectSampler):
         ],
         num_targets: Tuple[int, int] = (1, 1),
         orientation_sample: Optional[str] = None,
+        batched_placement: bool = False,
     ) -> None:
         """
         Initialize a standard ObjectSampler but construct the object_set to correspond with specific object instances provided.
@@ -383,7 +618,11 @@ class ObjectTargetSampler(ObjectSampler):
             x.creation_attributes.handle for x in self.object_instance_set
         ]
         super().__init__(
-            object_set, receptacle_sets, num_targets, orientation_sample
+            object_set,
+            receptacle_sets,
+            num_targets,
+            orientation_sample,
+            batched_placement=batched_placement,
         )
 
     def sample(
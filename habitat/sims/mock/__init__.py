@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from habitat.core.registry import registry
+from habitat.core.simulator import Simulator
+
+
+def _try_register_mock_sim():
+    try:
+        from habitat.sims.mock.mock_simulator import MockSim  # noqa: F401
+    except ImportError as e:
+        mock_sim_import_error = e
+
+        @registry.register_simulator(name="MockSim-v0")
+        class MockSimImportError(Simulator):
+            def __init__(self, *args, **kwargs):
+                raise mock_sim_import_error
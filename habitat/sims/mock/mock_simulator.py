@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Lightweight stand-in for the simulator, which needs no scene assets nor
+GPU.
+
+The agent moves on an obstacle-free square floor centered on the origin, so
+geodesic distances are euclidean distances, and the visual sensors return
+crops of a random texture shifted with the agent pose. It is meant to
+measure the python overhead around the simulator, see ``benchmarks/``.
+"""
+
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import quaternion
+from gym import spaces
+
+from habitat.config import Config
+from habitat.core.dataset import Dataset, Episode
+from habitat.core.registry import registry
+from habitat.core.simulator import (
+    AgentState,
+    DepthSensor,
+    Observations,
+    RGBSensor,
+    SensorSuite,
+    Simulator,
+)
+from habitat.utils.geometry_utils import (
+    quaternion_from_coeff,
+    quaternion_rotate_vector,
+)
+
+
+class MockSimActions(IntEnum):
+    r"""Actions of :ref:`MockSim`, with the ids of the default
+    :py:`HabitatSimActions` which cannot be imported without habitat_sim.
+    """
+    STOP = 0
+    MOVE_FORWARD = 1
+    TURN_LEFT = 2
+    TURN_RIGHT = 3
+
+
+@registry.register_sensor
+class MockRGBSensor(RGBSensor):
+    def __init__(self, config: Config) -> None:
+        super().__init__(config=config)
+
+    def _get_observation_space(self, *args: Any, **kwargs: Any):
+        return spaces.Box(
+            low=0,
+            high=255,
+            shape=(self.config.HEIGHT, self.config.WIDTH, 3),
+            dtype=np.uint8,
+        )
+
+    def get_observation(self, sim_obs: Dict[str, np.ndarray]) -> np.ndarray:
+        return sim_obs[self.uuid]
+
+
+@registry.register_sensor
+class MockDepthSensor(DepthSensor):
+    min_depth_value: float
+    max_depth_value: float
+
+    def __init__(self, config: Config) -> None:
+        if config.NORMALIZE_DEPTH:
+            self.min_depth_value = 0
+            self.max_depth_value = 1
+        else:
+            self.min_depth_value = config.MIN_DEPTH
+            self.max_depth_value = config.MAX_DEPTH
+
+        super().__init__(config=config)
+
+    def _get_observation_space(self, *args: Any, **kwargs: Any):
+        return spaces.Box(
+            low=self.min_depth_value,
+            high=self.max_depth_value,
+            shape=(self.config.HEIGHT, self.config.WIDTH, 1),
+            dtype=np.float32,
+        )
+
+    def get_observation(self, sim_obs: Dict[str, np.ndarray]) -> np.ndarray:
+        obs = np.clip(
+            sim_obs[self.uuid], self.config.MIN_DEPTH, self.config.MAX_DEPTH
+        )
+        obs = np.expand_dims(obs, axis=2)  # make depth observation a 3D array
+
+        if self.config.NORMALIZE_DEPTH:
+            # normalize depth observation to [0, 1]
+            obs = (obs - self.config.MIN_DEPTH) / (
+                self.config.MAX_DEPTH - self.config.MIN_DEPTH
+            )
+
+        return obs
+
+
+@registry.register_simulator(name="MockSim-v0")
+class MockSim(Simulator):
+    r"""Simulator stand-in with synthetic observations and navmesh-free
+    geodesics.
+
+    Only :ref:`MockRGBSensor` and :ref:`MockDepthSensor` are supported. The
+    agent is moved by :ref:`MockSimActions`, moving out of the floor is a
+    collision.
+
+    Args:
+        config: configuration of the simulator, the floor size is
+            :py:`MOCK_SIM.SCENE_SIZE`.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.habitat_config = config
+        agent_config = self._get_agent_config()
+
+        sim_sensors = []
+        for sensor_name in agent_config.SENSORS:
+            sensor_cfg = getattr(self.habitat_config, sensor_name)
+            sensor_type = registry.get_sensor(sensor_cfg.TYPE)
+
+            assert sensor_type is not None, "invalid sensor type {}".format(
+                sensor_cfg.TYPE
+            )
+            assert issubclass(
+                sensor_type, (MockRGBSensor, MockDepthSensor)
+            ), "{} is not supported by {}".format(
+                sensor_cfg.TYPE, self.__class__.__name__
+            )
+            sim_sensors.append(sensor_type(sensor_cfg))
+
+        self._sensor_suite = SensorSuite(sim_sensors)
+        # STOP, MOVE_FORWARD, TURN_LEFT and TURN_RIGHT
+        self._action_space = spaces.Discrete(4)
+        self._position = np.zeros(3, dtype=np.float32)
+        self._rotation = quaternion.one
+        self._collided = False
+        self.seed(config.SEED)
+
+    def _get_agent_config(self, agent_id: Optional[int] = None) -> Any:
+        if agent_id is None:
+            agent_id = self.habitat_config.DEFAULT_AGENT_ID
+        agent_name = self.habitat_config.AGENTS[agent_id]
+        agent_config = getattr(self.habitat_config, agent_name)
+        return agent_config
+
+    @property
+    def sensor_suite(self) -> SensorSuite:
+        return self._sensor_suite
+
+    @property
+    def action_space(self) -> spaces.Space:
+        return self._action_space
+
+    @property
+    def scene_size(self) -> float:
+        return self.habitat_config.MOCK_SIM.SCENE_SIZE
+
+    def seed(self, seed: int) -> None:
+        rng = np.random.RandomState(seed)
+        # Textures are twice the size of the observations, so any crop of
+        # the size of the observations fits
+        self._textures: Dict[str, np.ndarray] = {}
+        for uuid, sensor in self._sensor_suite.sensors.items():
+            height, width = sensor.config.HEIGHT, sensor.config.WIDTH
+            if isinstance(sensor, MockRGBSensor):
+                self._textures[uuid] = rng.randint(
+                    0, 256, size=(2 * height, 2 * width, 3), dtype=np.uint8
+                )
+            else:
+                self._textures[uuid] = rng.uniform(
+                    sensor.config.MIN_DEPTH,
+                    sensor.config.MAX_DEPTH,
+                    size=(2 * height, 2 * width),
+                ).astype(np.float32)
+        self._rng = rng
+
+    def reconfigure(self, habitat_config: Config) -> None:
+        self.habitat_config = habitat_config
+        agent_config = self._get_agent_config()
+        if agent_config.IS_SET_START_STATE:
+            self.set_agent_state(
+                agent_config.START_POSITION, agent_config.START_ROTATION
+            )
+
+    def _get_sensor_observations(self) -> Dict[str, np.ndarray]:
+        forward = self._get_forward()
+        heading = np.arctan2(-forward[0], -forward[2])
+        sim_obs = {}
+        for uuid, texture in self._textures.items():
+            height, width = texture.shape[0] // 2, texture.shape[1] // 2
+            row = int(
+                (self._position[0] + self._position[2])
+                / self.scene_size
+                * height
+            )
+            col = int(heading / (2 * np.pi) * width)
+            # Copy as a renderer returns a new buffer
+            sim_obs[uuid] = texture[
+                row % height : row % height + height,  # noqa: E203
+                col % width : col % width + width,  # noqa: E203
+            ].copy()
+        return sim_obs
+
+    def _get_forward(self) -> np.ndarray:
+        return quaternion_rotate_vector(self._rotation, self.forward_vector)
+
+    def reset(self) -> Observations:
+        self._collided = False
+        return self._sensor_suite.get_observations(
+            self._get_sensor_observations()
+        )
+
+    def step(self, action: Union[str, int], *args, **kwargs) -> Observations:
+        if isinstance(action, str):
+            action = MockSimActions[action]
+
+        self._collided = False
+        if action == MockSimActions.MOVE_FORWARD:
+            position = (
+                self._position
+                + self.habitat_config.FORWARD_STEP_SIZE * self._get_forward()
+            )
+            half_size = self.scene_size / 2
+            self._collided = bool(np.any(np.abs(position) > half_size))
+            self._position = np.clip(position, -half_size, half_size).astype(
+                np.float32
+            )
+        elif action in (
+            MockSimActions.TURN_LEFT,
+            MockSimActions.TURN_RIGHT,
+        ):
+            turn_angle = np.deg2rad(self.habitat_config.TURN_ANGLE)
+            if action == MockSimActions.TURN_RIGHT:
+                turn_angle = -turn_angle
+            self._rotation = (
+                quaternion.from_rotation_vector(turn_angle * self.up_vector)
+                * self._rotation
+            )
+
+        return self._sensor_suite.get_observations(
+            self._get_sensor_observations()
+        )
+
+    def render(self, mode: str = "rgb") -> Any:
+        observations = self._sensor_suite.get_observations(
+            self._get_sensor_observations()
+        )
+        output = observations.get(mode)
+        assert output is not None, "mode {} sensor is not active".format(mode)
+        return output
+
+    def get_agent_state(self, agent_id: int = 0) -> AgentState:
+        assert agent_id == 0, "No support of multi agent in {} yet.".format(
+            self.__class__.__name__
+        )
+        return AgentState(self._position.copy(), self._rotation)
+
+    def set_agent_state(
+        self,
+        position: List[float],
+        rotation: Union[List[float], quaternion.quaternion],
+        agent_id: int = 0,
+        reset_sensors: bool = True,
+    ) -> bool:
+        assert agent_id == 0, "No support of multi agent in {} yet.".format(
+            self.__class__.__name__
+        )
+        if not isinstance(rotation, quaternion.quaternion):
+            rotation = quaternion_from_coeff(rotation)
+        self._position = np.array(position, dtype=np.float32)
+        self._rotation = rotation
+        return True
+
+    def get_observations_at(
+        self,
+        position: Optional[List[float]] = None,
+        rotation: Optional[List[float]] = None,
+        keep_agent_at_new_pose: bool = False,
+    ) -> Optional[Observations]:
+        current_state = self.get_agent_state()
+        if position is not None and rotation is not None:
+            self.set_agent_state(position, rotation)
+
+        observations = self._sensor_suite.get_observations(
+            self._get_sensor_observations()
+        )
+        if not keep_agent_at_new_pose:
+            self.set_agent_state(
+                current_state.position, current_state.rotation
+            )
+        return observations
+
+    def geodesic_distance(
+        self,
+        position_a: Union[Sequence[float], np.ndarray],
+        position_b: Union[
+            Sequence[float], Sequence[Sequence[float]], np.ndarray
+        ],
+        episode: Optional[Episode] = None,
+    ) -> float:
+        position_b = np.array(position_b, dtype=np.float32).reshape(-1, 3)
+        return float(
+            np.linalg.norm(
+                position_b - np.array(position_a, dtype=np.float32), axis=1
+            ).min()
+        )
+
+    def get_straight_shortest_path_points(self, position_a, position_b):
+        return [position_a, position_b]
+
+    def sample_navigable_point(self) -> List[float]:
+        half_size = self.scene_size / 2
+        x, z = self._rng.uniform(-half_size, half_size, size=2)
+        return [float(x), 0.0, float(z)]
+
+    def is_navigable(self, point: List[float]) -> bool:
+        half_size = self.scene_size / 2
+        return bool(
+            abs(point[1]) < 0.5
+            and abs(point[0]) <= half_size
+            and abs(point[2]) <= half_size
+        )
+
+    def island_radius(self, position: Sequence[float]) -> float:
+        return self.scene_size / 2
+
+    @property
+    def up_vector(self) -> np.ndarray:
+        return np.array([0.0, 1.0, 0.0])
+
+    @property
+    def forward_vector(self) -> np.ndarray:
+        return -np.array([0.0, 0.0, 1.0])
+
+    @property
+    def previous_step_collided(self) -> bool:
+        return self._collided
+
+
+def make_mock_dataset(config: Config, num_episodes: int = 16) -> Dataset:
+    r"""Generates a pointnav dataset on the floor of the mock simulator.
+
+    :param config: config with the mock :py:`SIMULATOR`.
+    :param num_episodes: number of episodes to generate.
+    :return: the dataset of straight line episodes.
+    """
+    from habitat.datasets.pointnav.pointnav_dataset import PointNavDatasetV1
+    from habitat.datasets.pointnav.pointnav_generator import (
+        generate_pointnav_episode,
+    )
+    from habitat.sims import make_sim
+
+    np.random.seed(config.SEED)
+    with make_sim(config.SIMULATOR.TYPE, config=config.SIMULATOR) as sim:
+        dataset = PointNavDatasetV1()
+        dataset.episodes = list(
+            generate_pointnav_episode(
+                sim,
+                num_episodes=num_episodes,
+                is_gen_shortest_path=False,
+                geodesic_to_euclid_min_ratio=0.0,
+            )
+        )
+    return dataset
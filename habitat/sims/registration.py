@@ -7,6 +7,7 @@
 from habitat.core.logging import logger
 from habitat.core.registry import registry
 from habitat.sims.habitat_simulator import _try_register_habitat_sim
+from habitat.sims.mock import _try_register_mock_sim
 from habitat.sims.pyrobot import _try_register_pyrobot
 
 
@@ -21,3 +22,4 @@ def make_sim(id_sim, **kwargs):
 
 _try_register_habitat_sim()
 _try_register_pyrobot()
+_try_register_mock_sim()
@@ -709,6 +709,7 @@ class TopDownMap(Measure):
         self._ind_y_min: Optional[int] = None
         self._ind_y_max: Optional[int] = None
         self._previous_xy_location: Optional[Tuple[int, int]] = None
+        self._previous_fog_of_war_view: Optional[Tuple[int, int, int]] = None
         self._top_down_map: Optional[np.ndarray] = None
         self._shortest_path_points: Optional[List[Tuple[int, int]]] = None
         self.line_thickness = int(
@@ -733,6 +734,7 @@ class TopDownMap(Measure):
             self._fog_of_war_mask = np.zeros_like(top_down_map)
         else:
             self._fog_of_war_mask = None
+        self._previous_fog_of_war_view = None
 
         return top_down_map
 
@@ -939,16 +941,30 @@ class TopDownMap(Measure):
 
     def update_fog_of_war_mask(self, agent_position):
         if self._config.FOG_OF_WAR.DRAW:
+            current_angle = self.get_polar_angle()
+            max_line_len = self._config.FOG_OF_WAR.VISIBILITY_DIST / (
+                maps.calculate_meters_per_pixel(
+                    self._map_resolution, sim=self._sim
+                )
+            )
+            # Walls of the map do not change within an episode, so the
+            # revealed area only changes with the agent cell and heading
+            fog_of_war_view = (
+                int(agent_position[0]),
+                int(agent_position[1]),
+                fog_of_war.get_heading_bucket(current_angle, max_line_len),
+            )
+            if fog_of_war_view == self._previous_fog_of_war_view:
+                return
+            self._previous_fog_of_war_view = fog_of_war_view
+
             self._fog_of_war_mask = fog_of_war.reveal_fog_of_war(
                 self._top_down_map,
                 self._fog_of_war_mask,
                 agent_position,
-                self.get_polar_angle(),
+                current_angle,
                 fov=self._config.FOG_OF_WAR.FOV,
-                max_line_len=self._config.FOG_OF_WAR.VISIBILITY_DIST
-                / maps.calculate_meters_per_pixel(
-                    self._map_resolution, sim=self._sim
-                ),
+                max_line_len=max_line_len,
             )
 
 
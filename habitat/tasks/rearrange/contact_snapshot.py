@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Any, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+CONTACT_DTYPE = np.dtype(
+    [
+        ("object_id_a", np.int64),
+        ("object_id_b", np.int64),
+        ("link_id_a", np.int64),
+        ("link_id_b", np.int64),
+        ("normal_force", np.float64),
+        ("contact_distance", np.float64),
+    ]
+)
+
+ObjectIds = Union[int, Iterable[int]]
+
+
+class ContactSnapshot:
+    """
+    The contact points of a physics step as a structured array of
+    `CONTACT_DTYPE`, with vectorized queries on them. Queries return boolean
+    masks over the contacts, which can be combined before calling
+    `get_max_force` or indexing `contacts`.
+
+    :param contacts: The contact points.
+    """
+
+    def __init__(self, contacts: np.ndarray):
+        self.contacts = contacts
+
+    @classmethod
+    def from_contact_points(
+        cls, contact_points: Sequence[Any]
+    ) -> "ContactSnapshot":
+        """
+        :param contact_points: The contact points of the simulator, from
+            `get_physics_contact_points`.
+        """
+        return cls(
+            np.array(
+                [
+                    (
+                        c.object_id_a,
+                        c.object_id_b,
+                        c.link_id_a,
+                        c.link_id_b,
+                        c.normal_force,
+                        c.contact_distance,
+                    )
+                    for c in contact_points
+                ],
+                dtype=CONTACT_DTYPE,
+            )
+        )
+
+    def __len__(self) -> int:
+        return len(self.contacts)
+
+    @property
+    def object_ids_a(self) -> np.ndarray:
+        return self.contacts["object_id_a"]
+
+    @property
+    def object_ids_b(self) -> np.ndarray:
+        return self.contacts["object_id_b"]
+
+    def involves(self, object_ids: ObjectIds) -> np.ndarray:
+        """
+        Mask of the contacts where either side is one of `object_ids`.
+        """
+        object_ids = np.atleast_1d(np.asarray(object_ids, dtype=np.int64))
+        return np.isin(self.object_ids_a, object_ids) | np.isin(
+            self.object_ids_b, object_ids
+        )
+
+    def involves_links(
+        self, object_id: int, link_ids: Iterable[int]
+    ) -> np.ndarray:
+        """
+        Mask of the contacts with one of the links `link_ids` of the object
+        `object_id`. As for `get_match_link`, only side A is considered when
+        both sides are the object.
+        """
+        link_ids = np.asarray(list(link_ids), dtype=np.int64)
+        is_a = self.object_ids_a == object_id
+        is_b = ~is_a & (self.object_ids_b == object_id)
+        return (is_a & np.isin(self.contacts["link_id_a"], link_ids)) | (
+            is_b & np.isin(self.contacts["link_id_b"], link_ids)
+        )
+
+    def get_links(self, object_id: int) -> np.ndarray:
+        """
+        The links of `object_id` in contact with anything.
+        """
+        return np.unique(
+            np.concatenate(
+                [
+                    self.contacts["link_id_a"][self.object_ids_a == object_id],
+                    self.contacts["link_id_b"][self.object_ids_b == object_id],
+                ]
+            )
+        )
+
+    def get_other_ids(
+        self, object_id: int, mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        For the contacts involving `object_id`, the id of the other side of
+        the contact, in the order of the contacts.
+        """
+        contacts = self.contacts if mask is None else self.contacts[mask]
+        is_a = contacts["object_id_a"] == object_id
+        other_ids = np.where(
+            is_a, contacts["object_id_b"], contacts["object_id_a"]
+        )
+        return other_ids[is_a | (contacts["object_id_b"] == object_id)]
+
+    def get_max_force(self, mask: Optional[np.ndarray] = None) -> float:
+        """
+        The maximum absolute normal force of the contacts, 0 without contacts.
+        """
+        forces = self.contacts["normal_force"]
+        if mask is not None:
+            forces = forces[mask]
+        if len(forces) == 0:
+            return 0
+        return float(np.abs(forces).max())
+
+    def get_object_max_force(self, object_id: Optional[int]) -> float:
+        """
+        The maximum absolute normal force of the contacts of `object_id` with
+        other objects, 0 without contacts or if `object_id` is `None`.
+        """
+        if object_id is None:
+            return 0
+        return self.get_max_force(
+            self.involves(object_id) & (self.object_ids_a != self.object_ids_b)
+        )
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import os
+import os.path as osp
+import shutil
+import tempfile
+import uuid
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Decimals of the transforms and joint states in the keys, so that the
+# numerical noise of the physics does not change the key.
+KEY_DECIMALS = 4
+
+
+class NavMeshCache:
+    """
+    Cache of the NavMeshes computed for the scene layouts, so that an episode
+    reset only loads a NavMesh when its layout was already seen.
+
+    NavMeshes are kept in memory for the `max_size` most recently used
+    layouts. If `cache_dir` is set, they are also stored there as
+    `<key>.navmesh` files, which are written atomically so that workers of the
+    same node can share the directory.
+
+    :param max_size: Number of NavMeshes kept in memory, 0 to only use
+        `cache_dir`.
+    :param cache_dir: Directory of the on-disk store, `None` to not use it.
+    """
+
+    def __init__(self, max_size: int = 8, cache_dir: Optional[str] = None):
+        self._max_size = max_size
+        self._cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._navmeshes: "OrderedDict[str, bytes]" = OrderedDict()
+        # Directory for the NavMesh files exchanged with the pathfinder, which
+        # can only load and save files.
+        self._tmp_dir: Optional[str] = None
+
+    @staticmethod
+    def get_key(
+        scene_id: str,
+        objects: Iterable[Tuple[str, Any, Optional[Any]]],
+        navmesh_settings: Any,
+    ) -> str:
+        """
+        Returns the key of a scene layout.
+
+        :param scene_id: The scene of the layout.
+        :param objects: The objects included in the NavMesh as
+            (handle, transformation, joint positions) tuples, the joint
+            positions are `None` for rigid objects.
+        :param navmesh_settings: The settings of the NavMesh computation.
+        """
+        key_hash = hashlib.sha1(scene_id.encode("utf-8"))
+        for handle, transformation, joint_positions in sorted(
+            objects, key=lambda obj: obj[0]
+        ):
+            key_hash.update(handle.encode("utf-8"))
+            for values in (transformation, joint_positions):
+                if values is None:
+                    continue
+                # Adding 0.0 turns -0.0 into 0.0
+                values = (
+                    np.round(
+                        np.asarray(values, dtype=np.float64), KEY_DECIMALS
+                    )
+                    + 0.0
+                )
+                key_hash.update(values.tobytes())
+        settings = {
+            name: getattr(navmesh_settings, name)
+            for name in dir(navmesh_settings)
+            if not name.startswith("_")
+            and not callable(getattr(navmesh_settings, name))
+        }
+        key_hash.update(repr(sorted(settings.items())).encode("utf-8"))
+        return key_hash.hexdigest()
+
+    def _get_tmp_path(self) -> str:
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix="navmesh_cache_")
+        return osp.join(self._tmp_dir, "navmesh.navmesh")
+
+    def _get_disk_path(self, key: str) -> str:
+        assert self._cache_dir is not None
+        return osp.join(self._cache_dir, f"{key}.navmesh")
+
+    def _add(self, key: str, navmesh: bytes) -> None:
+        if self._max_size <= 0:
+            return
+        self._navmeshes[key] = navmesh
+        self._navmeshes.move_to_end(key)
+        while len(self._navmeshes) > self._max_size:
+            self._navmeshes.popitem(last=False)
+
+    def load(self, key: str, pathfinder: Any) -> bool:
+        """
+        Loads the cached NavMesh of a layout into the pathfinder.
+
+        :return: Whether the NavMesh was in the cache.
+        """
+        if key in self._navmeshes:
+            self._navmeshes.move_to_end(key)
+            tmp_path = self._get_tmp_path()
+            with open(tmp_path, "wb") as f:
+                f.write(self._navmeshes[key])
+            return pathfinder.load_nav_mesh(tmp_path)
+
+        if self._cache_dir is None:
+            return False
+        disk_path = self._get_disk_path(key)
+        if not osp.exists(disk_path) or not pathfinder.load_nav_mesh(
+            disk_path
+        ):
+            return False
+        with open(disk_path, "rb") as f:
+            self._add(key, f.read())
+        return True
+
+    def save(self, key: str, pathfinder: Any) -> None:
+        """
+        Caches the NavMesh of the pathfinder for a layout.
+        """
+        tmp_path = self._get_tmp_path()
+        pathfinder.save_nav_mesh(tmp_path)
+        with open(tmp_path, "rb") as f:
+            navmesh = f.read()
+        self._add(key, navmesh)
+
+        if self._cache_dir is not None:
+            disk_path = self._get_disk_path(key)
+            # Other workers never see a partially written file
+            disk_tmp_path = f"{disk_path}.{uuid.uuid4().hex}.tmp"
+            with open(disk_tmp_path, "wb") as f:
+                f.write(navmesh)
+            os.replace(disk_tmp_path, disk_path)
+
+    def close(self) -> None:
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+        self._navmeshes.clear()
@@ -15,7 +15,9 @@ from habitat.config.default import Config
 from habitat.core.registry import registry
 from habitat.core.simulator import Observations
 from habitat.sims.habitat_simulator.habitat_simulator import HabitatSim
+from habitat.tasks.rearrange.contact_snapshot import ContactSnapshot
 from habitat.tasks.rearrange.marker_info import MarkerInfo
+from habitat.tasks.rearrange.navmesh_cache import NavMeshCache
 from habitat.tasks.rearrange.utils import (
     IkHelper,
     get_nav_mesh_settings,
@@ -39,6 +41,13 @@ class RearrangeSim(HabitatSim):
         self._should_render_debug = False
         self.ep_info: Optional[Config] = None
         self.prev_loaded_navmesh = None
+        navmesh_cache_dir = self.habitat_config.get("NAVMESH_CACHE_DIR", "")
+        self._navmesh_cache = NavMeshCache(
+            self.habitat_config.get("NAVMESH_CACHE_SIZE", 8),
+            navmesh_cache_dir if navmesh_cache_dir else None,
+        )
+        # Key of the scene layout of the NavMesh in the pathfinder
+        self._navmesh_key: Optional[str] = None
         self.prev_scene_id = None
         self._is_pb_installed = is_pb_installed()
 
@@ -67,6 +76,8 @@ class RearrangeSim(HabitatSim):
         self._markers: Dict[str, MarkerInfo] = {}
 
         self._ik_helper: Optional[IkHelper] = None
+        # Contact points of the last physics step, captured on first use
+        self._contact_snapshot: Optional[ContactSnapshot] = None
 
         # Disables arm control. Useful if you are hiding the arm to perform
         # some scene sensing.
@@ -159,6 +170,7 @@ class RearrangeSim(HabitatSim):
         self.ref_handle_to_rigid_obj_id = {}
 
         self.ep_info = ep_info
+        self._contact_snapshot = None
         self._try_acquire_context()
 
         if self.prev_scene_id != ep_info["scene_id"]:
@@ -261,30 +273,72 @@ class RearrangeSim(HabitatSim):
                 ao: ao.joint_positions for ao in self.art_objs
             }
 
+    def _get_navmesh_art_objs(
+        self,
+    ) -> List[habitat_sim.physics.ManagedArticulatedObject]:
+        """The articulated objects included in the NavMesh. The robot is left
+        out, it moves every episode and must not block its own paths.
+        """
+        robot_id = self.robot.sim_obj.object_id
+        return [ao for ao in self.art_objs if ao.object_id != robot_id]
+
+    def _get_navmesh_key(self) -> str:
+        """Key of the current scene layout in the NavMesh cache. The
+        NavMesh depends on the articulated objects, except for the robot, and
+        the STATIC rigid objects.
+        """
+        rom = self.get_rigid_object_manager()
+        static_objs = [
+            (ro.handle, ro.transformation, None)
+            for ro in rom.get_objects_by_handle_substring().values()
+            if ro.motion_type == MotionType.STATIC
+        ]
+        art_objs = [
+            (ao.handle, ao.transformation, ao.joint_positions)
+            for ao in self._get_navmesh_art_objs()
+        ]
+        return NavMeshCache.get_key(
+            f"{self.habitat_config.SCENE_DATASET}:{self.ep_info['scene_id']}",
+            art_objs + static_objs,
+            self.navmesh_settings,
+        )
+
     def _recompute_navmesh(self):
         """Generates the navmesh on the fly. This must be called
         AFTER adding articulated objects to the scene.
+
+        The NavMesh is only computed when the scene layout is not in the
+        NavMesh cache, and not even loaded when it did not change since the
+        previous call.
         """
+        navmesh_key = self._get_navmesh_key()
+        if navmesh_key == self._navmesh_key:
+            return
+
+        if not self._navmesh_cache.load(navmesh_key, self.pathfinder):
+            # cache current motiontype and set to STATIC for inclusion in the NavMesh computation
+            navmesh_art_objs = self._get_navmesh_art_objs()
+            motion_types = []
+            for art_obj in navmesh_art_objs:
+                motion_types.append(art_obj.motion_type)
+                art_obj.motion_type = MotionType.STATIC
+            # compute new NavMesh
+            self.recompute_navmesh(
+                self.pathfinder,
+                self.navmesh_settings,
+                include_static_objects=True,
+            )
+            # reset cached MotionTypes
+            for art_obj, motion_type in zip(navmesh_art_objs, motion_types):
+                art_obj.motion_type = motion_type
+            self._navmesh_cache.save(navmesh_key, self.pathfinder)
+        self._navmesh_key = navmesh_key
 
-        # cache current motiontype and set to STATIC for inclusion in the NavMesh computation
-        motion_types = []
-        for art_obj in self.art_objs:
-            motion_types.append(art_obj.motion_type)
-            art_obj.motion_type = MotionType.STATIC
-        # compute new NavMesh
-        self.recompute_navmesh(
-            self.pathfinder,
-            self.navmesh_settings,
-            include_static_objects=True,
-        )
         # optionally save the new NavMesh
         if self.habitat_config.get("SAVE_NAVMESH", False):
             scene_name = self.ep_info["scene_id"]
             inferred_path = scene_name.split(".glb")[0] + ".navmesh"
             self.pathfinder.save_nav_mesh(inferred_path)
-        # reset cached MotionTypes
-        for art_obj, motion_type in zip(self.art_objs, motion_types):
-            art_obj.motion_type = motion_type
 
     def _clear_objects(self, should_add_objects: bool) -> None:
         if should_add_objects:
@@ -451,6 +505,10 @@ class RearrangeSim(HabitatSim):
             else:
                 self.grasp_mgr.desnap(True)
 
+    def close(self, destroy: bool = True) -> None:
+        self._navmesh_cache.close()
+        super().close(destroy)
+
     def step(self, action: Union[str, int]) -> Observations:
         rom = self.get_rigid_object_manager()
 
@@ -563,11 +621,27 @@ class RearrangeSim(HabitatSim):
         # optionally step physics and update the robot for benchmarking purposes
         if self.habitat_config.get("STEP_PHYSICS", True):
             self.step_world(dt)
+            self._contact_snapshot = None
             if self.robot is not None and self.habitat_config.get(
                 "UPDATE_ROBOT", True
             ):
                 self.robot.update()
 
+    def perform_discrete_collision_detection(self) -> None:
+        super().perform_discrete_collision_detection()
+        self._contact_snapshot = None
+
+    def get_contact_snapshot(self) -> ContactSnapshot:
+        """Get the contact points of the last physics step. They are only
+        converted from `get_physics_contact_points` once per step, which the
+        collision checks and measures of a step share.
+        """
+        if self._contact_snapshot is None:
+            self._contact_snapshot = ContactSnapshot.from_contact_points(
+                self.get_physics_contact_points()
+            )
+        return self._contact_snapshot
+
     def get_targets(self) -> Tuple[np.ndarray, np.ndarray]:
         """Get a mapping of object ids to goal positions for rearrange targets.
 
@@ -11,8 +11,19 @@ import numpy as np
 from habitat.core.dataset import Episode
 from habitat.core.registry import registry
 from habitat.tasks.rearrange.rearrange_task import RearrangeTask
-from habitat.tasks.rearrange.utils import CacheHelper, rearrange_collision
-from habitat.tasks.utils import get_angle
+from habitat.tasks.rearrange.utils import (
+    CacheHelper,
+    KeyedCacheHelper,
+    rearrange_collision,
+)
+
+# Number of candidate base positions drawn when generating a start position,
+# and the size of the batches in which they are drawn.
+START_POS_TIMEOUT = 1000
+START_POS_BATCH_SIZE = 100
+# Maximum distance of the start position to the navigable point closest to
+# the target.
+START_POS_DIST_THRESH = 0.1
 
 
 @registry.register_task(name="RearrangePickTask-v0")
@@ -32,8 +43,14 @@ class RearrangePickTaskV1(RearrangeTask):
 
         fname = data_path.split("/")[-1].split(".")[0]
 
-        self.cache = CacheHelper(
-            "start_pos", cache_name, {}, verbose=False, rel_dir=fname
+        self.cache = KeyedCacheHelper(
+            "start_pos", cache_name, verbose=False, rel_dir=fname
+        )
+        # Start states cached before the cache was keyed
+        self.cache.import_cache(
+            CacheHelper(
+                "start_pos", cache_name, {}, verbose=False, rel_dir=fname
+            )
         )
         self.start_states = self.cache.load()
         self.prev_colls = None
@@ -45,6 +62,44 @@ class RearrangePickTaskV1(RearrangeTask):
     def _get_targ_pos(self, sim):
         return sim.get_target_objs_start()
 
+    def _sample_start_pos(self, targ_pos, orig_start_pos, num_samples):
+        """
+        Draws noisy base positions around `orig_start_pos`, with the angles
+        facing `targ_pos`.
+
+        :return: The positions, angles and whether the positions are close
+            enough to `orig_start_pos`.
+        """
+        start_pos = orig_start_pos + np.random.normal(
+            0, self._config.BASE_NOISE, size=(num_samples, 3)
+        )
+
+        rel_targ = (targ_pos - start_pos)[:, [0, 2]]
+        rel_targ_norm = np.linalg.norm(rel_targ, axis=1)
+        rel_targ_norm[rel_targ_norm == 0] = 1.0
+        # Angle with the forward direction [1, 0], negated as in get_angle
+        # when the cross product with forward is positive.
+        angle_to_obj = np.arccos(
+            np.clip(rel_targ[:, 0] / rel_targ_norm, -1.0, 1.0)
+        )
+        angle_to_obj[rel_targ[:, 1] > 0] *= -1.0
+
+        targ_dist = np.linalg.norm(
+            (start_pos - orig_start_pos)[:, [0, 2]], axis=1
+        )
+        return start_pos, angle_to_obj, targ_dist <= START_POS_DIST_THRESH
+
+    def _is_start_pos_colliding(self, sim, is_easy_init):
+        did_collide, details = rearrange_collision(
+            sim,
+            self._config.COUNT_OBJ_COLLISIONS,
+            ignore_base=False,
+        )
+        if is_easy_init:
+            # Only care about collisions between the robot and scene.
+            did_collide = details.robot_scene_colls != 0
+        return did_collide
+
     def _gen_start_pos(self, sim, is_easy_init):
         target_positions = self._get_targ_pos(sim)
         if self.force_set_idx is not None:
@@ -57,64 +112,63 @@ class RearrangePickTaskV1(RearrangeTask):
 
         state = sim.capture_state()
         start_pos = orig_start_pos
-
-        forward = np.array([1.0, 0, 0])
-        dist_thresh = 0.1
-        did_collide = False
+        angle_to_obj = 0.0
+        found = False
 
         # Add noise to the base position and angle for a collision free
-        # starting position
-        timeout = 1000
-        attempt = 0
-        while attempt < timeout:
-            attempt += 1
-            start_pos = orig_start_pos + np.random.normal(
-                0, self._config.BASE_NOISE, size=(3,)
+        # starting position. Candidates are drawn in batches and go through
+        # the checks from the cheapest to the most expensive: distance,
+        # navigability, overlap in the initial pose, then collisions while
+        # stepping physics.
+        for _ in range(START_POS_TIMEOUT // START_POS_BATCH_SIZE):
+            start_poses, angles_to_obj, is_close = self._sample_start_pos(
+                targ_pos, orig_start_pos, START_POS_BATCH_SIZE
             )
-
-            rel_targ = targ_pos - start_pos
-            angle_to_obj = get_angle(forward[[0, 2]], rel_targ[[0, 2]])
-            if np.cross(forward[[0, 2]], rel_targ[[0, 2]]) > 0:
-                angle_to_obj *= -1.0
-
-            targ_dist = np.linalg.norm((start_pos - orig_start_pos)[[0, 2]])
-
-            is_navigable = is_easy_init or sim.pathfinder.is_navigable(
-                start_pos
+            rot_noises = np.random.normal(
+                0.0, self._config.BASE_ANGLE_NOISE, size=START_POS_BATCH_SIZE
             )
-
-            if targ_dist > dist_thresh or not is_navigable:
-                continue
-
-            sim.set_state(state)
-
-            sim.robot.base_pos = start_pos
-
-            # Face the robot towards the object.
-            rot_noise = np.random.normal(0.0, self._config.BASE_ANGLE_NOISE)
-            sim.robot.base_rot = angle_to_obj + rot_noise
-
-            # Make sure the robot is not colliding with anything in this
-            # position.
-            for _ in range(100):
-                sim.internal_step(-1)
-                did_collide, details = rearrange_collision(
-                    self._sim,
-                    self._config.COUNT_OBJ_COLLISIONS,
-                    ignore_base=False,
-                )
-
-                if is_easy_init:
-                    # Only care about collisions between the robot and scene.
-                    did_collide = details.robot_scene_colls != 0
-
-                if did_collide:
+            for start_pos, angle_to_obj, rot_noise in zip(
+                start_poses[is_close],
+                angles_to_obj[is_close],
+                rot_noises[is_close],
+            ):
+                if not is_easy_init and not sim.pathfinder.is_navigable(
+                    start_pos
+                ):
+                    continue
+
+                sim.set_state(state)
+
+                sim.robot.base_pos = start_pos
+
+                # Face the robot towards the object.
+                sim.robot.base_rot = angle_to_obj + rot_noise
+
+                # Reject the poses overlapping the scene without stepping
+                # physics.
+                sim.perform_discrete_collision_detection()
+                if self._is_start_pos_colliding(sim, is_easy_init):
+                    continue
+
+                # Make sure the robot is not colliding with anything in this
+                # position.
+                did_collide = False
+                for _ in range(100):
+                    sim.internal_step(-1)
+                    did_collide = self._is_start_pos_colliding(
+                        sim, is_easy_init
+                    )
+                    if did_collide:
+                        break
+
+                if not did_collide:
+                    found = True
                     break
 
-            if not did_collide:
+            if found:
                 break
 
-        if attempt == timeout - 1 and (not is_easy_init):
+        if not found and not is_easy_init:
             start_pos, angle_to_obj, sel_idx = self._gen_start_pos(sim, True)
 
         sim.set_state(state)
@@ -146,6 +200,15 @@ class RearrangePickTaskV1(RearrangeTask):
         self.prev_colls = 0
         episode_id = sim.ep_info["episode_id"]
 
+        if (
+            episode_id not in self.start_states
+            and not self._config.FORCE_REGENERATE
+        ):
+            # Another worker sharing the cache may have generated it
+            start_state = self.cache.get(episode_id)
+            if start_state is not None:
+                self.start_states[episode_id] = start_state
+
         if (
             episode_id in self.start_states
             and not self._config.FORCE_REGENERATE
@@ -156,7 +219,7 @@ class RearrangePickTaskV1(RearrangeTask):
                 sim, self._config.EASY_INIT
             )
             self.start_states[episode_id] = (start_pos, start_rot, sel_idx)
-            self.cache.save(self.start_states)
+            self.cache.save(episode_id, self.start_states[episode_id])
 
         sim.robot.base_pos = start_pos
         sim.robot.base_rot = start_rot
@@ -8,8 +8,9 @@ import hashlib
 import os
 import os.path as osp
 import pickle
+import sqlite3
 import time
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import attr
 import gym
@@ -94,64 +95,56 @@ def rearrange_collision(
 ):
     """Defines what counts as a collision for the Rearrange environment execution"""
     robot_model = sim.robot
-    colls = sim.get_physics_contact_points()
+    contacts = sim.get_contact_snapshot()
     robot_id = robot_model.get_robot_sim_id()
     added_objs = sim.scene_obj_ids
     snapped_obj_id = sim.grasp_mgr.snap_idx
 
-    def should_keep(x):
-        if ignore_base:
-            match_link = get_match_link(x, robot_id)
-            if match_link is not None and robot_model.is_base_link(match_link):
-                return False
-
-        if ignore_names is not None:
-            should_ignore = any(
-                coll_name_matches(x, ignore_name)
-                for ignore_name in ignore_names
-            )
-            if should_ignore:
-                return False
-        return True
-
     # Filter out any collisions with the ignore objects
-    colls = list(filter(should_keep, colls))
-    robot_coll_ids = []
+    keep = np.ones(len(contacts), dtype=bool)
+    if ignore_base:
+        base_links = [
+            link
+            for link in contacts.get_links(robot_id).tolist()
+            if robot_model.is_base_link(link)
+        ]
+        keep &= ~contacts.involves_links(robot_id, base_links)
+    if ignore_names is not None:
+        keep &= ~contacts.involves(ignore_names)
 
     # Check for robot collision
-    robot_obj_colls = 0
-    robot_scene_colls = 0
-    robot_scene_matches = [c for c in colls if coll_name_matches(c, robot_id)]
-    for match in robot_scene_matches:
-        reg_obj_coll = any(
-            [coll_name_matches(match, obj_id) for obj_id in added_objs]
-        )
-        if reg_obj_coll:
-            robot_obj_colls += 1
-        else:
-            robot_scene_colls += 1
-
-        if match.object_id_a == robot_id:
-            robot_coll_ids.append(match.object_id_b)
-        else:
-            robot_coll_ids.append(match.object_id_a)
+    robot_matches = keep & contacts.involves(robot_id)
+    robot_obj_colls = int(
+        (robot_matches & contacts.involves(added_objs)).sum()
+    )
+    robot_scene_colls = int(robot_matches.sum()) - robot_obj_colls
 
     # Checking for holding object collision
     obj_scene_colls = 0
     if count_obj_colls and snapped_obj_id is not None:
-        matches = [c for c in colls if coll_name_matches(c, snapped_obj_id)]
-        for match in matches:
-            if coll_name_matches(match, robot_id):
-                continue
-            obj_scene_colls += 1
+        obj_scene_colls = int(
+            (
+                keep
+                & contacts.involves(snapped_obj_id)
+                & ~contacts.involves(robot_id)
+            ).sum()
+        )
 
     if get_extra_coll_data:
+        kept_contacts = contacts.contacts[keep]
         coll_details = CollisionDetails(
             obj_scene_colls=min(obj_scene_colls, 1),
             robot_obj_colls=min(robot_obj_colls, 1),
             robot_scene_colls=min(robot_scene_colls, 1),
-            robot_coll_ids=robot_coll_ids,
-            all_colls=[(x.object_id_a, x.object_id_b) for x in colls],
+            robot_coll_ids=contacts.get_other_ids(
+                robot_id, robot_matches
+            ).tolist(),
+            all_colls=list(
+                zip(
+                    kept_contacts["object_id_a"].tolist(),
+                    kept_contacts["object_id_b"].tolist(),
+                )
+            ),
         )
     else:
         coll_details = CollisionDetails(
@@ -277,6 +270,118 @@ class CacheHelper:
             pickle.dump(val, f)
 
 
+class KeyedCacheHelper:
+    """
+    Store of pickled values by key, which processes can share: every value
+    is written on its own in a sqlite database, so writes do not grow with
+    the size of the cache and readers never see a partial write.
+
+    The cache file is named like for `CacheHelper`.
+    """
+
+    def __init__(self, cache_name, lookup_val, verbose=False, rel_dir=""):
+        self.use_cache_path = osp.join(CACHE_PATH, rel_dir)
+        os.makedirs(self.use_cache_path, exist_ok=True)
+        sec_hash = hashlib.md5(str(lookup_val).encode("utf-8")).hexdigest()
+        cache_id = f"{cache_name}_{sec_hash}.sqlite"
+        self.cache_id = osp.join(self.use_cache_path, cache_id)
+        self.verbose = verbose
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        # Connections cannot be shared with forked processes
+        if self._conn is None or self._conn_pid != os.getpid():
+            if self.verbose:
+                print("Opening cache @", self.cache_id)
+            self._conn = sqlite3.connect(
+                self.cache_id, timeout=60.0, isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache"
+                " (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+            # Caches already imported with import_cache
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS imported_caches"
+                " (cache_id TEXT PRIMARY KEY)"
+            )
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        state["_conn_pid"] = None
+        return state
+
+    def get(self, key, def_val=None):
+        row = (
+            self._get_conn()
+            .execute("SELECT value FROM cache WHERE key = ?", (str(key),))
+            .fetchone()
+        )
+        if row is None:
+            return def_val
+        return pickle.loads(row[0])
+
+    def load(self) -> Dict[str, Any]:
+        return {
+            key: pickle.loads(value)
+            for key, value in self._get_conn().execute(
+                "SELECT key, value FROM cache"
+            )
+        }
+
+    def save(self, key, val) -> None:
+        self.update({key: val})
+
+    def update(self, vals: Dict[Any, Any]) -> None:
+        if self.verbose:
+            print("Saving", len(vals), "values to cache @", self.cache_id)
+        conn = self._get_conn()
+        with conn:
+            # A single transaction, so that vals are written all at once
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+                [(str(key), pickle.dumps(val)) for key, val in vals.items()],
+            )
+
+    def import_cache(self, cache: CacheHelper) -> None:
+        """
+        Adds the values of a `CacheHelper` holding a dict, without replacing
+        the values already in this cache. The cache is only loaded the first
+        time, it is then marked as imported.
+        """
+        conn = self._get_conn()
+        is_imported = conn.execute(
+            "SELECT 1 FROM imported_caches WHERE cache_id = ?",
+            (cache.cache_id,),
+        ).fetchone()
+        if is_imported is not None or not cache.exists():
+            return
+        vals = cache.load()
+        if self.verbose:
+            print("Importing", len(vals), "values to cache @", self.cache_id)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache (key, value) VALUES (?, ?)",
+                [(str(key), pickle.dumps(val)) for key, val in vals.items()],
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO imported_caches (cache_id) VALUES (?)",
+                (cache.cache_id,),
+            )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
 def reshape_obs_space(obs_space, new_shape):
     assert isinstance(obs_space, gym.spaces.Box)
     return gym.spaces.Box(
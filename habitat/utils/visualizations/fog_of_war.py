@@ -4,6 +4,9 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+from functools import lru_cache
+from typing import Tuple
+
 import numba
 import numpy as np
 
@@ -119,6 +122,135 @@ def _draw_loop(
         )
 
 
+def _get_num_rays(max_line_len: float) -> int:
+    # The angle step between rays is such that delta_angle * max_line_len = 1
+    return max(int(round(2 * np.pi * max_line_len)), 1)
+
+
+def get_heading_bucket(current_angle: float, max_line_len: float) -> int:
+    r"""Quantizes the look direction of the agent to the closest of the
+    fog-of-war rays, which are :py:`1 / max_line_len` apart.
+    """
+    num_rays = _get_num_rays(max_line_len)
+    return int(round(current_angle * num_rays / (2 * np.pi))) % num_rays
+
+
+@numba.jit(nopython=True)
+def _build_ray_table(max_line_len, num_rays):
+    origin = np.zeros(2, dtype=np.int64)
+    ray_ptr = np.zeros(num_rays + 1, dtype=np.int64)
+    xs = []
+    ys = []
+    for i in range(num_rays):
+        angle = 2 * np.pi * i / num_rays
+        for pt in bresenham_supercover_line(
+            origin,
+            max_line_len * np.array([np.cos(angle), np.sin(angle)]),
+        ):
+            xs.append(pt[0])
+            ys.append(pt[1])
+        ray_ptr[i + 1] = len(xs)
+
+    ray_offsets = np.empty((len(xs), 2), dtype=np.int32)
+    for j in range(len(xs)):
+        ray_offsets[j, 0] = xs[j]
+        ray_offsets[j, 1] = ys[j]
+
+    # Length of the prefix each ray shares with the previous one
+    shared_len = np.zeros(num_rays, dtype=np.int64)
+    for i in range(num_rays):
+        prev = (i - 1) % num_rays
+        n = min(ray_ptr[i + 1] - ray_ptr[i], ray_ptr[prev + 1] - ray_ptr[prev])
+        k = 0
+        while (
+            k < n
+            and ray_offsets[ray_ptr[i] + k, 0]
+            == ray_offsets[ray_ptr[prev] + k, 0]
+            and ray_offsets[ray_ptr[i] + k, 1]
+            == ray_offsets[ray_ptr[prev] + k, 1]
+        ):
+            k += 1
+        shared_len[i] = k
+    return ray_ptr, ray_offsets, shared_len
+
+
+@lru_cache(maxsize=8)
+def _get_ray_table(
+    max_line_len: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    r"""Returns the cells covered by the rays of a full circle of a given
+    length, relative to the agent. Ray :py:`i` is at the angle
+    :py:`2 * pi * i / num_rays`, so the fan of any field of view and heading
+    is a range of rays.
+
+    :return: :py:`(ray_ptr, ray_offsets, shared_len)`, the offsets of the
+        cells of ray :py:`i`, ordered from the agent outwards, are
+        :py:`ray_offsets[ray_ptr[i] : ray_ptr[i + 1]]`, and their first
+        :py:`shared_len[i]` cells are those of ray :py:`i - 1`.
+    """
+    return _build_ray_table(max_line_len, _get_num_rays(max_line_len))
+
+
+@numba.jit(nopython=True)
+def _reveal_visible_cells(
+    top_down_map,
+    fog_of_war_mask,
+    current_point,
+    ray_ptr,
+    ray_offsets,
+    shared_len,
+    first_ray,
+    num_fan_rays,
+):
+    num_rays = ray_ptr.shape[0] - 1
+    # Number of cells of the previous ray before its first blocked cell
+    prev_reach = 0
+    for r in range(num_fan_rays):
+        i = (first_ray + r) % num_rays
+        ray_len = ray_ptr[i + 1] - ray_ptr[i]
+        start = 0
+        if r > 0:
+            # The shared cells were walked along the previous ray, and the
+            # ray is blocked at the same cell if the previous one was
+            if prev_reach < shared_len[i]:
+                continue
+            start = shared_len[i]
+
+        reach = ray_len
+        for k in range(start, ray_len):
+            x = current_point[0] + ray_offsets[ray_ptr[i] + k, 0]
+            y = current_point[1] + ray_offsets[ray_ptr[i] + k, 1]
+
+            if (
+                x < 0
+                or x >= fog_of_war_mask.shape[0]
+                or y < 0
+                or y >= fog_of_war_mask.shape[1]
+                or top_down_map[x, y] == maps.MAP_INVALID_POINT
+            ):
+                reach = k
+                break
+
+            fog_of_war_mask[x, y] = 1
+        prev_reach = reach
+
+
+def _get_fan_rays(
+    current_angle: float, fov: float, max_line_len: float
+) -> Tuple[int, int]:
+    r"""Returns the first ray and the number of rays of the fan of a field
+    of view in radians around the quantized look direction.
+    """
+    num_rays = _get_num_rays(max_line_len)
+    num_fan_rays = min(
+        len(np.arange(-fov / 2, fov / 2, step=1.0 / max_line_len)), num_rays
+    )
+    first_ray = get_heading_bucket(current_angle, max_line_len) - int(
+        round(fov / 2 * num_rays / (2 * np.pi))
+    )
+    return first_ray % num_rays, num_fan_rays
+
+
 def reveal_fog_of_war(
     top_down_map: np.ndarray,
     current_fog_of_war_mask: np.ndarray,
@@ -129,8 +261,10 @@ def reveal_fog_of_war(
 ) -> np.ndarray:
     r"""Reveals the fog-of-war at the current location
 
-    This works by simply drawing lines from the agents current location
-    and stopping once a wall is hit
+    This works by casting a fan of lines from the agents current location
+    and stopping once a wall is hit. The cells covered by the lines are
+    precomputed per line length, and a line only walks the cells it does not
+    share with the previous line of the fan.
 
     Args:
         top_down_map: The current top down map.  Used for respecting walls when revealing
@@ -145,19 +279,21 @@ def reveal_fog_of_war(
     """
     fov = np.deg2rad(fov)
 
-    # Set the angle step to a value such that delta_angle * max_line_len = 1
-    angles = np.arange(
-        -fov / 2, fov / 2, step=1.0 / max_line_len, dtype=np.float32
-    )
+    # The rays are precomputed for the full circle once per line length,
+    # and the look direction is quantized to them
+    ray_ptr, ray_offsets, shared_len = _get_ray_table(float(max_line_len))
+    first_ray, num_fan_rays = _get_fan_rays(current_angle, fov, max_line_len)
 
     fog_of_war_mask = current_fog_of_war_mask.copy()
-    _draw_loop(
+    _reveal_visible_cells(
         top_down_map,
         fog_of_war_mask,
-        current_point,
-        current_angle,
-        max_line_len,
-        angles,
+        np.asarray(current_point, dtype=np.int64),
+        ray_ptr,
+        ray_offsets,
+        shared_len,
+        first_ray,
+        num_fan_rays,
     )
 
     return fog_of_war_mask
@@ -5,6 +5,7 @@
 # LICENSE file in the root directory of this source tree.
 
 import os
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import imageio
@@ -54,25 +55,18 @@ TOP_DOWN_MAP_COLORS[MAP_VIEW_POINT_INDICATOR] = [245, 150, 150]  # Light Red
 TOP_DOWN_MAP_COLORS[MAP_TARGET_BOUNDING_BOX] = [0, 175, 0]  # Green
 
 
-def draw_agent(
-    image: np.ndarray,
-    agent_center_coord: Tuple[int, int],
-    agent_rotation: float,
-    agent_radius_px: int = 5,
-) -> np.ndarray:
-    r"""Return an image with the agent image composited onto it.
-    Args:
-        image: the image onto which to put the agent.
-        agent_center_coord: the image coordinates where to paste the agent.
-        agent_rotation: the agent's current rotation in radians.
-        agent_radius_px: 1/2 number of pixels the agent will be resized to.
-    Returns:
-        The modified background image. This operation is in place.
-    """
+# Number of rotations of the agent sprite, the agent rotation is rounded to
+# the nearest one and the rotated sprites are cached
+AGENT_SPRITE_NUM_ROTATIONS = 360
 
+
+@lru_cache(maxsize=4 * AGENT_SPRITE_NUM_ROTATIONS)
+def _get_rotated_agent_sprite(
+    rotation_idx: int, agent_radius_px: int
+) -> np.ndarray:
     # Rotate before resize to keep good resolution.
     rotated_agent = scipy.ndimage.interpolation.rotate(
-        AGENT_SPRITE, agent_rotation * 180 / np.pi
+        AGENT_SPRITE, rotation_idx * 360.0 / AGENT_SPRITE_NUM_ROTATIONS
     )
     # Rescale because rotation may result in larger image than original, but
     # the agent sprite size should stay the same.
@@ -86,7 +80,50 @@ def draw_agent(
         (agent_size_px, agent_size_px),
         interpolation=cv2.INTER_LINEAR,
     )
-    utils.paste_overlapping_image(image, resized_agent, agent_center_coord)
+    resized_agent.setflags(write=False)
+    return resized_agent
+
+
+def get_rotated_agent_sprite(
+    agent_rotation: float, agent_radius_px: int = 5
+) -> np.ndarray:
+    r"""Return the agent sprite rotated and resized to be drawn on the map.
+    Args:
+        agent_rotation: the agent's current rotation in radians, rounded to
+            one of AGENT_SPRITE_NUM_ROTATIONS rotations.
+        agent_radius_px: 1/2 number of pixels the agent will be resized to.
+    Returns:
+        The cached RGBA sprite, which is read-only.
+    """
+    rotation_idx = (
+        int(
+            np.round(agent_rotation * AGENT_SPRITE_NUM_ROTATIONS / (2 * np.pi))
+        )
+        % AGENT_SPRITE_NUM_ROTATIONS
+    )
+    return _get_rotated_agent_sprite(rotation_idx, int(agent_radius_px))
+
+
+def draw_agent(
+    image: np.ndarray,
+    agent_center_coord: Tuple[int, int],
+    agent_rotation: float,
+    agent_radius_px: int = 5,
+) -> np.ndarray:
+    r"""Return an image with the agent image composited onto it.
+    Args:
+        image: the image onto which to put the agent.
+        agent_center_coord: the image coordinates where to paste the agent.
+        agent_rotation: the agent's current rotation in radians.
+        agent_radius_px: 1/2 number of pixels the agent will be resized to.
+    Returns:
+        The modified background image. This operation is in place.
+    """
+    utils.paste_overlapping_image(
+        image,
+        get_rotated_agent_sprite(agent_rotation, agent_radius_px),
+        agent_center_coord,
+    )
     return image
 
 
@@ -346,35 +383,61 @@ def get_topdown_map_from_sim(
     )
 
 
+@lru_cache(maxsize=8)
+def _get_fog_of_war_colors(
+    top_down_map_colors: bytes, fog_of_war_desat_amount: float
+) -> np.ndarray:
+    r"""Returns the colors of the indicator values hidden by the fog of war
+    followed by the colors of the visible indicator values.
+    """
+    colors = np.frombuffer(top_down_map_colors, dtype=np.uint8).reshape(-1, 3)
+    hidden_colors = (colors * fog_of_war_desat_amount).astype(np.uint8)
+    # Only desaturate things that are valid points as only valid points get revealed
+    hidden_colors[MAP_INVALID_POINT] = colors[MAP_INVALID_POINT]
+    fog_of_war_colors = np.concatenate([hidden_colors, colors])
+    fog_of_war_colors.setflags(write=False)
+    return fog_of_war_colors
+
+
 def colorize_topdown_map(
     top_down_map: np.ndarray,
     fog_of_war_mask: Optional[np.ndarray] = None,
     fog_of_war_desat_amount: float = 0.5,
+    out: Optional[np.ndarray] = None,
+    color_idxs: Optional[np.ndarray] = None,
 ) -> np.ndarray:
     r"""Convert the top down map to RGB based on the indicator values.
     Args:
-        top_down_map: A non-colored version of the map.
+        top_down_map: A non-colored version of the map. Can be a batch of
+            maps of shape (N, H, W).
         fog_of_war_mask: A mask used to determine which parts of the
             top_down_map are visible
             Non-visible parts will be desaturated
         fog_of_war_desat_amount: Amount to desaturate the color of unexplored areas
             Decreasing this value will make unexplored areas darker
             Default: 0.5
+        out: If not None, the uint8 array of shape top_down_map.shape + (3,)
+            to write the colored map to.
+        color_idxs: If not None, an intp array of the shape of the
+            top_down_map used as scratch space with the fog of war.
     Returns:
         A colored version of the top-down map.
     """
-    _map = TOP_DOWN_MAP_COLORS[top_down_map]
-
-    if fog_of_war_mask is not None:
-        fog_of_war_desat_values = np.array([[fog_of_war_desat_amount], [1.0]])
-        # Only desaturate things that are valid points as only valid points get revealed
-        desat_mask = top_down_map != MAP_INVALID_POINT
-
-        _map[desat_mask] = (
-            _map * fog_of_war_desat_values[fog_of_war_mask]
-        ).astype(np.uint8)[desat_mask]
+    if fog_of_war_mask is None:
+        return np.take(
+            TOP_DOWN_MAP_COLORS, top_down_map, axis=0, out=out, mode="clip"
+        )
 
-    return _map
+    # Lookup the colors of the map and of the fog of war at once
+    colors = _get_fog_of_war_colors(
+        TOP_DOWN_MAP_COLORS.tobytes(), fog_of_war_desat_amount
+    )
+    if color_idxs is None:
+        color_idxs = np.empty(top_down_map.shape, dtype=np.intp)
+    np.copyto(color_idxs, fog_of_war_mask, casting="unsafe")
+    color_idxs *= len(TOP_DOWN_MAP_COLORS)
+    color_idxs += top_down_map
+    return np.take(colors, color_idxs, axis=0, out=out, mode="clip")
 
 
 def draw_path(
@@ -390,15 +453,39 @@ def draw_path(
         path_points: list of points that specify the path to be drawn
         thickness: thickness of the path.
     """
-    for prev_pt, next_pt in zip(path_points[:-1], path_points[1:]):
-        # Swapping x y
-        cv2.line(
-            top_down_map,
-            prev_pt[::-1],
-            next_pt[::-1],
-            color,
-            thickness=thickness,
-        )
+    if len(path_points) < 2:
+        return
+    # Swapping x y
+    cv2.polylines(
+        top_down_map,
+        [np.asarray(path_points, dtype=np.int32)[:, ::-1]],
+        False,
+        color,
+        thickness=thickness,
+    )
+
+
+def _fit_to_height(
+    top_down_map: np.ndarray,
+    output_height: int,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    if top_down_map.shape[0] > top_down_map.shape[1]:
+        top_down_map = np.rot90(top_down_map, 1)
+
+    # scale top down map to align with rgb view
+    old_h, old_w, _ = top_down_map.shape
+    top_down_height = output_height
+    top_down_width = int(float(top_down_height) / old_h * old_w)
+    if out is not None and out.shape[:2] != (top_down_height, top_down_width):
+        out = None
+    # cv2 resize (dsize is width first)
+    return cv2.resize(
+        top_down_map,
+        (top_down_width, top_down_height),
+        dst=out,
+        interpolation=cv2.INTER_CUBIC,
+    )
 
 
 def colorize_draw_agent_and_fit_to_height(
@@ -422,18 +509,98 @@ def colorize_draw_agent_and_fit_to_height(
         agent_radius_px=min(top_down_map.shape[0:2]) // 32,
     )
 
-    if top_down_map.shape[0] > top_down_map.shape[1]:
-        top_down_map = np.rot90(top_down_map, 1)
+    return _fit_to_height(top_down_map, output_height)
 
-    # scale top down map to align with rgb view
-    old_h, old_w, _ = top_down_map.shape
-    top_down_height = output_height
-    top_down_width = int(float(top_down_height) / old_h * old_w)
-    # cv2 resize (dsize is width first)
-    top_down_map = cv2.resize(
-        top_down_map,
-        (top_down_width, top_down_height),
-        interpolation=cv2.INTER_CUBIC,
-    )
 
-    return top_down_map
+class TopDownMapRenderer:
+    r"""Renders the outputs of the TopDownMap measure of a batch of
+    environments, as :ref:`colorize_draw_agent_and_fit_to_height` does for
+    one.
+
+    Maps of the same shape are colorized together with a single lookup in the
+    color table, agents are drawn from the cached rotated sprites and every
+    step is written to buffers reused across calls, so the rendered maps are
+    only valid until the next call.
+    """
+
+    def __init__(self, fog_of_war_desat_amount: float = 0.5) -> None:
+        self._fog_of_war_desat_amount = fog_of_war_desat_amount
+        self._buffers: Dict[Tuple, Dict[str, np.ndarray]] = {}
+        self._fitted_maps: List[Optional[np.ndarray]] = []
+
+    def _get_buffers(
+        self, num_maps: int, map_shape: Tuple[int, int], has_fog_of_war: bool
+    ) -> Dict[str, np.ndarray]:
+        key = (num_maps, map_shape, has_fog_of_war)
+        if key not in self._buffers:
+            buffers = {
+                "maps": np.empty((num_maps, *map_shape), dtype=np.uint8),
+                "colored_maps": np.empty(
+                    (num_maps, *map_shape, 3), dtype=np.uint8
+                ),
+            }
+            if has_fog_of_war:
+                buffers["fog_of_war_masks"] = np.empty(
+                    (num_maps, *map_shape), dtype=np.uint8
+                )
+                buffers["color_idxs"] = np.empty(
+                    (num_maps, *map_shape), dtype=np.intp
+                )
+            self._buffers[key] = buffers
+        return self._buffers[key]
+
+    def render(
+        self,
+        topdown_map_infos: List[Dict[str, Any]],
+        output_height: Optional[int] = None,
+    ) -> List[np.ndarray]:
+        r"""Colorizes the maps and draws the agents.
+
+        :param topdown_map_infos: The outputs of the TopDownMap measure
+        :param output_height: If not None, the maps are fit to this height
+        :return: The rendered maps, in the order of
+            :p:`topdown_map_infos`.
+        """
+        groups: Dict[Tuple, List[int]] = {}
+        for i, info in enumerate(topdown_map_infos):
+            key = (info["map"].shape, info["fog_of_war_mask"] is not None)
+            groups.setdefault(key, []).append(i)
+
+        rendered_maps: List[np.ndarray] = [None] * len(  # type: ignore
+            topdown_map_infos
+        )
+        for (map_shape, has_fog_of_war), idxs in groups.items():
+            buffers = self._get_buffers(len(idxs), map_shape, has_fog_of_war)
+            for j, i in enumerate(idxs):
+                buffers["maps"][j] = topdown_map_infos[i]["map"]
+                if has_fog_of_war:
+                    buffers["fog_of_war_masks"][j] = topdown_map_infos[i][
+                        "fog_of_war_mask"
+                    ]
+
+            colorize_topdown_map(
+                buffers["maps"],
+                buffers.get("fog_of_war_masks"),
+                self._fog_of_war_desat_amount,
+                out=buffers["colored_maps"],
+                color_idxs=buffers.get("color_idxs"),
+            )
+            for j, i in enumerate(idxs):
+                rendered_maps[i] = draw_agent(
+                    image=buffers["colored_maps"][j],
+                    agent_center_coord=topdown_map_infos[i]["agent_map_coord"],
+                    agent_rotation=topdown_map_infos[i]["agent_angle"],
+                    agent_radius_px=min(map_shape) // 32,
+                )
+
+        if output_height is not None:
+            self._fitted_maps.extend(
+                [None] * (len(rendered_maps) - len(self._fitted_maps))
+            )
+            for i, rendered_map in enumerate(rendered_maps):
+                self._fitted_maps[i] = _fit_to_height(
+                    rendered_map, output_height, out=self._fitted_maps[i]
+                )
+                rendered_maps[i] = self._fitted_maps[i]
+
+        return rendered_maps
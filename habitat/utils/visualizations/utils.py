@@ -97,6 +97,19 @@ def paste_overlapping_image(
     return background
 
 
+def get_video_file_name(video_name: str) -> str:
+    r"""Returns the :py:`.mp4` file name of a video, with whitespaces
+    replaced and the name truncated to the maximum file name length.
+    """
+    video_name = video_name.replace(" ", "_").replace("\n", "_")
+
+    # File names are not allowed to be over 255 characters
+    video_name_split = video_name.split("/")
+    return "/".join(
+        video_name_split[:-1] + [video_name_split[-1][:251] + ".mp4"]
+    )
+
+
 def images_to_video(
     images: List[np.ndarray],
     output_dir: str,
@@ -123,13 +136,7 @@ def images_to_video(
     assert 0 <= quality <= 10
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    video_name = video_name.replace(" ", "_").replace("\n", "_")
-
-    # File names are not allowed to be over 255 characters
-    video_name_split = video_name.split("/")
-    video_name = "/".join(
-        video_name_split[:-1] + [video_name_split[-1][:251] + ".mp4"]
-    )
+    video_name = get_video_file_name(video_name)
 
     writer = imageio.get_writer(
         os.path.join(output_dir, video_name),
@@ -203,13 +210,19 @@ def tile_images(render_obs_images: List[np.ndarray]) -> np.ndarray:
     return final_im
 
 
-def observations_to_image(observation: Dict, info: Dict) -> np.ndarray:
+def observations_to_image(
+    observation: Dict,
+    info: Dict,
+    top_down_map_renderer: Optional["maps.TopDownMapRenderer"] = None,
+) -> np.ndarray:
     r"""Generate image of single frame from observation and info
     returned from a single environment step().
 
     Args:
         observation: observation returned from an environment step().
         info: info returned from an environment step().
+        top_down_map_renderer: renderer of the top-down map, reusing its
+            buffers and agent sprites across the frames it renders.
 
     Returns:
         generated image of a single frame.
@@ -254,9 +267,14 @@ def observations_to_image(observation: Dict, info: Dict) -> np.ndarray:
         render_frame = draw_collision(render_frame)
 
     if "top_down_map" in info:
-        top_down_map = maps.colorize_draw_agent_and_fit_to_height(
-            info["top_down_map"], render_frame.shape[0]
-        )
+        if top_down_map_renderer is not None:
+            top_down_map = top_down_map_renderer.render(
+                [info["top_down_map"]], render_frame.shape[0]
+            )[0]
+        else:
+            top_down_map = maps.colorize_draw_agent_and_fit_to_height(
+                info["top_down_map"], render_frame.shape[0]
+            )
         render_frame = np.concatenate((render_frame, top_down_map), axis=1)
     return render_frame
 
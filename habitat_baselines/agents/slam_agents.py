@@ -192,7 +192,9 @@ class ORBSLAM2Agent(RandomAgent):
         self.angle_th = config.ANGLE_TH
         self.obstacle_th = config.MIN_PTS_IN_OBSTACLE
         self.depth_denorm = config.DEPTH_DENORM
+        self.incremental_replanning = config.INCREMENTAL_REPLANNING
         self.planned_waypoints = []
+        self.recorded_steps = None
         self.mapper = DirectDepthMapper(
             camera_height=config.CAMERA_HEIGHT,
             near_th=config.D_OBSTACLE_MIN,
@@ -208,6 +210,7 @@ class ORBSLAM2Agent(RandomAgent):
             preprocess=config.PREPROCESS_MAP,
             beta=config.BETA,
             device=device,
+            check_convergence_every=config.PLANNER_CONVERGENCE_CHECK_INTERVAL,
         )
         self.slam_to_world = 1.0
         self.timestep = 0.1
@@ -234,6 +237,7 @@ class ORBSLAM2Agent(RandomAgent):
         self.position_history = []
         self.planned2Dpath = torch.zeros((0))
         self.slam.reset()
+        self.planner.reset_cost_to_go()
         self.cur_time = 0
         self.toDoList = []
         self.waypoint_id = 0
@@ -277,17 +281,40 @@ class ORBSLAM2Agent(RandomAgent):
                     self.unseen_obstacle = (
                         previous_step.item() <= 0.001
                     )  # hardcoded threshold for not moving
-        current_obstacles = self.mapper(
-            torch.from_numpy(depth).to(self.device).squeeze(), self.pose6D
-        ).to(self.device)
-        self.current_obstacles = current_obstacles
-        self.map2DObstacles = torch.max(
-            self.map2DObstacles, current_obstacles.unsqueeze(0).unsqueeze(0)
+        self.mapper.update_map(
+            self.map2DObstacles,
+            torch.from_numpy(depth).to(self.device).squeeze(),
+            self.pose6D,
         )
         if self.timing:
             print(time.time() - t, "Mapping")
+        if self.recorded_steps is not None:
+            self.recorded_steps.append(
+                (
+                    depth,
+                    self.pose6D.detach().cpu().numpy().reshape(4, 4),
+                    self.estimatedGoalPos2D.detach().cpu().numpy().reshape(2),
+                )
+            )
         return True
 
+    def start_recording(self):
+        r"""Starts recording the depth, pose and goal of every step, to
+        benchmark mapping and planning with
+        habitat_baselines/slambased/benchmark_planning.py.
+        """
+        self.recorded_steps = []
+
+    def save_recording(self, path):
+        depth, pose6d, goal_pos2d = zip(*self.recorded_steps)
+        np.savez_compressed(
+            path,
+            depth=np.stack(depth),
+            pose6d=np.stack(pose6d),
+            goal_pos2d=np.stack(goal_pos2d),
+        )
+        self.recorded_steps = None
+
     def init_pose6d(self):
         return torch.eye(4).float().to(self.device)
 
@@ -472,7 +499,12 @@ class ORBSLAM2Agent(RandomAgent):
             self.estimatedGoalPos2D[0, 0].long(),
             self.estimatedGoalPos2D[0, 1].long(),
         ] = 1.0
-        path, cost = self.planner(
+        planner = (
+            self.planner.replan
+            if self.incremental_replanning
+            else self.planner
+        )
+        path, cost = planner(
             self.rawmap2_planner_ready(
                 self.map2DObstacles, start_map, goal_map
             ).to(self.device),
@@ -551,7 +583,9 @@ class ORBSLAM2MonodepthAgent(ORBSLAM2Agent):
         self.angle_th = config.ANGLE_TH
         self.obstacle_th = config.MIN_PTS_IN_OBSTACLE
         self.depth_denorm = config.DEPTH_DENORM
+        self.incremental_replanning = config.INCREMENTAL_REPLANNING
         self.planned_waypoints = []
+        self.recorded_steps = None
         self.mapper = DirectDepthMapper(
             camera_height=config.CAMERA_HEIGHT,
             near_th=config.D_OBSTACLE_MIN,
@@ -567,6 +601,7 @@ class ORBSLAM2MonodepthAgent(ORBSLAM2Agent):
             preprocess=config.PREPROCESS_MAP,
             beta=config.BETA,
             device=device,
+            check_convergence_every=config.PLANNER_CONVERGENCE_CHECK_INTERVAL,
         )
         self.slam_to_world = 1.0
         self.timestep = 0.1
@@ -6,7 +6,7 @@
 
 import os
 import time
-from typing import Any, ClassVar, Dict, List, Tuple, Union
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
 import torch
 from numpy import ndarray
@@ -284,7 +284,9 @@ class BaseRLTrainer(BaseTrainer):
         current_episode_reward: Tensor,
         prev_actions: Tensor,
         batch: Dict[str, Tensor],
-        rgb_frames: Union[List[List[Any]], List[List[ndarray]]],
+        rgb_frames: Optional[
+            Union[List[List[Any]], List[List[ndarray]]]
+        ] = None,
     ) -> Tuple[
         VectorEnv,
         Tensor,
@@ -292,7 +294,7 @@ class BaseRLTrainer(BaseTrainer):
         Tensor,
         Tensor,
         Dict[str, Tensor],
-        List[List[Any]],
+        Optional[List[List[Any]]],
     ]:
         # pausing self.envs with no new episode
         if len(envs_to_pause) > 0:
@@ -312,7 +314,8 @@ class BaseRLTrainer(BaseTrainer):
             for k, v in batch.items():
                 batch[k] = v[state_index]
 
-            rgb_frames = [rgb_frames[i] for i in state_index]
+            if rgb_frames is not None:
+                rgb_frames = [rgb_frames[i] for i in state_index]
 
         return (
             envs,
@@ -5,12 +5,12 @@
 # LICENSE file in the root directory of this source tree.
 
 import warnings
-from typing import Iterator, Optional, Tuple
+from typing import Dict, Iterator, Optional, Tuple
 
 import numpy as np
 import torch
 
-from habitat_baselines.common.tensor_dict import TensorDict
+from habitat_baselines.common.tensor_dict import TensorDict, TensorDictView
 
 
 class RolloutStorage:
@@ -92,6 +92,16 @@ class RolloutStorage:
         self.numsteps = numsteps
         self.current_rollout_step_idxs = [0 for _ in range(self._nbuffers)]
 
+        self._env_slices = [
+            slice(
+                int(buffer_index * self._num_envs / self._nbuffers),
+                int((buffer_index + 1) * self._num_envs / self._nbuffers),
+            )
+            for buffer_index in range(self._nbuffers)
+        ]
+        # Views of the buffers at (step, env slice of the buffer index)
+        self._views: Dict[Tuple[int, int], TensorDictView] = {}
+
     @property
     def current_rollout_step_idx(self) -> int:
         assert all(
@@ -134,24 +144,31 @@ class RolloutStorage:
         next_step = {k: v for k, v in next_step.items() if v is not None}
         current_step = {k: v for k, v in current_step.items() if v is not None}
 
-        env_slice = slice(
-            int(buffer_index * self._num_envs / self._nbuffers),
-            int((buffer_index + 1) * self._num_envs / self._nbuffers),
-        )
-
         if len(next_step) > 0:
-            self.buffers.set(
-                (self.current_rollout_step_idxs[buffer_index] + 1, env_slice),
-                next_step,
-                strict=False,
-            )
+            self._get_view(
+                self.current_rollout_step_idxs[buffer_index] + 1, buffer_index
+            ).set(next_step)
 
         if len(current_step) > 0:
-            self.buffers.set(
-                (self.current_rollout_step_idxs[buffer_index], env_slice),
-                current_step,
-                strict=False,
-            )
+            self._get_view(
+                self.current_rollout_step_idxs[buffer_index], buffer_index
+            ).set(current_step)
+
+    def _get_view(self, step: int, buffer_index: int) -> TensorDictView:
+        view = self._views.get((step, buffer_index), None)
+        if view is None:
+            view = self.buffers.view_at((step, self._env_slices[buffer_index]))
+            self._views[(step, buffer_index)] = view
+
+        return view
+
+    def get_current_step(self, buffer_index: int = 0) -> TensorDict:
+        r"""Returns the buffers at the current step of the environments of
+        :p:`buffer_index`.
+        """
+        return self._get_view(
+            self.current_rollout_step_idxs[buffer_index], buffer_index
+        ).get()
 
     def advance_rollout(self, buffer_index: int = 0):
         self.current_rollout_step_idxs[buffer_index] += 1
@@ -7,7 +7,16 @@
 
 import copy
 import numbers
-from typing import Callable, Dict, Optional, Tuple, Union, overload
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 import numpy as np
 import torch
@@ -17,6 +26,7 @@ DictTree = Dict[str, Union[TensorLike, "DictTree"]]  # type: ignore
 TensorIndexType = Union[
     int, slice, torch.Tensor, Tuple[Union[int, slice, torch.Tensor], ...]
 ]
+FlatItems = List[Tuple[Tuple[str, ...], torch.Tensor]]
 
 
 class TensorDict(Dict[str, Union["TensorDict", torch.Tensor]]):
@@ -33,6 +43,10 @@ class TensorDict(Dict[str, Union["TensorDict", torch.Tensor]]):
 
     """
 
+    # Incremented when the keys of the dictionary or the values they map to
+    # change, which invalidates the cached leaves of the trees containing it
+    _version: int = 0
+
     @classmethod
     def from_tree(cls, tree: DictTree) -> "TensorDict":
         res = cls()
@@ -95,6 +109,7 @@ class TensorDict(Dict[str, Union["TensorDict", torch.Tensor]]):
         strict: bool = True,
     ) -> None:
         if isinstance(index, str):
+            self._version += 1
             super().__setitem__(index, value)  # type: ignore
         else:
             if not isinstance(value, dict):
@@ -148,6 +163,67 @@ class TensorDict(Dict[str, Union["TensorDict", torch.Tensor]]):
     ) -> None:
         self.set(index, value)  # type: ignore
 
+    def __delitem__(self, key: str) -> None:
+        self._version += 1
+        super().__delitem__(key)
+
+    def pop(self, *args):
+        self._version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self._version += 1
+        return super().popitem()
+
+    def clear(self) -> None:
+        self._version += 1
+        super().clear()
+
+    def update(self, *args, **kwargs) -> None:
+        self._version += 1
+        super().update(*args, **kwargs)
+
+    def setdefault(self, *args):
+        self._version += 1
+        return super().setdefault(*args)
+
+    def _flatten_into(
+        self,
+        parent_keys: Tuple[str, ...],
+        nodes: List[Tuple["TensorDict", int]],
+        items: FlatItems,
+    ) -> None:
+        nodes.append((self, self._version))
+        for k, v in self.items():
+            if isinstance(v, TensorDict):
+                v._flatten_into(parent_keys + (k,), nodes, items)
+            else:
+                items.append((parent_keys + (k,), v))
+
+    def flat_items(self) -> FlatItems:
+        r"""Returns the leaves of the tree as (key path, tensor) pairs.
+
+        The list is cached until the keys of a :ref:`TensorDict` of the tree
+        change, the same list is returned until then.
+        """
+        cache = self.__dict__.get("_flat_items_cache", None)
+        if (
+            cache is not None
+            and cache[0][0][0] is self
+            and all(node._version == version for node, version in cache[0])
+        ):
+            return cache[1]
+
+        nodes: List[Tuple[TensorDict, int]] = []
+        items: FlatItems = []
+        self._flatten_into((), nodes, items)
+        self._flat_items_cache = (nodes, items)
+        return items
+
+    def view_at(self, index: TensorIndexType) -> "TensorDictView":
+        r"""Returns a :ref:`TensorDictView` of the values at :p:`index`."""
+        return TensorDictView(self, index)
+
     @classmethod
     def map_func(
         cls,
@@ -180,3 +256,56 @@ class TensorDict(Dict[str, Union["TensorDict", torch.Tensor]]):
 
     def __deepcopy__(self, _memo=None) -> "TensorDict":
         return TensorDict.from_tree(copy.deepcopy(self.to_tree(), memo=_memo))
+
+
+class TensorDictView:
+    r"""Gets and sets the values of a :ref:`TensorDict` at a fixed index.
+
+    The views of the leaves at the index are computed once and reused while
+    the keys of the :ref:`TensorDict` do not change, which saves most of the
+    cost of indexing a tree of small tensors at the same index repeatedly,
+    e.g. at each step of a rollout. The index must produce views, i.e. only
+    contain ints and slices.
+    """
+
+    def __init__(self, tensor_dict: TensorDict, index: TensorIndexType):
+        self._tensor_dict = tensor_dict
+        self._index = index
+        self._flat_items: Optional[FlatItems] = None
+        self._views: FlatItems = []
+
+    def _get_views(self) -> FlatItems:
+        flat_items = self._tensor_dict.flat_items()
+        if flat_items is not self._flat_items:
+            self._flat_items = flat_items
+            self._views = [
+                (keys, leaf[self._index]) for keys, leaf in flat_items
+            ]
+
+        return self._views
+
+    def get(self) -> TensorDict:
+        r"""Same as :py:`tensor_dict[index]`."""
+        res = TensorDict()
+        for keys, view in self._get_views():
+            node = res
+            for k in keys[:-1]:
+                if k not in node:
+                    dict.__setitem__(node, k, TensorDict())
+                node = dict.__getitem__(node, k)
+            dict.__setitem__(node, keys[-1], view)
+
+        return res
+
+    def set(self, value: Union[TensorDict, DictTree]) -> None:
+        r"""Same as :py:`tensor_dict.set(index, value, strict=False)`."""
+        for keys, view in self._get_views():
+            v: Any = value
+            for k in keys:
+                if k not in v:
+                    break
+                v = v[k]
+            else:
+                view.copy_(
+                    v if isinstance(v, torch.Tensor) else torch.as_tensor(v)
+                )
@@ -29,6 +29,11 @@ _C.TORCH_GPU_ID = 0
 _C.VIDEO_OPTION = ["disk", "tensorboard"]
 _C.TENSORBOARD_DIR = "tb"
 _C.VIDEO_DIR = "video_dir"
+# Number of background threads composing and writing the evaluation videos,
+# videos are rendered on the evaluation loop if 0
+_C.VIDEO_RENDER_NUM_WORKERS = 2
+# Maximum number of frames waiting to be rendered by each video thread
+_C.VIDEO_RENDER_MAX_QUEUED_FRAMES = 64
 _C.TEST_EPISODE_COUNT = -1
 _C.EVAL_CKPT_PATH_DIR = "data/checkpoints"  # path to ckpt or path to ckpts dir
 _C.NUM_ENVIRONMENTS = 16
@@ -53,6 +58,12 @@ _C.VERBOSE = True
 # PyTorch normally behaves, but all configs we provide
 # set it to true and yours likely should too
 _C.FORCE_TORCH_SINGLE_THREADED = False
+# Number of worker processes, one scene each, used to build the frame
+# caches of the EQA datasets
+_C.FRAME_CACHE_NUM_WORKERS = 4
+# Path of the precomputed CNN image features of the PACMAN navigation dataset,
+# features are computed on the fly for every sample if empty
+_C.FEATURE_STORE_PATH = ""
 # -----------------------------------------------------------------------------
 # EVAL CONFIG
 # -----------------------------------------------------------------------------
@@ -81,6 +92,10 @@ _C.RL.preemption.save_resume_state_interval = 100
 # Save resume states only when running with slurm
 # This is nice if you don't want debug jobs to resume
 _C.RL.preemption.save_state_batch_only = False
+# Save the config in the resume state. If False, a resumed job uses the config
+# it is started with, which must then be the same as the one of the preempted
+# job
+_C.RL.preemption.save_config_in_resume_state = True
 # -----------------------------------------------------------------------------
 # POLICY CONFIG
 # -----------------------------------------------------------------------------
@@ -152,6 +167,11 @@ _C.RL.PPO.use_double_buffered_sampler = False
 # -----------------------------------------------------------------------------
 _C.RL.DDPPO = CN()
 _C.RL.DDPPO.sync_frac = 0.6
+# Minimum time in seconds between two reads of the number of workers done with
+# their rollout, which are done in a background thread. Stragglers are
+# preempted up to this long after sync_frac of the workers are done, and every
+# worker sends rank 0's store a request per interval late in each rollout
+_C.RL.DDPPO.num_done_poll_interval = 0.25
 _C.RL.DDPPO.distrib_backend = "GLOO"
 _C.RL.DDPPO.rnn_type = "GRU"
 _C.RL.DDPPO.num_recurrent_layers = 1
@@ -167,6 +187,14 @@ _C.RL.DDPPO.train_encoder = True
 _C.RL.DDPPO.reset_critic = True
 # Forces distributed mode for testing
 _C.RL.DDPPO.force_distributed = False
+# Gives disjoint scenes to the workers, each worker only loads the episodes of
+# its scenes when the dataset has separate content files per scene
+_C.RL.DDPPO.split_scenes_by_rank = False
+# Freezes the parameters of the policy that a dry run before training does not
+# use, so that DistributedDataParallel does not search for unused parameters
+# every backward pass. Only valid if the parameters used by the policy do not
+# depend on the observations
+_C.RL.DDPPO.freeze_unused_params = False
 # -----------------------------------------------------------------------------
 # ORBSLAM2 BASELINE
 # -----------------------------------------------------------------------------
@@ -195,6 +223,11 @@ _C.ORBSLAM2.NEXT_WAYPOINT_TH = 0.5
 _C.ORBSLAM2.NUM_ACTIONS = 3
 _C.ORBSLAM2.DIST_TO_STOP = 0.05
 _C.ORBSLAM2.PLANNER_MAX_STEPS = 500
+# Number of planner steps between checks whether the goal is reached
+_C.ORBSLAM2.PLANNER_CONVERGENCE_CHECK_INTERVAL = 1
+# Reuse the cost-to-go of the previous plan and only update the costs
+# affected by changed obstacles when replanning towards the same goal
+_C.ORBSLAM2.INCREMENTAL_REPLANNING = False
 _C.ORBSLAM2.DEPTH_DENORM = get_task_config().SIMULATOR.DEPTH_SENSOR.MAX_DEPTH
 # -----------------------------------------------------------------------------
 # PROFILING
@@ -1,22 +1,26 @@
 import os
-from typing import Callable, List, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import cv2
 import numpy as np
 import torch
 import webdataset as wds
 import webdataset.filters as filters
+from torch.utils.data import DataLoader, Dataset
 from tqdm import tqdm
 
 import habitat
 from habitat import logger
-from habitat.core.simulator import ShortestPathPoint
 from habitat.datasets.utils import VocabDict
+from habitat_baselines.il.data.frame_cache import (
+    build_tar_frame_cache,
+    get_frame_dataset_urls,
+    tar_frame_cache_exists,
+)
 from habitat_baselines.utils.common import (
     base_plus_ext,
-    create_tar_archive,
-    delete_folder,
     get_scene_episode_dict,
+    img_bytes_2_uint8_tensor,
     valid_sample,
 )
 
@@ -42,90 +46,88 @@ class EQADataset(wds.Dataset):
         self.input_type = input_type
         self.num_frames = num_frames
 
-        with habitat.Env(config=self.config) as self.env:
-            self.episodes = self.env._dataset.episodes
+        dataset = habitat.make_dataset(
+            id_dataset=self.config.DATASET.TYPE, config=self.config.DATASET
+        )
+        self.episodes = dataset.episodes
 
-            # sorting and making episode ids consecutive for simpler indexing
-            self.sort_episodes()
+        # sorting and making episode ids consecutive for simpler indexing
+        self.sort_episodes()
 
-            self.q_vocab = self.env._dataset.question_vocab
-            self.ans_vocab = self.env._dataset.answer_vocab
+        self.q_vocab = dataset.question_vocab
+        self.ans_vocab = dataset.answer_vocab
 
-            self.eval_save_results = config.EVAL_SAVE_RESULTS
+        self.eval_save_results = config.EVAL_SAVE_RESULTS
 
-            if self.config.DATASET.SPLIT == config.EVAL.SPLIT:
-                self.mode = "val"
-            else:
-                self.mode = "train"
+        if self.config.DATASET.SPLIT == config.EVAL.SPLIT:
+            self.mode = "val"
+        else:
+            self.mode = "train"
 
-            self.frame_dataset_path = config.FRAME_DATASET_PATH.format(
-                split=self.mode
-            )
+        self.frame_dataset_path = config.FRAME_DATASET_PATH.format(
+            split=self.mode
+        )
 
-            # [TODO] can be done in mp3d_eqa_dataset when loading
-            self.calc_max_length()
-            self.restructure_ans_vocab()
+        # [TODO] can be done in mp3d_eqa_dataset when loading
+        self.calc_max_length()
+        self.restructure_ans_vocab()
+        self.preprocess_questions()
 
-            group_by_keys = filters.Curried(self.group_by_keys_)
-            super().__init__(
-                urls=self.frame_dataset_path + ".tar",
-                initial_pipeline=[group_by_keys()],
-            )
+        self.only_vqa_task = config.ONLY_VQA_TASK
 
-            self.only_vqa_task = config.ONLY_VQA_TASK
+        self.scene_episode_dict = get_scene_episode_dict(self.episodes)
 
-            self.scene_episode_dict = get_scene_episode_dict(self.episodes)
+        if not self.cache_exists():
+            """
+            for each scene > load scene in memory > save frames for each
+            episode corresponding to each scene
+            """
+            logger.info(
+                "[ Dataset cache not present / is incomplete. ]\
+                \n[ Saving episode frames to disk. ]"
+            )
 
-            if not self.cache_exists():
-                """
-                for each scene > load scene in memory > save frames for each
-                episode corresponding to each scene
-                """
-                logger.info(
-                    "[ Dataset cache not present / is incomplete. ]\
-                    \n[ Saving episode frames to disk. ]"
+            logger.info(
+                "Number of {} episodes: {}".format(
+                    self.mode, len(self.episodes)
                 )
+            )
 
-                logger.info(
-                    "Number of {} episodes: {}".format(
-                        self.mode, len(self.episodes)
+            scene_episode_poses = {}
+            for scene, episodes in self.scene_episode_dict.items():
+                scene_episode_poses[scene] = []
+                for episode in episodes:
+                    if self.only_vqa_task:
+                        pos_queue = episode.shortest_paths[0][
+                            -self.num_frames :  # noqa: E203
+                        ]
+                    else:
+                        pos_queue = episode.shortest_paths[0]
+
+                    scene_episode_poses[scene].append(
+                        (
+                            "{0:0=4d}".format(int(episode.episode_id)),
+                            [
+                                (pos.position, pos.rotation)
+                                for pos in pos_queue[::-1]
+                            ],
+                        )
                     )
-                )
-
-                for scene in tqdm(
-                    list(self.scene_episode_dict.keys()),
-                    desc="Going through all scenes from dataset",
-                ):
-                    self.load_scene(scene)
-
-                    for episode in tqdm(
-                        self.scene_episode_dict[scene],
-                        desc="Saving episode frames for each scene",
-                    ):
-
-                        if self.only_vqa_task:
-                            pos_queue = episode.shortest_paths[0][
-                                -self.num_frames :  # noqa: E203
-                            ]
-                        else:
-                            pos_queue = episode.shortest_paths[0]
-
-                        self.save_frame_queue(pos_queue, episode.episode_id)
-
-                logger.info("[ Saved all episodes' frames to disk. ]")
 
-                create_tar_archive(
-                    self.frame_dataset_path + ".tar",
-                    self.frame_dataset_path,
-                )
+            build_tar_frame_cache(
+                self.config.SIMULATOR,
+                scene_episode_poses,
+                self.frame_dataset_path,
+                num_workers=config.FRAME_CACHE_NUM_WORKERS,
+            )
 
-                logger.info("[ Tar archive created. ]")
-                logger.info(
-                    "[ Deleting dataset folder. This will take a few minutes. ]"
-                )
-                delete_folder(self.frame_dataset_path)
+            logger.info("[ Frame dataset is ready. ]")
 
-                logger.info("[ Frame dataset is ready. ]")
+        group_by_keys = filters.Curried(self.group_by_keys_)
+        super().__init__(
+            urls=get_frame_dataset_urls(self.frame_dataset_path),
+            initial_pipeline=[group_by_keys()],
+        )
 
     def group_by_keys_(
         self,
@@ -157,16 +159,8 @@ class EQADataset(wds.Dataset):
                     episode_id
                 ].episode_id
 
-                question = self.episodes[episode_id].question.question_tokens
-                if len(question) < self.max_q_len:
-                    diff = self.max_q_len - len(question)
-                    for _ in range(diff):
-                        question.append(0)
-
-                current_sample["question"] = torch.LongTensor(question)
-                current_sample["answer"] = self.ans_vocab.word2idx(
-                    self.episodes[episode_id].question.answer_text
-                )
+                current_sample["question"] = self.questions[episode_id]
+                current_sample["answer"] = self.answers[episode_id]
             if suffix in current_sample:
                 raise ValueError(
                     f"{fname}: duplicate file name in tar file {suffix} {current_sample.keys()}"
@@ -197,6 +191,24 @@ class EQADataset(wds.Dataset):
         for idx, key in enumerate(sorted(self.ans_vocab.word2idx_dict.keys())):
             self.ans_vocab.word2idx_dict[key] = idx
 
+    def preprocess_questions(self) -> None:
+        r"""Pads the question tokens of all episodes with 0s to the max
+        question length and looks up the answer ids once, instead of for
+        every sample.
+        """
+        self.questions = torch.zeros(
+            (len(self.episodes), self.max_q_len), dtype=torch.long
+        )
+        self.answers: List[int] = []
+        for idx, episode in enumerate(self.episodes):
+            question_tokens = episode.question.question_tokens
+            self.questions[idx, : len(question_tokens)] = torch.LongTensor(
+                question_tokens
+            )
+            self.answers.append(
+                self.ans_vocab.word2idx(episode.question.answer_text)
+            )
+
     def get_vocab_dicts(self) -> Tuple[VocabDict, VocabDict]:
         r"""Returns Q&A VocabDicts"""
         return self.q_vocab, self.ans_vocab
@@ -207,25 +219,6 @@ class EQADataset(wds.Dataset):
         for idx, ep in enumerate(self.episodes):
             ep.episode_id = idx
 
-    def save_frame_queue(
-        self,
-        pos_queue: List[ShortestPathPoint],
-        episode_id,
-    ) -> None:
-        r"""Writes episode's frame queue to disk."""
-
-        for idx, pos in enumerate(pos_queue[::-1]):
-            observation = self.env.sim.get_observations_at(
-                pos.position, pos.rotation
-            )
-            img = observation["rgb"]
-            idx = "{0:0=3d}".format(idx)
-            episode_id = "{0:0=4d}".format(int(episode_id))
-            new_path = os.path.join(
-                self.frame_dataset_path, "{}.{}".format(episode_id, idx)
-            )
-            cv2.imwrite(new_path + ".jpg", img[..., ::-1])
-
     def get_frames(self, frames_path, num=0):
         r"""Fetches frames from disk."""
         frames = []
@@ -238,17 +231,111 @@ class EQADataset(wds.Dataset):
         return np.array(frames, dtype=np.float32)
 
     def cache_exists(self) -> bool:
-        if os.path.exists(self.frame_dataset_path + ".tar"):
-            return True
-        else:
-            os.makedirs(self.frame_dataset_path, exist_ok=True)
-            return False
-
-    def load_scene(self, scene) -> None:
-        self.config.defrost()
-        self.config.SIMULATOR.SCENE = scene
-        self.config.freeze()
-        self.env.sim.reconfigure(self.config.SIMULATOR)
+        return tar_frame_cache_exists(self.frame_dataset_path)
 
     def __len__(self) -> int:
         return len(self.episodes)
+
+
+class EQADecodedFrameDataset(Dataset):
+    r"""Map-style version of :ref:`EQADataset` for VQA with the input frames
+    of all episodes decoded once and stored as a uint8 memmap of shape
+    :py:`(num episodes, num frames, 3, height, width)`.
+
+    Samples are :py:`(episode id, question, answer, frames)`, as produced by
+    :ref:`EQADataset` mapped with
+    :ref:`habitat_baselines.utils.common.img_bytes_2_uint8_tensor`.
+    """
+
+    def __init__(self, eqa_dataset: EQADataset, num_workers: int = 0):
+        """
+        Args:
+            eqa_dataset: EQADataset the frames are decoded from
+            num_workers (int): number of DataLoader workers used to decode
+                the frames if they are not cached yet
+        """
+        self.questions = eqa_dataset.questions
+        self.answers = eqa_dataset.answers
+        self.q_vocab = eqa_dataset.q_vocab
+        self.ans_vocab = eqa_dataset.ans_vocab
+        self.decoded_frames_path = "{}_decoded_{}.npy".format(
+            eqa_dataset.frame_dataset_path, eqa_dataset.num_frames
+        )
+
+        if not os.path.exists(self.decoded_frames_path):
+            logger.info(
+                "[ Decoded frames not present. Decoding episode frames. ]"
+            )
+            self.decode_frames(eqa_dataset, num_workers)
+            logger.info("[ Decoded frames are ready. ]")
+
+        self._frames: Optional[np.ndarray] = None
+
+    def decode_frames(self, eqa_dataset: EQADataset, num_workers: int) -> None:
+        group_by_keys = filters.Curried(eqa_dataset.group_by_keys_)
+        frame_dataset = (
+            wds.Dataset(
+                urls=get_frame_dataset_urls(eqa_dataset.frame_dataset_path),
+                initial_pipeline=[group_by_keys()],
+            )
+            .to_tuple(
+                "episode_id",
+                "question",
+                "answer",
+                *[
+                    "{0:0=3d}.jpg".format(x)
+                    for x in range(eqa_dataset.num_frames)
+                ],
+            )
+            .map(img_bytes_2_uint8_tensor)
+        )
+
+        incomplete_path = self.decoded_frames_path + ".incomplete"
+        frames = None
+        for episode_id, _, _, frame_queue in tqdm(
+            DataLoader(
+                frame_dataset, batch_size=None, num_workers=num_workers
+            ),
+            total=len(self.answers),
+            desc="Decoding episode frames",
+        ):
+            if frames is None:
+                frames = np.lib.format.open_memmap(
+                    incomplete_path,
+                    mode="w+",
+                    dtype=np.uint8,
+                    shape=(len(self.answers), *frame_queue.shape),
+                )
+            frames[episode_id] = frame_queue.numpy()
+
+        assert frames is not None, "No episode frames to decode"
+        frames.flush()
+        del frames
+        os.replace(incomplete_path, self.decoded_frames_path)
+
+    @property
+    def frames(self) -> np.ndarray:
+        # mapped lazily so every DataLoader worker maps the file itself
+        if self._frames is None:
+            self._frames = np.load(self.decoded_frames_path, mmap_mode="r")
+        return self._frames
+
+    def get_vocab_dicts(self) -> Tuple[VocabDict, VocabDict]:
+        r"""Returns Q&A VocabDicts"""
+        return self.q_vocab, self.ans_vocab
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_frames"] = None
+        return state
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def __getitem__(self, idx: int):
+        return (
+            idx,
+            self.questions[idx],
+            self.answers[idx],
+            torch.from_numpy(np.array(self.frames[idx])),
+        )
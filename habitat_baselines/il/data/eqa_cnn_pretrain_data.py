@@ -1,15 +1,16 @@
-import os
 import random
 from typing import List
 
 import lmdb
 import numpy as np
 from torch.utils.data import Dataset
-from tqdm import tqdm
 
 import habitat
 from habitat import logger
-from habitat.core.simulator import ShortestPathPoint
+from habitat_baselines.il.data.frame_cache import (
+    build_lmdb_frame_cache,
+    lmdb_frame_cache_exists,
+)
 
 
 class EQACNNPretrainDataset(Dataset):
@@ -30,8 +31,12 @@ class EQACNNPretrainDataset(Dataset):
             for each scene > load scene in memory > save frames for each
             episode corresponding to that scene
             """
-            self.env = habitat.Env(config=self.config)
-            self.episodes = self.env._dataset.episodes
+            # the frames are rendered by the workers of the cache build, the
+            # episodes are all that is needed here
+            self.episodes = habitat.make_dataset(
+                id_dataset=self.config.DATASET.TYPE,
+                config=self.config.DATASET,
+            ).episodes
 
             logger.info(
                 "Dataset cache not found. Saving rgb, seg, depth scene images"
@@ -51,17 +56,10 @@ class EQACNNPretrainDataset(Dataset):
                 else:
                     self.scene_episode_dict[episode.scene_id].append(episode)
 
-            self.lmdb_env = lmdb.open(
-                self.dataset_path,
-                map_size=int(1e11),
-                writemap=True,
-            )
-
-            self.count = 0
-
-            for scene in tqdm(list(self.scene_episode_dict.keys())):
-                self.load_scene(scene)
-                for episode in tqdm(self.scene_episode_dict[scene]):
+            scene_samples = {}
+            for scene in self.scene_ids:
+                scene_samples[scene] = []
+                for episode in self.scene_episode_dict[scene]:
                     try:
                         # TODO: Consider alternative for shortest_paths
                         pos_queue = episode.shortest_paths[0]  # type:ignore
@@ -69,73 +67,34 @@ class EQACNNPretrainDataset(Dataset):
                         logger.error(e)
 
                     random_pos = random.sample(pos_queue, 9)
-                    self.save_frames(random_pos)
+                    scene_samples[scene].extend(
+                        (pos.position, pos.rotation) for pos in random_pos
+                    )
+
+            build_lmdb_frame_cache(
+                self.config.SIMULATOR,
+                scene_samples,
+                self.dataset_path,
+                num_workers=config.FRAME_CACHE_NUM_WORKERS,
+            )
 
             logger.info("EQA-CNN-PRETRAIN database ready!")
-            self.env.close()
 
         else:
             logger.info("Dataset cache found.")
-            self.lmdb_env = lmdb.open(
-                self.dataset_path,
-                readonly=True,
-                lock=False,
-            )
+
+        self.lmdb_env = lmdb.open(
+            self.dataset_path,
+            readonly=True,
+            lock=False,
+        )
 
         self.dataset_length = int(self.lmdb_env.begin().stat()["entries"] / 3)
         self.lmdb_env.close()
         self.lmdb_env = None
 
-    def save_frames(self, pos_queue: List[ShortestPathPoint]) -> None:
-        r"""
-        Writes rgb, seg, depth frames to LMDB.
-        """
-
-        for pos in pos_queue:
-
-            observation = self.env.sim.get_observations_at(
-                pos.position, pos.rotation
-            )
-
-            depth = observation["depth"]
-            rgb = observation["rgb"]
-
-            scene = self.env.sim.semantic_annotations()  # type:ignore
-            instance_id_to_label_id = {
-                int(obj.id.split("_")[-1]): obj.category.index()
-                for obj in scene.objects
-            }
-            self.mapping = np.array(
-                [
-                    instance_id_to_label_id[i]
-                    for i in range(len(instance_id_to_label_id))
-                ]
-            )
-            seg = np.take(self.mapping, observation["semantic"])
-            seg[seg == -1] = 0
-            seg = seg.astype("uint8")
-
-            sample_key = "{0:0=6d}".format(self.count)
-            with self.lmdb_env.begin(write=True) as txn:
-                txn.put((sample_key + "_rgb").encode(), rgb.tobytes())
-                txn.put((sample_key + "_depth").encode(), depth.tobytes())
-                txn.put((sample_key + "_seg").encode(), seg.tobytes())
-
-            self.count += 1
-
     def cache_exists(self) -> bool:
-        if os.path.exists(self.dataset_path):
-            if os.listdir(self.dataset_path):
-                return True
-        else:
-            os.makedirs(self.dataset_path)
-        return False
-
-    def load_scene(self, scene) -> None:
-        self.config.defrost()
-        self.config.SIMULATOR.SCENE = scene
-        self.config.freeze()
-        self.env.sim.reconfigure(self.config.SIMULATOR)
+        return lmdb_frame_cache_exists(self.dataset_path)
 
     def __len__(self) -> int:
         return self.dataset_length
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Memory-mapped store of precomputed per-episode image features.
+
+The features of all frames are stored in a single :py:`features.npy` array,
+the rows of each episode are contiguous and located through
+:py:`index.json`, which maps the episode id to its row offset and number of
+frames. The index also holds the key of the features, e.g. of the checkpoint
+of the encoder that computed them, so that a stale store is not used.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+FEATURES_FILENAME = "features.npy"
+FEATURE_STORE_INDEX_FILENAME = "index.json"
+
+
+def get_file_key(path: str) -> str:
+    r"""Returns a key of the content of a file, e.g. a checkpoint."""
+    file_hash = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def _read_index(feature_store_path: str) -> Dict:
+    with open(
+        os.path.join(feature_store_path, FEATURE_STORE_INDEX_FILENAME), "r"
+    ) as f:
+        return json.load(f)
+
+
+def feature_store_exists(
+    feature_store_path: str, key: Optional[str] = None
+) -> bool:
+    r"""Whether a complete feature store exists, the index is written last.
+
+    :param key: if not :py:`None`, the store must have been written with
+        this key.
+    """
+    if not os.path.exists(
+        os.path.join(feature_store_path, FEATURE_STORE_INDEX_FILENAME)
+    ):
+        return False
+    return key is None or _read_index(feature_store_path).get("key") == key
+
+
+def write_feature_store(
+    feature_store_path: str,
+    episode_features: Iterable[Tuple[int, np.ndarray]],
+    num_frames: int,
+    key: Optional[str] = None,
+) -> None:
+    r"""Writes the features of all episodes to a new feature store, replacing
+    any previous one.
+
+    :param feature_store_path: directory of the feature store.
+    :param episode_features: :py:`(episode id, features)` for each episode,
+        with the features of shape :py:`(num episode frames, feature dim)`.
+    :param num_frames: total number of frames over all episodes.
+    :param key: key of the features, see :ref:`feature_store_exists`.
+    """
+    os.makedirs(feature_store_path, exist_ok=True)
+    index_path = os.path.join(feature_store_path, FEATURE_STORE_INDEX_FILENAME)
+    # the previous store is incomplete as soon as its features are replaced
+    if os.path.exists(index_path):
+        os.remove(index_path)
+    features_path = os.path.join(feature_store_path, FEATURES_FILENAME)
+    incomplete_path = features_path + ".incomplete"
+
+    features: Optional[np.memmap] = None
+    index: Dict[str, Tuple[int, int]] = {}
+    offset = 0
+    for episode_id, feats in episode_features:
+        if features is None:
+            features = np.lib.format.open_memmap(
+                incomplete_path,
+                mode="w+",
+                dtype=np.float32,
+                shape=(num_frames, feats.shape[1]),
+            )
+        features[offset : offset + len(feats)] = feats  # noqa: E203
+        index[str(episode_id)] = (offset, len(feats))
+        offset += len(feats)
+
+    assert features is not None, "No episodes to extract features from"
+    assert offset == num_frames, "Expected {} frames, got {} frames".format(
+        num_frames, offset
+    )
+    features.flush()
+    del features
+    os.replace(incomplete_path, features_path)
+
+    with open(index_path + ".tmp", "w") as f:
+        json.dump({"key": key, "episodes": index}, f)
+    os.replace(index_path + ".tmp", index_path)
+
+
+class EpisodeFeatureStore:
+    r"""Read-only view of a feature store written by
+    :ref:`write_feature_store`.
+
+    The features are memory-mapped on first access, so the store can be
+    created before :py:`DataLoader` workers are forked and every worker maps
+    the file itself.
+    """
+
+    def __init__(self, feature_store_path: str) -> None:
+        self.feature_store_path = feature_store_path
+        index = _read_index(feature_store_path)
+        self.key: Optional[str] = index["key"]
+        self._index: Dict[str, Tuple[int, int]] = {
+            episode_id: tuple(entry)
+            for episode_id, entry in index["episodes"].items()
+        }
+        self._features: Optional[np.ndarray] = None
+
+    @property
+    def features(self) -> np.ndarray:
+        if self._features is None:
+            self._features = np.load(
+                os.path.join(self.feature_store_path, FEATURES_FILENAME),
+                mmap_mode="r",
+            )
+        return self._features
+
+    def __contains__(self, episode_id: int) -> bool:
+        return str(episode_id) in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, episode_id: int) -> np.ndarray:
+        r"""Returns the :py:`(num frames, feature dim)` features of an
+        episode. The array is a read-only view of the memory map.
+        """
+        offset, num_frames = self._index[str(episode_id)]
+        return self.features[offset : offset + num_frames]  # noqa: E203
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_features"] = None
+        return state
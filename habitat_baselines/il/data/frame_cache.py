@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Parallel, resumable builders for the frame caches of the EQA datasets.
+
+Frames are rendered with one simulator per scene in a pool of worker
+processes. Each scene is streamed directly into its own tar shard (webdataset
+frame caches) or written to LMDB in batched transactions (EQA-CNN-Pretrain
+cache). Completed scenes are recorded so an interrupted build resumes from the
+first incomplete scene.
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import tarfile
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+import lmdb
+import numpy as np
+from tqdm import tqdm
+
+from habitat import logger
+from habitat.config import Config
+from habitat.core.utils import try_cv2_import
+
+cv2 = try_cv2_import()
+
+SHARD_MANIFEST_FILENAME = "shards.json"
+LMDB_PROGRESS_FILENAME = "progress.json"
+
+# (position, rotation) of a single frame
+Pose = Tuple[Sequence[float], Sequence[float]]
+
+
+def _scene_key(scene: str) -> str:
+    return os.path.basename(scene).split(".")[0]
+
+
+def _write_json_atomic(path: str, data: Dict) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _make_scene_sim(sim_config: Config, scene: str):
+    from habitat.sims import make_sim
+
+    sim_config = sim_config.clone()
+    sim_config.defrost()
+    sim_config.SCENE = scene
+    sim_config.freeze()
+    return make_sim(id_sim=sim_config.TYPE, config=sim_config)
+
+
+def _imap_scenes(
+    fn: Callable[[Any], str], tasks: List[Any], num_workers: int
+) -> Iterator[str]:
+    r"""Runs :p:`fn` on every task in a pool of :p:`num_workers` processes,
+    or in the calling process if :p:`num_workers` is 0, and yields the scenes
+    as they are completed.
+    """
+    if num_workers == 0:
+        yield from map(fn, tasks)
+        return
+
+    # forkserver avoids inheriting the parent's simulator and GL context
+    mp_ctx = multiprocessing.get_context("forkserver")
+    with mp_ctx.Pool(num_workers) as pool:
+        yield from pool.imap_unordered(fn, tasks)
+
+
+def get_frame_dataset_urls(frame_dataset_path: str) -> List[str]:
+    r"""Returns the webdataset urls of a frame cache. Caches built by
+    :ref:`build_tar_frame_cache` are split into one shard per scene, caches
+    built with older versions are a single :py:`.tar` archive.
+    """
+    if os.path.exists(frame_dataset_path + ".tar"):
+        return [frame_dataset_path + ".tar"]
+    with open(
+        os.path.join(frame_dataset_path, SHARD_MANIFEST_FILENAME), "r"
+    ) as f:
+        shards = json.load(f)["shards"]
+    return [os.path.join(frame_dataset_path, shard) for shard in shards]
+
+
+def tar_frame_cache_exists(frame_dataset_path: str) -> bool:
+    r"""Whether a complete webdataset frame cache exists."""
+    return os.path.exists(frame_dataset_path + ".tar") or os.path.exists(
+        os.path.join(frame_dataset_path, SHARD_MANIFEST_FILENAME)
+    )
+
+
+def _write_scene_shard(
+    args: Tuple[Config, str, List[Tuple[str, List[Pose]]], str]
+) -> str:
+    sim_config, scene, episode_poses, shard_path = args
+    incomplete_path = shard_path + ".incomplete"
+    with _make_scene_sim(sim_config, scene) as sim, tarfile.open(
+        incomplete_path, "w"
+    ) as tar:
+        for episode_key, poses in episode_poses:
+            for idx, (position, rotation) in enumerate(poses):
+                observation = sim.get_observations_at(position, rotation)
+                _, jpg = cv2.imencode(".jpg", observation["rgb"][..., ::-1])
+                data = jpg.tobytes()
+                tar_info = tarfile.TarInfo(
+                    "{}.{}.jpg".format(episode_key, "{0:0=3d}".format(idx))
+                )
+                tar_info.size = len(data)
+                tar.addfile(tar_info, io.BytesIO(data))
+    # only complete shards are renamed into place
+    os.replace(incomplete_path, shard_path)
+    return scene
+
+
+def build_tar_frame_cache(
+    sim_config: Config,
+    scene_episode_poses: Dict[str, List[Tuple[str, List[Pose]]]],
+    frame_dataset_path: str,
+    num_workers: int = 4,
+) -> List[str]:
+    r"""Renders the rgb frames of all episodes and streams them into one tar
+    shard per scene in :p:`frame_dataset_path`, without an intermediate
+    folder of images.
+
+    Shards of scenes completed by a previous, interrupted call are kept and
+    skipped. Once all scenes are done a manifest listing the shards is
+    written, see :ref:`get_frame_dataset_urls`.
+
+    :param sim_config: simulator config, :py:`SCENE` is overwritten for each
+        scene.
+    :param scene_episode_poses: ordered dict from scene to a list of
+        :py:`(episode key, [(position, rotation), ...])` with the frames of
+        each episode in the order they are stored.
+    :param frame_dataset_path: directory the shards are written to.
+    :param num_workers: number of worker processes, one scene each, 0 to
+        render in the calling process.
+    :return: urls of the shards in scene order.
+    """
+    os.makedirs(frame_dataset_path, exist_ok=True)
+    shards = {
+        scene: "{}.tar".format(_scene_key(scene))
+        for scene in scene_episode_poses
+    }
+    tasks = [
+        (
+            sim_config,
+            scene,
+            episode_poses,
+            os.path.join(frame_dataset_path, shards[scene]),
+        )
+        for scene, episode_poses in scene_episode_poses.items()
+        if not os.path.exists(os.path.join(frame_dataset_path, shards[scene]))
+    ]
+    logger.info(
+        "[ Rendering frames of {} scenes ({} already cached). ]".format(
+            len(tasks), len(shards) - len(tasks)
+        )
+    )
+
+    for _ in tqdm(
+        _imap_scenes(_write_scene_shard, tasks, num_workers),
+        total=len(tasks),
+        desc="Saving episode frames for each scene",
+    ):
+        pass
+
+    _write_json_atomic(
+        os.path.join(frame_dataset_path, SHARD_MANIFEST_FILENAME),
+        {"shards": [shards[scene] for scene in scene_episode_poses]},
+    )
+    return get_frame_dataset_urls(frame_dataset_path)
+
+
+def _get_semantic_mapping(sim) -> np.ndarray:
+    scene = sim.semantic_annotations()
+    instance_id_to_label_id = {
+        int(obj.id.split("_")[-1]): obj.category.index()
+        for obj in scene.objects
+    }
+    return np.array(
+        [
+            instance_id_to_label_id[i]
+            for i in range(len(instance_id_to_label_id))
+        ]
+    )
+
+
+def _write_scene_lmdb(
+    args: Tuple[Config, str, List[Tuple[int, Pose]], str, int]
+) -> str:
+    sim_config, scene, samples, dataset_path, write_batch_size = args
+    lmdb_env = lmdb.open(dataset_path, map_size=int(1e11), writemap=True)
+    with _make_scene_sim(sim_config, scene) as sim:
+        # the semantic mapping only depends on the scene
+        mapping = _get_semantic_mapping(sim)
+        batch: List[Tuple[bytes, bytes]] = []
+        for sample_idx, (position, rotation) in samples:
+            observation = sim.get_observations_at(position, rotation)
+            seg = np.take(mapping, observation["semantic"])
+            seg[seg == -1] = 0
+            seg = seg.astype("uint8")
+
+            sample_key = "{0:0=6d}".format(sample_idx)
+            batch.append(
+                ((sample_key + "_rgb").encode(), observation["rgb"].tobytes())
+            )
+            batch.append(
+                (
+                    (sample_key + "_depth").encode(),
+                    observation["depth"].tobytes(),
+                )
+            )
+            batch.append(((sample_key + "_seg").encode(), seg.tobytes()))
+
+            if len(batch) >= 3 * write_batch_size:
+                with lmdb_env.begin(write=True) as txn:
+                    for key, value in batch:
+                        txn.put(key, value)
+                batch = []
+
+        if len(batch) > 0:
+            with lmdb_env.begin(write=True) as txn:
+                for key, value in batch:
+                    txn.put(key, value)
+    lmdb_env.close()
+    return scene
+
+
+def lmdb_frame_cache_exists(dataset_path: str) -> bool:
+    r"""Whether a complete LMDB frame cache exists. Caches built with older
+    versions have no progress file and are complete if not empty.
+    """
+    if not os.path.exists(dataset_path) or not os.listdir(dataset_path):
+        return False
+    progress_path = os.path.join(dataset_path, LMDB_PROGRESS_FILENAME)
+    if not os.path.exists(progress_path):
+        return True
+    with open(progress_path, "r") as f:
+        return json.load(f)["complete"]
+
+
+def build_lmdb_frame_cache(
+    sim_config: Config,
+    scene_samples: Dict[str, List[Pose]],
+    dataset_path: str,
+    num_workers: int = 4,
+    write_batch_size: int = 64,
+) -> None:
+    r"""Renders rgb, depth and semantic frames and writes them to an LMDB
+    database, one scene per worker process and :p:`write_batch_size` samples
+    per transaction.
+
+    Samples are indexed consecutively in scene order, so the keys of every
+    scene are fixed and scenes completed by a previous, interrupted call are
+    skipped.
+
+    :param sim_config: simulator config, :py:`SCENE` is overwritten for each
+        scene.
+    :param scene_samples: ordered dict from scene to the
+        :py:`(position, rotation)` of each sample.
+    :param dataset_path: LMDB directory.
+    :param num_workers: number of worker processes, one scene each, 0 to
+        render in the calling process.
+    :param write_batch_size: number of samples per write transaction.
+    """
+    os.makedirs(dataset_path, exist_ok=True)
+    progress_path = os.path.join(dataset_path, LMDB_PROGRESS_FILENAME)
+    progress = {"scenes_done": [], "complete": False}
+    if os.path.exists(progress_path):
+        with open(progress_path, "r") as f:
+            progress = json.load(f)
+
+    tasks = []
+    sample_offset = 0
+    for scene, samples in scene_samples.items():
+        if scene not in progress["scenes_done"]:
+            tasks.append(
+                (
+                    sim_config,
+                    scene,
+                    list(enumerate(samples, start=sample_offset)),
+                    dataset_path,
+                    write_batch_size,
+                )
+            )
+        sample_offset += len(samples)
+    logger.info(
+        "[ Rendering frames of {} scenes ({} already cached). ]".format(
+            len(tasks), len(scene_samples) - len(tasks)
+        )
+    )
+
+    # written before any frame, so that an interrupted build is never taken
+    # for a complete cache of an older version
+    _write_json_atomic(progress_path, progress)
+    for scene in tqdm(
+        _imap_scenes(_write_scene_lmdb, tasks, num_workers),
+        total=len(tasks),
+        desc="Saving frames for each scene",
+    ):
+        progress["scenes_done"].append(scene)
+        _write_json_atomic(progress_path, progress)
+
+    progress["complete"] = True
+    _write_json_atomic(progress_path, progress)
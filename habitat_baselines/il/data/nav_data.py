@@ -1,5 +1,4 @@
-import os
-from typing import Callable, Dict, Generator, List, Tuple, Union
+from typing import Callable, Dict, Generator, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -10,20 +9,25 @@ from tqdm import tqdm
 import habitat
 from habitat import logger
 from habitat.config import Config
-from habitat.core.simulator import ShortestPathPoint
-from habitat.core.utils import try_cv2_import
 from habitat.datasets.utils import VocabDict
+from habitat_baselines.il.data.feature_store import (
+    EpisodeFeatureStore,
+    feature_store_exists,
+    get_file_key,
+    write_feature_store,
+)
+from habitat_baselines.il.data.frame_cache import (
+    build_tar_frame_cache,
+    get_frame_dataset_urls,
+    tar_frame_cache_exists,
+)
 from habitat_baselines.il.models.models import MultitaskCNN
 from habitat_baselines.utils.common import (
     base_plus_ext,
-    create_tar_archive,
-    delete_folder,
     get_scene_episode_dict,
     valid_sample,
 )
 
-cv2 = try_cv2_import()
-
 
 class NavDataset(wds.Dataset):
     """Pytorch dataset for PACMAN based navigation"""
@@ -91,12 +95,6 @@ class NavDataset(wds.Dataset):
 
         self.sort_episodes(consecutive_ids=False)
 
-        group_by_keys = filters.Curried(self.group_by_keys_)
-        super().__init__(
-            urls=self.frame_dataset_path + ".tar",
-            initial_pipeline=[group_by_keys()],
-        )
-
         if not self.cache_exists():
             """
             for each scene > load scene in memory > save frames for each
@@ -112,35 +110,51 @@ class NavDataset(wds.Dataset):
                     self.mode, len(self.episodes)
                 )
             )
-            ctr = 0
-            for scene in tqdm(
-                list(self.scene_episode_dict.keys()),
-                desc="Going through all scenes from dataset",
-            ):
-                self.load_scene(scene)
-
-                for episode in tqdm(
-                    self.scene_episode_dict[scene],
-                    desc="Saving episode frames for each scene",
-                ):
-                    pos_queue = episode.shortest_paths[0]
-                    self.save_frame_queue(pos_queue, episode.episode_id)
-
-            logger.info("[ Saved all episodes' frames to disk. ]")
 
-            create_tar_archive(
-                self.frame_dataset_path + ".tar",
+            scene_episode_poses = {
+                scene: [
+                    (
+                        "{0:0=4d}".format(int(episode.episode_id)),
+                        [
+                            (pos.position, pos.rotation)
+                            for pos in episode.shortest_paths[0]
+                        ],
+                    )
+                    for episode in episodes
+                ]
+                for scene, episodes in self.scene_episode_dict.items()
+            }
+            build_tar_frame_cache(
+                self.config.SIMULATOR,
+                scene_episode_poses,
                 self.frame_dataset_path,
+                num_workers=config.FRAME_CACHE_NUM_WORKERS,
             )
 
-            logger.info("[ Tar archive created. ]")
-            logger.info(
-                "[ Deleting dataset folder. This will take a few minutes. ]"
-            )
-            delete_folder(self.frame_dataset_path)
-
             logger.info("[ Frame dataset is ready. ]")
 
+        group_by_keys = filters.Curried(self.group_by_keys_)
+        super().__init__(
+            urls=get_frame_dataset_urls(self.frame_dataset_path),
+            initial_pipeline=[group_by_keys()],
+        )
+
+        self.feature_store: Optional[EpisodeFeatureStore] = None
+        if config.FEATURE_STORE_PATH:
+            feature_store_path = config.FEATURE_STORE_PATH.format(
+                split=self.mode
+            )
+            # the features depend on the weights of the CNN
+            feature_store_key = get_file_key(config.EQA_CNN_PRETRAIN_CKPT_PATH)
+            if not feature_store_exists(feature_store_path, feature_store_key):
+                logger.info(
+                    "[ Feature store not present or computed with another "
+                    "CNN checkpoint. Extracting image features. ]"
+                )
+                self.extract_features(feature_store_path, feature_store_key)
+                logger.info("[ Feature store is ready. ]")
+            self.feature_store = EpisodeFeatureStore(feature_store_path)
+
     def flat_to_hierarchical_actions(
         self, actions: Union[List[int], np.ndarray], controller_action_lim: int
     ):
@@ -186,10 +200,62 @@ class NavDataset(wds.Dataset):
                 .view(1, 3, 256, 256)
                 .to(self.device)
             )
+        else:
+            img_t = img
 
         with torch.no_grad():
             return self.cnn(img_t)
 
+    def get_frame_queue(self, x: Dict) -> torch.Tensor:
+        r"""Stacks the decoded frames of a webdataset sample into the CNN
+        input.
+        """
+        frame_queue = np.array(
+            [img.transpose(2, 0, 1) / 255.0 for img in list(x.values())[4:]]
+        )
+        return torch.Tensor(frame_queue).to(self.device)
+
+    def get_episode_img_features(self, idx: int) -> np.ndarray:
+        r"""Returns the image features of all frames of an episode, read from
+        the feature store if present and computed from the current
+        :py:`frame_queue` otherwise.
+        """
+        if self.feature_store is not None:
+            return np.array(self.feature_store[idx])
+        return self.get_img_features(self.frame_queue).cpu().numpy()
+
+    def extract_features(
+        self, feature_store_path: str, key: Optional[str] = None
+    ) -> None:
+        r"""Runs the CNN once over the frames of all episodes and writes the
+        features to a feature store with the given key, see
+        :ref:`EpisodeFeatureStore`.
+        """
+        group_by_keys = filters.Curried(self.group_by_keys_)
+        frame_dataset = wds.Dataset(
+            urls=get_frame_dataset_urls(self.frame_dataset_path),
+            initial_pipeline=[group_by_keys()],
+        ).decode("rgb")
+
+        def episode_features():
+            for x in tqdm(
+                frame_dataset,
+                total=len(self.episodes),
+                desc="Extracting image features of each episode",
+            ):
+                yield x["episode_id"], self.get_img_features(
+                    self.get_frame_queue(x)
+                ).cpu().numpy()
+
+        write_feature_store(
+            feature_store_path,
+            episode_features(),
+            num_frames=sum(
+                len(episode.shortest_paths[0]) for episode in self.episodes
+            ),
+            key=key,
+        )
+
     def get_hierarchical_features_till_spawn(
         self,
         idx: int,
@@ -229,9 +295,7 @@ class NavDataset(wds.Dataset):
 
         pq_idx_pruned = [v for v in pq_idx if v <= target_pos_idx]
         pa_pruned = pa[: len(pq_idx_pruned) + 1]
-        raw_img_feats = (
-            self.get_img_features(self.frame_queue).cpu().numpy().copy()
-        )
+        raw_img_feats = self.get_episode_img_features(idx)
 
         controller_img_feat = torch.from_numpy(
             raw_img_feats[target_pos_idx].copy()
@@ -386,36 +450,8 @@ class NavDataset(wds.Dataset):
             for idx, ep in enumerate(self.episodes):
                 ep.episode_id = idx
 
-    def save_frame_queue(
-        self,
-        pos_queue: List[ShortestPathPoint],
-        episode_id: str,
-    ) -> None:
-        r"""Writes episode's frame queue to disk."""
-        for idx, pos in enumerate(pos_queue):
-            observation = self.env.sim.get_observations_at(
-                pos.position, pos.rotation
-            )
-            img = observation["rgb"]
-            idx = "{0:0=3d}".format(idx)
-            episode_id = "{0:0=4d}".format(int(episode_id))
-            new_path = os.path.join(
-                self.frame_dataset_path, "{}.{}".format(episode_id, idx)
-            )
-            cv2.imwrite(new_path + ".jpg", img[..., ::-1])
-
     def cache_exists(self) -> bool:
-        if os.path.exists(self.frame_dataset_path + ".tar"):
-            return True
-        else:
-            os.makedirs(self.frame_dataset_path, exist_ok=True)
-            return False
-
-    def load_scene(self, scene: str) -> None:
-        self.config.defrost()
-        self.config.SIMULATOR.SCENE = scene
-        self.config.freeze()
-        self.env.sim.reconfigure(self.config.SIMULATOR)
+        return tar_frame_cache_exists(self.frame_dataset_path)
 
     def map_dataset_sample(self, x: Dict) -> Tuple:
         """Mapper function to pre-process webdataset sample, example:
@@ -434,10 +470,8 @@ class NavDataset(wds.Dataset):
             for _ in range(diff):
                 question.append(0)
 
-        self.frame_queue = np.array(
-            [img.transpose(2, 0, 1) / 255.0 for img in list(x.values())[4:]]
-        )
-        self.frame_queue = torch.Tensor(self.frame_queue).to(self.device)
+        if self.feature_store is None:
+            self.frame_queue = self.get_frame_queue(x)
 
         if self.mode == "val":
             # works only with batch size 1
@@ -463,9 +497,7 @@ class NavDataset(wds.Dataset):
         planner_action_length = self.episodes[idx].planner_action_length
         controller_action_length = self.episodes[idx].controller_action_length
 
-        raw_img_feats = (
-            self.get_img_features(self.frame_queue).cpu().numpy().copy()
-        )
+        raw_img_feats = self.get_episode_img_features(idx)
         img_feats = np.zeros(
             (self.max_action_len, raw_img_feats.shape[1]), dtype=np.float32
         )
@@ -135,15 +135,13 @@ class PACMANTrainer(BaseILTrainer):
         config = self.config
 
         with habitat.Env(config.TASK_CONFIG) as env:
-            nav_dataset = (
-                NavDataset(
-                    config,
-                    env,
-                    self.device,
-                )
-                .shuffle(1000)
-                .decode("rgb")
-            )
+            nav_dataset = NavDataset(
+                config,
+                env,
+                self.device,
+            ).shuffle(1000)
+            if nav_dataset.feature_store is None:
+                nav_dataset = nav_dataset.decode("rgb")
 
             nav_dataset = nav_dataset.map(nav_dataset.map_dataset_sample)
 
@@ -360,7 +358,9 @@ class PACMANTrainer(BaseILTrainer):
                 config,
                 env,
                 self.device,
-            ).decode("rgb")
+            )
+            if nav_dataset.feature_store is None:
+                nav_dataset = nav_dataset.decode("rgb")
 
             nav_dataset = nav_dataset.map(nav_dataset.map_dataset_sample)
 
@@ -7,6 +7,7 @@
 import math
 import os
 import time
+from typing import Tuple, Union
 
 import torch
 from torch.utils.data import DataLoader
@@ -16,10 +17,10 @@ from habitat.datasets.utils import VocabDict
 from habitat_baselines.common.base_il_trainer import BaseILTrainer
 from habitat_baselines.common.baseline_registry import baseline_registry
 from habitat_baselines.common.tensorboard_utils import TensorboardWriter
-from habitat_baselines.il.data.data import EQADataset
+from habitat_baselines.il.data.data import EQADataset, EQADecodedFrameDataset
 from habitat_baselines.il.metrics import VqaMetric
 from habitat_baselines.il.models.models import VqaLstmCnnAttentionModel
-from habitat_baselines.utils.common import img_bytes_2_np_array
+from habitat_baselines.utils.common import img_bytes_2_uint8_tensor
 from habitat_baselines.utils.visualizations.utils import save_vqa_image_results
 
 
@@ -102,35 +103,67 @@ class VQATrainer(BaseILTrainer):
             images, q_string, pred_answer, gt_answer, result_path
         )
 
-    def train(self) -> None:
-        r"""Main method for training VQA (Answering) model of EQA.
-
-        Returns:
-            None
+    def _make_vqa_dataset_and_loader(
+        self,
+    ) -> Tuple[Union[EQADataset, EQADecodedFrameDataset], DataLoader]:
+        r"""Makes the VQA dataset and its DataLoader. Frames are decoded to
+        uint8 tensors in the DataLoader workers, or read from the decoded
+        frame cache if :py:`IL.VQA.cache_decoded_frames` is set.
         """
         config = self.config
+        eqa_dataset = EQADataset(
+            config,
+            input_type="vqa",
+            num_frames=config.IL.VQA.num_frames,
+        )
 
-        # env = habitat.Env(config=config.TASK_CONFIG)
+        loader_kwargs = {
+            "batch_size": config.IL.VQA.batch_size,
+            "num_workers": config.IL.VQA.num_workers,
+            "pin_memory": self.device.type == "cuda",
+        }
+        if config.IL.VQA.cache_decoded_frames:
+            vqa_dataset = EQADecodedFrameDataset(
+                eqa_dataset, num_workers=config.IL.VQA.num_workers
+            )
+            return vqa_dataset, DataLoader(
+                vqa_dataset, shuffle=True, **loader_kwargs
+            )
 
+        # the frame cache is sharded per scene, so the DataLoader workers
+        # read and decode disjoint shards
         vqa_dataset = (
-            EQADataset(
-                config,
-                input_type="vqa",
-                num_frames=config.IL.VQA.num_frames,
-            )
-            .shuffle(1000)
+            eqa_dataset.shuffle(1000)
             .to_tuple(
                 "episode_id",
                 "question",
                 "answer",
-                *["{0:0=3d}.jpg".format(x) for x in range(0, 5)],
+                *[
+                    "{0:0=3d}.jpg".format(x)
+                    for x in range(config.IL.VQA.num_frames)
+                ],
             )
-            .map(img_bytes_2_np_array)
+            .map(img_bytes_2_uint8_tensor)
         )
+        return vqa_dataset, DataLoader(vqa_dataset, **loader_kwargs)
 
-        train_loader = DataLoader(
-            vqa_dataset, batch_size=config.IL.VQA.batch_size
-        )
+    def _frames_to_device(self, frame_queue: torch.Tensor) -> torch.Tensor:
+        r"""Moves a batch of uint8 frames to the device and scales them to
+        [0, 1].
+        """
+        return frame_queue.to(self.device, non_blocking=True).float() / 255.0
+
+    def train(self) -> None:
+        r"""Main method for training VQA (Answering) model of EQA.
+
+        Returns:
+            None
+        """
+        config = self.config
+
+        # env = habitat.Env(config=config.TASK_CONFIG)
+
+        vqa_dataset, train_loader = self._make_vqa_dataset_and_loader()
 
         logger.info("train_loader has {} samples".format(len(vqa_dataset)))
 
@@ -186,9 +219,9 @@ class VQATrainer(BaseILTrainer):
                     _, questions, answers, frame_queue = batch
                     optim.zero_grad()
 
-                    questions = questions.to(self.device)
-                    answers = answers.to(self.device)
-                    frame_queue = frame_queue.to(self.device)
+                    questions = questions.to(self.device, non_blocking=True)
+                    answers = answers.to(self.device, non_blocking=True)
+                    frame_queue = self._frames_to_device(frame_queue)
 
                     scores, _ = model(frame_queue, questions)
                     loss = lossFn(scores, answers)
@@ -286,25 +319,7 @@ class VQATrainer(BaseILTrainer):
         config.TASK_CONFIG.DATASET.SPLIT = self.config.EVAL.SPLIT
         config.freeze()
 
-        vqa_dataset = (
-            EQADataset(
-                config,
-                input_type="vqa",
-                num_frames=config.IL.VQA.num_frames,
-            )
-            .shuffle(1000)
-            .to_tuple(
-                "episode_id",
-                "question",
-                "answer",
-                *["{0:0=3d}.jpg".format(x) for x in range(0, 5)],
-            )
-            .map(img_bytes_2_np_array)
-        )
-
-        eval_loader = DataLoader(
-            vqa_dataset, batch_size=config.IL.VQA.batch_size
-        )
+        vqa_dataset, eval_loader = self._make_vqa_dataset_and_loader()
 
         logger.info("eval_loader has {} samples".format(len(vqa_dataset)))
 
@@ -349,9 +364,9 @@ class VQATrainer(BaseILTrainer):
             for batch in eval_loader:
                 t += 1
                 episode_ids, questions, answers, frame_queue = batch
-                questions = questions.to(self.device)
-                answers = answers.to(self.device)
-                frame_queue = frame_queue.to(self.device)
+                questions = questions.to(self.device, non_blocking=True)
+                answers = answers.to(self.device, non_blocking=True)
+                frame_queue = self._frames_to_device(frame_queue)
 
                 scores, _ = model(frame_queue, questions)
 
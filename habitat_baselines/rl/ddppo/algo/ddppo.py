@@ -4,7 +4,8 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Tuple
+import time
+from typing import List, Tuple
 
 import torch
 from torch import distributed as distrib
@@ -32,17 +33,46 @@ def distributed_mean_and_var(
 
     world_size = distrib.get_world_size()
 
-    mean = values.mean()
-    distrib.all_reduce(mean)
-    mean = mean / world_size
+    # The local means and variances are gathered with a single collective,
+    # the variance around the global mean of each worker is then
+    # var_i + (mean_i - mean)^2
+    local_mean = values.mean()
+    local_stats = torch.stack(
+        [local_mean, (values - local_mean).pow(2).mean()]
+    )
+    all_stats = [torch.empty_like(local_stats) for _ in range(world_size)]
+    distrib.all_gather(all_stats, local_stats)
+    means, variances = torch.stack(all_stats, 1)
 
-    var = (values - mean).pow(2).mean()
-    distrib.all_reduce(var)
-    var = var / world_size
+    mean = means.mean()
+    var = (variances + (means - mean).pow(2)).mean()
 
     return mean, var
 
 
+class _CommHookState:
+    def __init__(self, process_group=None):
+        self.process_group = process_group
+        self.comm_time = 0.0
+
+
+def _timed_allreduce_hook(state: _CommHookState, bucket):
+    r"""DistributedDataParallel communication hook that all-reduces the
+    gradients as the default one does and adds the time until the reduction
+    is done to :p:`state.comm_time`.
+    """
+    from torch.distributed.algorithms.ddp_comm_hooks import default_hooks
+
+    t_start = time.time()
+    fut = default_hooks.allreduce_hook(state.process_group, bucket)
+
+    def _add_comm_time(fut):
+        state.comm_time += time.time() - t_start
+        return fut.value()
+
+    return fut.then(_add_comm_time)
+
+
 class _EvalActionsWrapper(torch.nn.Module):
     r"""Wrapper on evaluate_actions that allows that to be called from forward.
     This is needed to interface with DistributedDataParallel's forward call
@@ -69,7 +99,9 @@ class DecentralizedDistributedMixin:
         if not self.use_normalized_advantage:  # type: ignore
             return advantages
 
+        t_comm = time.time()
         mean, var = distributed_mean_and_var(advantages)
+        self._comm_time += time.time() - t_comm
 
         return (advantages - mean) / (var.sqrt() + EPS_PPO)
 
@@ -102,7 +134,93 @@ class DecentralizedDistributedMixin:
                         find_unused_parameters=find_unused_params,
                     )
 
+                self.comm_hook_state = _CommHookState()
+                # Communication hooks need torch>=1.8, the gradient
+                # communication time is not measured with older versions
+                if hasattr(self.ddp, "register_comm_hook"):
+                    self.ddp.register_comm_hook(
+                        self.comm_hook_state, _timed_allreduce_hook
+                    )
+
         self._evaluate_actions_wrapper = Guard(_EvalActionsWrapper(self.actor_critic), self.device)  # type: ignore
+        self._comm_time = 0.0
+
+    def pop_comm_time(self) -> float:
+        r"""Returns the time in seconds spent communicating since the last
+        call, which is the time of the gradient reductions and of the
+        advantage normalization. Time is measured on the host and the
+        gradient reductions overlap with the backward pass, so this is an
+        estimate to compare with the compute time.
+        """
+        hook_state = self._evaluate_actions_wrapper.comm_hook_state
+        comm_time = self._comm_time + hook_state.comm_time
+        self._comm_time = 0.0
+        hook_state.comm_time = 0.0
+        return comm_time
+
+    def find_unused_params(self, rollouts: RolloutStorage) -> List[str]:
+        r"""Finds the trainable parameters of the policy that are unused when
+        evaluating the actions of the first step of the rollouts. Parameters
+        used by any of the workers are considered used, so all the workers
+        find the same ones.
+
+        Must be called before :ref:`init_distributed`.
+
+        :param rollouts: Rollouts with the observations of their first step.
+        :return: The names of the unused parameters.
+        """
+        params = [
+            (name, param)
+            for name, param in self.actor_critic.named_parameters()  # type: ignore
+            if param.requires_grad
+        ]
+        step_batch = rollouts.buffers[0]
+        (
+            values,
+            action_log_probs,
+            dist_entropy,
+            _,
+        ) = self.actor_critic.evaluate_actions(  # type: ignore
+            step_batch["observations"],
+            step_batch["recurrent_hidden_states"],
+            step_batch["prev_actions"],
+            step_batch["masks"],
+            step_batch["actions"],
+        )
+        (values.sum() + action_log_probs.sum() + dist_entropy.sum()).backward()
+
+        is_used = torch.tensor(
+            [param.grad is not None for _, param in params],
+            dtype=torch.float32,
+            device=self.device,  # type: ignore
+        )
+        distrib.all_reduce(is_used, op=distrib.ReduceOp.MAX)
+        for _, param in params:
+            param.grad = None
+
+        return [
+            name
+            for (name, _), used in zip(params, is_used.tolist())
+            if not used
+        ]
+
+    def freeze_unused_params(self, rollouts: RolloutStorage) -> List[str]:
+        r"""Stops training the parameters found by :ref:`find_unused_params`,
+        so that :ref:`init_distributed` can be called with
+        :py:`find_unused_params=False`, which saves a traversal of the
+        autograd graph in every backward pass.
+
+        This is only correct if the parameters used by the policy do not
+        depend on the observations.
+
+        :return: The names of the frozen parameters.
+        """
+        unused_names = set(self.find_unused_params(rollouts))
+        for name, param in self.actor_critic.named_parameters():  # type: ignore
+            if name in unused_names:
+                param.requires_grad_(False)
+
+        return sorted(unused_names)
 
     def _evaluate_actions(
         self, observations, rnn_hidden_states, prev_actions, masks, action
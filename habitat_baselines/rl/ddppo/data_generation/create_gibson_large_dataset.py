@@ -13,7 +13,6 @@ q_thresh.
 import glob
 import gzip
 import json
-import multiprocessing
 import os
 from os import path as osp
 
@@ -21,7 +20,7 @@ import tqdm
 
 import habitat
 from habitat.datasets.pointnav.pointnav_generator import (
-    generate_pointnav_episode,
+    generate_pointnav_episodes_parallel,
 )
 
 NUM_EPISODES_PER_SCENE = int(1e4)
@@ -36,21 +35,9 @@ def safe_mkdir(path):
         pass
 
 
-def _generate_fn(scene):
-    cfg = habitat.get_config()
-    cfg.defrost()
-    cfg.SIMULATOR.SCENE = scene
-    cfg.SIMULATOR.AGENT_0.SENSORS = []
-    cfg.freeze()
-
-    sim = habitat.sims.make_sim("Sim-v0", config=cfg.SIMULATOR)
-
+def _save_scene_episodes(scene, episodes):
     dset = habitat.datasets.make_dataset("PointNav-v1")
-    dset.episodes = list(
-        generate_pointnav_episode(
-            sim, NUM_EPISODES_PER_SCENE, is_gen_shortest_path=False
-        )
-    )
+    dset.episodes = episodes
     for ep in dset.episodes:
         ep.scene_id = ep.scene_id[len("./data/scene_datasets/") :]
 
@@ -88,8 +75,20 @@ def generate_gibson_large_dataset():
     print(f"Total number of training scenes: {len(scenes)}")
 
     safe_mkdir("./data/datasets/pointnav/gibson/v2/train_large")
-    with multiprocessing.Pool(8) as pool, tqdm.tqdm(total=len(scenes)) as pbar:
-        for _ in pool.imap_unordered(_generate_fn, scenes):
+    cfg = habitat.get_config()
+    cfg.defrost()
+    cfg.SIMULATOR.AGENT_0.SENSORS = []
+    cfg.freeze()
+    with tqdm.tqdm(total=len(scenes)) as pbar:
+        for scene, episodes in generate_pointnav_episodes_parallel(
+            cfg.SIMULATOR,
+            scenes,
+            NUM_EPISODES_PER_SCENE,
+            num_processes=8,
+            seed=cfg.SEED,
+            is_gen_shortest_path=False,
+        ):
+            _save_scene_episodes(scene, episodes)
             pbar.update()
 
     path = "./data/datasets/pointnav/gibson/v2/train_large/train_large.json.gz"
@@ -11,6 +11,7 @@ import torch
 from torch import distributed as distrib
 
 from habitat import Config, logger
+from habitat_baselines.utils.checkpoint_writer import AsyncCheckpointWriter
 
 EXIT = threading.Event()
 EXIT.clear()
@@ -152,19 +153,31 @@ def add_signal_handlers() -> None:
 
 
 @rank0_only
-def save_resume_state(state: Any, filename_or_config: Union[Config, str]):
+def save_resume_state(
+    state: Any,
+    filename_or_config: Union[Config, str],
+    writer: Optional[AsyncCheckpointWriter] = None,
+):
     r"""Saves the resume job state to the specified filename.
         This is useful when working with preemptable job partitions.
 
     :param state: The state to save
     :param filename_or_config: The filename of the saved state or the config to construct it.
+    :param writer: If given, the state is saved in the background by this
+        writer, else it is saved before returning. Either way, the file is
+        replaced atomically.
     """
     if isinstance(filename_or_config, Config):
         filename = resume_state_filename(filename_or_config)
     else:
         filename = filename_or_config
 
-    torch.save(state, filename)
+    if writer is None:
+        writer = AsyncCheckpointWriter()
+        writer.save(state, filename)
+        writer.wait()
+    else:
+        writer.save(state, filename)
 
 
 def load_resume_state(filename_or_config: Union[Config, str]) -> Optional[Any]:
@@ -204,6 +217,75 @@ def requeue_job():
         subprocess.check_call(["scontrol", "requeue", str(SLURM_JOBID)])
 
 
+class RolloutsDonePoller:
+    r"""Polls the number of workers done with their rollout from a store in a
+    background thread, so that the rollout steps of a worker checking whether
+    it is a straggler never wait for the store.
+
+    The store is polled at most every :p:`poll_interval` seconds, and only
+    while a rollout is :ref:`activate`-d. A value polled during a previous
+    rollout is never reported.
+    """
+
+    def __init__(
+        self, store: Any, key: str = "num_done", poll_interval: float = 0.25
+    ) -> None:
+        self._store = store
+        self._key = key
+        self._poll_interval = poll_interval
+        self._num_done = 0
+        # Incremented at every rollout, so that a poll started during a
+        # rollout is dropped once the next one began
+        self._rollout_idx = 0
+        self._lock = threading.Lock()
+        self._is_active = threading.Event()
+        self._is_closed = threading.Event()
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._thread.start()
+
+    @property
+    def is_active(self) -> bool:
+        return self._is_active.is_set()
+
+    @property
+    def num_done(self) -> int:
+        r"""Last polled number of workers done with the current rollout."""
+        return self._num_done
+
+    def activate(self) -> None:
+        r"""Starts polling the store for the current rollout."""
+        self._is_active.set()
+
+    def reset(self) -> None:
+        r"""Stops polling the store until the next rollout is
+        :ref:`activate`-d.
+        """
+        with self._lock:
+            self._is_active.clear()
+            self._rollout_idx += 1
+            self._num_done = 0
+
+    def close(self) -> None:
+        self._is_closed.set()
+        self._is_active.set()
+        self._thread.join()
+
+    def _poll_loop(self) -> None:
+        while True:
+            self._is_active.wait()
+            if self._is_closed.is_set():
+                return
+
+            rollout_idx = self._rollout_idx
+            num_done = int(self._store.get(self._key))
+            with self._lock:
+                if rollout_idx == self._rollout_idx and self.is_active:
+                    self._num_done = num_done
+
+            if self._is_closed.wait(self._poll_interval):
+                return
+
+
 def get_ifname() -> str:
     return ifcfg.default_interface()["device"]
 
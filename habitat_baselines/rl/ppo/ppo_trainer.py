@@ -20,7 +20,6 @@ from torch.optim.lr_scheduler import LambdaLR
 
 from habitat import Config, VectorEnv, logger
 from habitat.utils import profiling_wrapper
-from habitat.utils.visualizations.utils import observations_to_image
 from habitat_baselines.common.base_trainer import BaseRLTrainer
 from habitat_baselines.common.baseline_registry import baseline_registry
 from habitat_baselines.common.environments import get_env_class
@@ -34,6 +33,7 @@ from habitat_baselines.common.tensorboard_utils import TensorboardWriter
 from habitat_baselines.rl.ddppo.algo import DDPPO
 from habitat_baselines.rl.ddppo.ddp_utils import (
     EXIT,
+    RolloutsDonePoller,
     add_signal_handlers,
     get_distrib_size,
     init_distrib_slurm,
@@ -48,13 +48,14 @@ from habitat_baselines.rl.ddppo.policy import (  # noqa: F401.
 )
 from habitat_baselines.rl.ppo import PPO
 from habitat_baselines.rl.ppo.policy import Policy
+from habitat_baselines.utils.checkpoint_writer import AsyncCheckpointWriter
 from habitat_baselines.utils.common import (
     ObservationBatchingCache,
     action_to_velocity_control,
     batch_obs,
-    generate_video,
 )
 from habitat_baselines.utils.env_utils import construct_envs
+from habitat_baselines.utils.video_renderer import VideoRenderer
 
 
 @baseline_registry.register_trainer(name="ddppo")
@@ -87,6 +88,8 @@ class PPOTrainer(BaseRLTrainer):
         # greater than 1
         self._is_distributed = get_distrib_size()[2] > 1
         self._obs_batching_cache = ObservationBatchingCache()
+        # Writes the checkpoints and resume states in the background
+        self._checkpoint_writer = AsyncCheckpointWriter()
 
         self.using_velocity_ctrl = (
             self.config.TASK_CONFIG.TASK.POSSIBLE_ACTIONS
@@ -191,15 +194,24 @@ class PPOTrainer(BaseRLTrainer):
         if config is None:
             config = self.config
 
+        scene_split_kwargs = {}
+        if self._is_distributed and config.RL.DDPPO.split_scenes_by_rank:
+            scene_split_kwargs = dict(
+                num_scene_splits=torch.distributed.get_world_size(),
+                scene_split_index=torch.distributed.get_rank(),
+                scene_split_seed=self._scene_split_seed,
+            )
+
         self.envs = construct_envs(
             config,
             get_env_class(config.ENV_NAME),
             workers_ignore_signals=is_slurm_batch_job(),
+            **scene_split_kwargs,
         )
 
     def _init_train(self):
         resume_state = load_resume_state(self.config)
-        if resume_state is not None:
+        if resume_state is not None and "config" in resume_state:
             self.config: Config = resume_state["config"]
             self.using_velocity_ctrl = (
                 self.config.TASK_CONFIG.TASK.POSSIBLE_ACTIONS
@@ -225,6 +237,8 @@ class PPOTrainer(BaseRLTrainer):
             self.config.defrost()
             self.config.TORCH_GPU_ID = local_rank
             self.config.SIMULATOR_GPU_ID = local_rank
+            # The scenes are split with the seed shared by all the workers
+            self._scene_split_seed = self.config.TASK_CONFIG.SEED
             # Multiply by the number of simulators to make sure they also get unique seeds
             self.config.TASK_CONFIG.SEED += (
                 torch.distributed.get_rank() * self.config.NUM_ENVIRONMENTS
@@ -238,6 +252,11 @@ class PPOTrainer(BaseRLTrainer):
                 "rollout_tracker", tcp_store
             )
             self.num_rollouts_done_store.set("num_done", "0")
+            self._rollouts_done_poller = RolloutsDonePoller(
+                self.num_rollouts_done_store,
+                "num_done",
+                self.config.RL.DDPPO.num_done_poll_interval,
+            )
 
         if rank0_only() and self.config.VERBOSE:
             logger.info(f"config: {self.config}")
@@ -271,8 +290,6 @@ class PPOTrainer(BaseRLTrainer):
             os.makedirs(self.config.CHECKPOINT_FOLDER)
 
         self._setup_actor_critic_agent(ppo_cfg)
-        if self._is_distributed:
-            self.agent.init_distributed(find_unused_params=True)  # type: ignore
 
         logger.info(
             "agent number of parameters: {}".format(
@@ -322,6 +339,21 @@ class PPOTrainer(BaseRLTrainer):
 
         self.rollouts.buffers["observations"][0] = batch  # type: ignore
 
+        if self._is_distributed:
+            find_unused_params = True
+            if self.config.RL.DDPPO.freeze_unused_params:
+                unused_params = self.agent.freeze_unused_params(  # type: ignore
+                    self.rollouts
+                )
+                if rank0_only() and len(unused_params) > 0:
+                    logger.info(
+                        "Froze the unused parameters: {}".format(
+                            ", ".join(unused_params)
+                        )
+                    )
+                find_unused_params = False
+            self.agent.init_distributed(find_unused_params=find_unused_params)  # type: ignore
+
         self.current_episode_reward = torch.zeros(self.envs.num_envs, 1)
         self.running_episode_stats = dict(
             count=torch.zeros(self.envs.num_envs, 1),
@@ -333,6 +365,7 @@ class PPOTrainer(BaseRLTrainer):
 
         self.env_time = 0.0
         self.pth_time = 0.0
+        self.comm_time = 0.0
         self.t_start = time.time()
 
     @rank0_only
@@ -355,7 +388,7 @@ class PPOTrainer(BaseRLTrainer):
         if extra_state is not None:
             checkpoint["extra_state"] = extra_state
 
-        torch.save(
+        self._checkpoint_writer.save(
             checkpoint, os.path.join(self.config.CHECKPOINT_FOLDER, file_name)
         )
 
@@ -423,10 +456,7 @@ class PPOTrainer(BaseRLTrainer):
 
         # sample actions
         with torch.no_grad():
-            step_batch = self.rollouts.buffers[
-                self.rollouts.current_rollout_step_idxs[buffer_index],
-                env_slice,
-            ]
+            step_batch = self.rollouts.get_current_step(buffer_index)
 
             profiling_wrapper.range_push("compute actions")
             (
@@ -580,6 +610,8 @@ class PPOTrainer(BaseRLTrainer):
 
         self.rollouts.after_update()
         self.pth_time += time.time() - t_update_model
+        if self._is_distributed:
+            self.comm_time += self.agent.pop_comm_time()  # type: ignore
 
         return (
             value_loss,
@@ -595,26 +627,35 @@ class PPOTrainer(BaseRLTrainer):
             [self.running_episode_stats[k] for k in stats_ordering], 0
         )
 
-        stats = self._all_reduce(stats)
-
-        for i, k in enumerate(stats_ordering):
-            self.window_episode_stats[k].append(stats[i])
-
         if self._is_distributed:
+            # The episode stats, losses and step count are reduced with a
+            # single collective
             loss_name_ordering = sorted(losses.keys())
-            stats = torch.tensor(
+            loss_stats = torch.tensor(
                 [losses[k] for k in loss_name_ordering] + [count_steps_delta],
                 device="cpu",
-                dtype=torch.float32,
+                dtype=stats.dtype,
+            )
+            t_comm = time.time()
+            all_stats = self._all_reduce(
+                torch.cat([stats.flatten(), loss_stats])
+            )
+            self.comm_time += time.time() - t_comm
+            stats, loss_stats = (
+                all_stats[: stats.numel()].view_as(stats),
+                all_stats[stats.numel() :],
             )
-            stats = self._all_reduce(stats)
-            count_steps_delta = int(stats[-1].item())
-            stats /= torch.distributed.get_world_size()
+            count_steps_delta = int(loss_stats[-1].item())
+            loss_stats /= torch.distributed.get_world_size()
 
             losses = {
-                k: stats[i].item() for i, k in enumerate(loss_name_ordering)
+                k: loss_stats[i].item()
+                for i, k in enumerate(loss_name_ordering)
             }
 
+        for i, k in enumerate(stats_ordering):
+            self.window_episode_stats[k].append(stats[i])
+
         if self._is_distributed and rank0_only():
             self.num_rollouts_done_store.set("num_done", "0")
 
@@ -654,6 +695,12 @@ class PPOTrainer(BaseRLTrainer):
             writer.add_scalar(f"metrics/{k}", v, self.num_steps_done)
         for k, v in losses.items():
             writer.add_scalar(f"losses/{k}", v, self.num_steps_done)
+        if self._is_distributed:
+            writer.add_scalar(
+                "perf/comm_compute_ratio",
+                self.comm_time / max(self.pth_time, 1e-6),
+                self.num_steps_done,
+            )
 
         # log stats
         if self.num_updates_done % self.config.LOG_INTERVAL == 0:
@@ -675,6 +722,15 @@ class PPOTrainer(BaseRLTrainer):
                 )
             )
 
+            if self._is_distributed:
+                logger.info(
+                    "update: {}\tcomm-time: {:.3f}s\tcomm/compute: {:.3f}".format(
+                        self.num_updates_done,
+                        self.comm_time,
+                        self.comm_time / max(self.pth_time, 1e-6),
+                    )
+                )
+
             logger.info(
                 "Average window size: {}  {}".format(
                     len(self.window_episode_stats["count"]),
@@ -689,12 +745,18 @@ class PPOTrainer(BaseRLTrainer):
     def should_end_early(self, rollout_step) -> bool:
         if not self._is_distributed:
             return False
+        if (
+            rollout_step
+            < self.config.RL.PPO.num_steps * self.SHORT_ROLLOUT_THRESHOLD
+        ):
+            return False
+        # The number of workers done is polled in the background from here
+        # until the end of the rollout, and reaches the worker with at most
+        # the polling interval of delay.
+        self._rollouts_done_poller.activate()
         # This is where the preemption of workers happens.  If a
         # worker detects it will be a straggler, it preempts itself!
-        return (
-            rollout_step
-            >= self.config.RL.PPO.num_steps * self.SHORT_ROLLOUT_THRESHOLD
-        ) and int(self.num_rollouts_done_store.get("num_done")) >= (
+        return self._rollouts_done_poller.num_done >= (
             self.config.RL.DDPPO.sync_frac * torch.distributed.get_world_size()
         )
 
@@ -725,6 +787,7 @@ class PPOTrainer(BaseRLTrainer):
             requeue_stats = resume_state["requeue_stats"]
             self.env_time = requeue_stats["env_time"]
             self.pth_time = requeue_stats["pth_time"]
+            self.comm_time = requeue_stats.get("comm_time", 0.0)
             self.num_steps_done = requeue_stats["num_steps_done"]
             self.num_updates_done = requeue_stats["num_updates_done"]
             self._last_checkpoint_percent = requeue_stats[
@@ -760,6 +823,7 @@ class PPOTrainer(BaseRLTrainer):
                     requeue_stats = dict(
                         env_time=self.env_time,
                         pth_time=self.pth_time,
+                        comm_time=self.comm_time,
                         count_checkpoints=count_checkpoints,
                         num_steps_done=self.num_steps_done,
                         num_updates_done=self.num_updates_done,
@@ -769,21 +833,26 @@ class PPOTrainer(BaseRLTrainer):
                         window_episode_stats=dict(self.window_episode_stats),
                     )
 
+                    resume_state = dict(
+                        state_dict=self.agent.state_dict(),
+                        optim_state=self.agent.optimizer.state_dict(),
+                        lr_sched_state=lr_scheduler.state_dict(),
+                        requeue_stats=requeue_stats,
+                    )
+                    if self.config.RL.preemption.save_config_in_resume_state:
+                        resume_state["config"] = self.config
+
                     save_resume_state(
-                        dict(
-                            state_dict=self.agent.state_dict(),
-                            optim_state=self.agent.optimizer.state_dict(),
-                            lr_sched_state=lr_scheduler.state_dict(),
-                            config=self.config,
-                            requeue_stats=requeue_stats,
-                        ),
-                        self.config,
+                        resume_state, self.config, self._checkpoint_writer
                     )
 
                 if EXIT.is_set():
                     profiling_wrapper.range_pop()  # train update
 
                     self.envs.close()
+                    if self._is_distributed:
+                        self._rollouts_done_poller.close()
+                    self._checkpoint_writer.close()
 
                     requeue_job()
 
@@ -825,6 +894,7 @@ class PPOTrainer(BaseRLTrainer):
                 profiling_wrapper.range_pop()  # rollouts loop
 
                 if self._is_distributed:
+                    self._rollouts_done_poller.reset()
                     self.num_rollouts_done_store.add("num_done", 1)
 
                 (
@@ -862,6 +932,9 @@ class PPOTrainer(BaseRLTrainer):
                 profiling_wrapper.range_pop()  # train update
 
             self.envs.close()
+            if self._is_distributed:
+                self._rollouts_done_poller.close()
+            self._checkpoint_writer.close()
 
     def _eval_checkpoint(
         self,
@@ -955,11 +1028,16 @@ class PPOTrainer(BaseRLTrainer):
             Any, Any
         ] = {}  # dict of dicts that stores stats per episode
 
-        rgb_frames = [
-            [] for _ in range(self.config.NUM_ENVIRONMENTS)
-        ]  # type: List[List[np.ndarray]]
+        video_renderer: Optional[VideoRenderer] = None
         if len(self.config.VIDEO_OPTION) > 0:
             os.makedirs(self.config.VIDEO_DIR, exist_ok=True)
+            video_renderer = VideoRenderer(
+                video_option=self.config.VIDEO_OPTION,
+                video_dir=self.config.VIDEO_DIR,
+                tb_writer=writer,
+                num_workers=self.config.VIDEO_RENDER_NUM_WORKERS,
+                max_queued_frames=self.config.VIDEO_RENDER_MAX_QUEUED_FRAMES,
+            )
 
         number_of_eval_episodes = self.config.TEST_EPISODE_COUNT
         if number_of_eval_episodes == -1:
@@ -976,130 +1054,138 @@ class PPOTrainer(BaseRLTrainer):
 
         pbar = tqdm.tqdm(total=number_of_eval_episodes)
         self.actor_critic.eval()
-        while (
-            len(stats_episodes) < number_of_eval_episodes
-            and self.envs.num_envs > 0
+        with (
+            video_renderer
+            if video_renderer is not None
+            else contextlib.suppress()
         ):
-            current_episodes = self.envs.current_episodes()
-
-            with torch.no_grad():
-                (
-                    _,
-                    actions,
-                    _,
-                    test_recurrent_hidden_states,
-                ) = self.actor_critic.act(
-                    batch,
-                    test_recurrent_hidden_states,
-                    prev_actions,
-                    not_done_masks,
-                    deterministic=False,
-                )
+            while (
+                len(stats_episodes) < number_of_eval_episodes
+                and self.envs.num_envs > 0
+            ):
+                current_episodes = self.envs.current_episodes()
+
+                with torch.no_grad():
+                    (
+                        _,
+                        actions,
+                        _,
+                        test_recurrent_hidden_states,
+                    ) = self.actor_critic.act(
+                        batch,
+                        test_recurrent_hidden_states,
+                        prev_actions,
+                        not_done_masks,
+                        deterministic=False,
+                    )
 
-                prev_actions.copy_(actions)  # type: ignore
-            # NB: Move actions to CPU.  If CUDA tensors are
-            # sent in to env.step(), that will create CUDA contexts
-            # in the subprocesses.
-            # For backwards compatibility, we also call .item() to convert to
-            # an int
-            if self.using_velocity_ctrl:
-                step_data = [
-                    action_to_velocity_control(a)
-                    for a in actions.to(device="cpu")
+                    prev_actions.copy_(actions)  # type: ignore
+                # NB: Move actions to CPU.  If CUDA tensors are
+                # sent in to env.step(), that will create CUDA contexts
+                # in the subprocesses.
+                # For backwards compatibility, we also call .item() to convert to
+                # an int
+                if self.using_velocity_ctrl:
+                    step_data = [
+                        action_to_velocity_control(a)
+                        for a in actions.to(device="cpu")
+                    ]
+                else:
+                    step_data = [a.item() for a in actions.to(device="cpu")]
+
+                outputs = self.envs.step(step_data)
+
+                observations, rewards_l, dones, infos = [
+                    list(x) for x in zip(*outputs)
                 ]
-            else:
-                step_data = [a.item() for a in actions.to(device="cpu")]
-
-            outputs = self.envs.step(step_data)
-
-            observations, rewards_l, dones, infos = [
-                list(x) for x in zip(*outputs)
-            ]
-            batch = batch_obs(  # type: ignore
-                observations,
-                device=self.device,
-                cache=self._obs_batching_cache,
-            )
-            batch = apply_obs_transforms_batch(batch, self.obs_transforms)  # type: ignore
+                batch = batch_obs(  # type: ignore
+                    observations,
+                    device=self.device,
+                    cache=self._obs_batching_cache,
+                )
+                batch = apply_obs_transforms_batch(batch, self.obs_transforms)  # type: ignore
 
-            not_done_masks = torch.tensor(
-                [[not done] for done in dones],
-                dtype=torch.bool,
-                device="cpu",
-            )
+                not_done_masks = torch.tensor(
+                    [[not done] for done in dones],
+                    dtype=torch.bool,
+                    device="cpu",
+                )
 
-            rewards = torch.tensor(
-                rewards_l, dtype=torch.float, device="cpu"
-            ).unsqueeze(1)
-            current_episode_reward += rewards
-            next_episodes = self.envs.current_episodes()
-            envs_to_pause = []
-            n_envs = self.envs.num_envs
-            for i in range(n_envs):
-                if (
-                    next_episodes[i].scene_id,
-                    next_episodes[i].episode_id,
-                ) in stats_episodes:
-                    envs_to_pause.append(i)
-
-                # episode ended
-                if not not_done_masks[i].item():
-                    pbar.update()
-                    episode_stats = {
-                        "reward": current_episode_reward[i].item()
-                    }
-                    episode_stats.update(
-                        self._extract_scalars_from_info(infos[i])
-                    )
-                    current_episode_reward[i] = 0
-                    # use scene_id + episode_id as unique id for storing stats
-                    stats_episodes[
-                        (
-                            current_episodes[i].scene_id,
-                            current_episodes[i].episode_id,
+                rewards = torch.tensor(
+                    rewards_l, dtype=torch.float, device="cpu"
+                ).unsqueeze(1)
+                current_episode_reward += rewards
+                next_episodes = self.envs.current_episodes()
+                envs_to_pause = []
+                n_envs = self.envs.num_envs
+                for i in range(n_envs):
+                    if (
+                        next_episodes[i].scene_id,
+                        next_episodes[i].episode_id,
+                    ) in stats_episodes:
+                        envs_to_pause.append(i)
+
+                    # episode ended
+                    if not not_done_masks[i].item():
+                        pbar.update()
+                        episode_stats = {
+                            "reward": current_episode_reward[i].item()
+                        }
+                        episode_stats.update(
+                            self._extract_scalars_from_info(infos[i])
                         )
-                    ] = episode_stats
-
-                    if len(self.config.VIDEO_OPTION) > 0:
-                        generate_video(
-                            video_option=self.config.VIDEO_OPTION,
-                            video_dir=self.config.VIDEO_DIR,
-                            images=rgb_frames[i],
-                            episode_id=current_episodes[i].episode_id,
-                            checkpoint_idx=checkpoint_index,
-                            metrics=self._extract_scalars_from_info(infos[i]),
-                            tb_writer=writer,
+                        current_episode_reward[i] = 0
+                        # use scene_id + episode_id as unique id for storing stats
+                        stats_episodes[
+                            (
+                                current_episodes[i].scene_id,
+                                current_episodes[i].episode_id,
+                            )
+                        ] = episode_stats
+
+                        if video_renderer is not None:
+                            video_renderer.finish_episode(
+                                (
+                                    current_episodes[i].scene_id,
+                                    current_episodes[i].episode_id,
+                                ),
+                                episode_id=current_episodes[i].episode_id,
+                                checkpoint_idx=checkpoint_index,
+                                metrics=self._extract_scalars_from_info(
+                                    infos[i]
+                                ),
+                            )
+
+                    # episode continues
+                    elif video_renderer is not None:
+                        # TODO move normalization / channel changing out of the policy and undo it here
+                        video_renderer.add_frame(
+                            (
+                                current_episodes[i].scene_id,
+                                current_episodes[i].episode_id,
+                            ),
+                            {k: v[i] for k, v in batch.items()},
+                            infos[i],
                         )
 
-                        rgb_frames[i] = []
-
-                # episode continues
-                elif len(self.config.VIDEO_OPTION) > 0:
-                    # TODO move normalization / channel changing out of the policy and undo it here
-                    frame = observations_to_image(
-                        {k: v[i] for k, v in batch.items()}, infos[i]
-                    )
-                    rgb_frames[i].append(frame)
-
-            not_done_masks = not_done_masks.to(device=self.device)
-            (
-                self.envs,
-                test_recurrent_hidden_states,
-                not_done_masks,
-                current_episode_reward,
-                prev_actions,
-                batch,
-                rgb_frames,
-            ) = self._pause_envs(
-                envs_to_pause,
-                self.envs,
-                test_recurrent_hidden_states,
-                not_done_masks,
-                current_episode_reward,
-                prev_actions,
-                batch,
-                rgb_frames,
-            )
+                not_done_masks = not_done_masks.to(device=self.device)
+                (
+                    self.envs,
+                    test_recurrent_hidden_states,
+                    not_done_masks,
+                    current_episode_reward,
+                    prev_actions,
+                    batch,
+                    _,
+                ) = self._pause_envs(
+                    envs_to_pause,
+                    self.envs,
+                    test_recurrent_hidden_states,
+                    not_done_masks,
+                    current_episode_reward,
+                    prev_actions,
+                    batch,
+                )
 
         num_episodes = len(stats_episodes)
         aggregated_stats = {}
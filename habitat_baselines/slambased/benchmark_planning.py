@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Benchmarks the per-step mapping and planning latency of the SLAM agent
+on recorded depth sequences, with full and incremental replanning.
+
+Sequences are :py:`.npz` files recorded with
+:py:`ORBSLAM2Agent.start_recording()` and
+:py:`ORBSLAM2Agent.save_recording(path)`, holding the denormalized
+:py:`depth` images, the SLAM :py:`pose6d` and the goal map cell
+:py:`goal_pos2d` of every step.
+
+Usage:
+    python -m habitat_baselines.slambased.benchmark_planning seq1.npz ...
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+import torch
+from torch.nn import functional as F
+
+from habitat_baselines.config.default import get_config
+from habitat_baselines.slambased.mappers import DirectDepthMapper
+from habitat_baselines.slambased.path_planners import DifferentiableStarPlanner
+from habitat_baselines.slambased.reprojection import project_tps_into_worldmap
+from habitat_baselines.slambased.utils import generate_2dgrid
+
+
+def run_sequence(
+    config, sequence: Dict[str, np.ndarray], incremental: bool, device
+) -> Dict[str, List[float]]:
+    mapper = DirectDepthMapper(
+        camera_height=config.CAMERA_HEIGHT,
+        near_th=config.D_OBSTACLE_MIN,
+        far_th=config.D_OBSTACLE_MAX,
+        h_min=config.H_OBSTACLE_MIN,
+        h_max=config.H_OBSTACLE_MAX,
+        map_size=config.MAP_SIZE,
+        map_cell_size=config.MAP_CELL_SIZE,
+        device=device,
+    )
+    planner = DifferentiableStarPlanner(
+        max_steps=config.PLANNER_MAX_STEPS,
+        preprocess=config.PREPROCESS_MAP,
+        beta=config.BETA,
+        device=device,
+        check_convergence_every=config.PLANNER_CONVERGENCE_CHECK_INTERVAL,
+    )
+    plan = planner.replan if incremental else planner
+
+    map_size_in_cells = int(config.MAP_SIZE / config.MAP_CELL_SIZE)
+    obstacle_map = torch.zeros(
+        1, 1, map_size_in_cells, map_size_in_cells, device=device
+    )
+    coords = generate_2dgrid(map_size_in_cells, map_size_in_cells, False).to(
+        device
+    )
+
+    timings: Dict[str, List[float]] = {"mapping": [], "planning": []}
+    for depth, pose6d, goal_pos2d in zip(
+        sequence["depth"], sequence["pose6d"], sequence["goal_pos2d"]
+    ):
+        pose6d = torch.from_numpy(pose6d).float().to(device).view(1, 4, 4)
+
+        t = time.perf_counter()
+        mapper.update_map(
+            obstacle_map,
+            torch.from_numpy(depth).to(device).squeeze(),
+            pose6d,
+        )
+        if device.type == "cuda":
+            torch.cuda.synchronize(device)
+        timings["mapping"].append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        current_pos = project_tps_into_worldmap(
+            pose6d, config.MAP_CELL_SIZE, config.MAP_SIZE, True
+        )
+        start_map = torch.zeros_like(obstacle_map)
+        start_map[
+            0, 0, current_pos[0, 0].long(), current_pos[0, 1].long()
+        ] = 1.0
+        goal_map = torch.zeros_like(obstacle_map)
+        goal_map[0, 0, int(goal_pos2d[0]), int(goal_pos2d[1])] = 1.0
+        planner_map = torch.relu(
+            torch.clamp(
+                (obstacle_map / float(config.MIN_PTS_IN_OBSTACLE)) ** 2,
+                min=0,
+                max=1.0,
+            )
+            - start_map
+            - F.max_pool2d(goal_map, 3, stride=1, padding=1)
+        )
+        plan(planner_map, coords, goal_map, start_map)
+        timings["planning"].append(time.perf_counter() - t)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "sequences", nargs="+", help="recorded .npz depth sequences"
+    )
+    parser.add_argument("--device", type=str, default="cpu")
+    args = parser.parse_args()
+
+    config = get_config().ORBSLAM2
+    device = torch.device(args.device)
+    sequences = [dict(np.load(path)) for path in args.sequences]
+    for mode, incremental in [("full", False), ("incremental", True)]:
+        timings: Dict[str, List[float]] = {"mapping": [], "planning": []}
+        for sequence in sequences:
+            for k, v in run_sequence(
+                config, sequence, incremental, device
+            ).items():
+                timings[k].extend(v)
+        for k, v in timings.items():
+            v_ms = 1000.0 * np.array(v)
+            print(
+                "{} replanning, {}: mean {:.2f} ms, median {:.2f} ms, "
+                "p95 {:.2f} ms over {} steps".format(
+                    mode,
+                    k,
+                    v_ms.mean(),
+                    np.median(v_ms),
+                    np.percentile(v_ms, 95),
+                    len(v_ms),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-import numpy as np
+from functools import lru_cache
+
 import torch
 from torch import nn as nn
 
@@ -15,24 +16,58 @@ from habitat_baselines.slambased.reprojection import (
 )
 
 
+@lru_cache(maxsize=8)
+def get_unprojection_grid(h, w, fx, fy, cx, cy, device):
+    r"""Returns the :py:`(h * w, 2)` per-pixel factors that multiplied with
+    the depth give the x and y coordinates of the 3d point, in the order of
+    :py:`depth.t().flatten()`. Cached per resolution, intrinsics and device.
+    """
+    x = (torch.arange(w, dtype=torch.float32, device=device) - cx) / fx
+    y = (torch.arange(h, dtype=torch.float32, device=device) - cy) / fy
+    xv, yv = torch.meshgrid([x, y])
+    return torch.stack([xv.flatten(), yv.flatten()], dim=1)
+
+
 def depth2local3d(depth, fx, fy, cx, cy):
     r"""Projects depth map to 3d point cloud
     with origin in the camera focus
     """
-    device = depth.device
     h, w = depth.squeeze().size()
-    x = torch.linspace(0, w - 1, w).to(device)
-    y = torch.linspace(0, h - 1, h).to(device)
-    xv, yv = torch.meshgrid([x, y])
-    dfl = depth.t().flatten()
-    return torch.cat(
-        [
-            (dfl * (xv.flatten() - cx) / fx).unsqueeze(-1),  # x
-            (dfl * (yv.flatten() - cy) / fy).unsqueeze(-1),  # y
-            dfl.unsqueeze(-1),
-        ],
-        dim=1,
-    )  # z
+    grid = get_unprojection_grid(h, w, fx, fy, cx, cy, depth.device)
+    dfl = depth.t().flatten().unsqueeze(-1)
+    return torch.cat([dfl * grid, dfl], dim=1)  # x, y, z
+
+
+def pcl_to_obstacles_window(pts3d, map_size=40, cell_size=0.2, min_pts=10):
+    r"""Counts number of 3d points in 2d map cell, only for the window of the
+    map covered by the points. Height is sum-pooled.
+
+    Returns the counts of the window and the map indices of its top left
+    cell, or :py:`None` if there are too few points in the map.
+    """
+    if len(pts3d) <= 1:
+        return None
+    map_size_in_cells = get_map_size_in_cells(map_size, cell_size) - 1
+    pts2d = torch.cat([pts3d[:, 2:3], pts3d[:, 0:1]], dim=1)
+    data_idxs = torch.round(
+        project2d_pcl_into_worldmap(pts2d, map_size, cell_size)
+    ).long()
+    if len(data_idxs) <= min_pts:
+        return None
+    in_map = ((data_idxs >= 0) & (data_idxs < map_size_in_cells)).all(dim=1)
+    data_idxs = data_idxs[in_map]
+    if len(data_idxs) == 0:
+        return None
+
+    window_min = data_idxs.min(dim=0)[0]
+    window_size = data_idxs.max(dim=0)[0] - window_min + 1
+    local_idxs = data_idxs - window_min
+    counts = torch.bincount(
+        local_idxs[:, 0] * window_size[1] + local_idxs[:, 1],
+        minlength=int(window_size[0] * window_size[1]),
+    )
+    window = counts.view(int(window_size[0]), int(window_size[1])).float()
+    return window, (int(window_min[0]), int(window_min[1]))
 
 
 def pcl_to_obstacles(pts3d, map_size=40, cell_size=0.2, min_pts=10):
@@ -44,26 +79,18 @@ def pcl_to_obstacles(pts3d, map_size=40, cell_size=0.2, min_pts=10):
     init_map = torch.zeros(
         (map_size_in_cells, map_size_in_cells), device=device
     )
-    if len(pts3d) <= 1:
-        return init_map
-    num_pts, dim = pts3d.size()
-    pts2d = torch.cat([pts3d[:, 2:3], pts3d[:, 0:1]], dim=1)
-    data_idxs = torch.round(
-        project2d_pcl_into_worldmap(pts2d, map_size, cell_size)
-    )
-    if len(data_idxs) > min_pts:
-        u, counts = np.unique(
-            data_idxs.detach().cpu().numpy(), axis=0, return_counts=True
-        )
-        init_map[u[:, 0], u[:, 1]] = torch.from_numpy(counts).to(
-            dtype=torch.float32, device=device
-        )
+    obstacles = pcl_to_obstacles_window(pts3d, map_size, cell_size, min_pts)
+    if obstacles is not None:
+        window, (row, col) = obstacles
+        init_map[
+            row : row + window.size(0), col : col + window.size(1)  # noqa
+        ] = window
     return init_map
 
 
 class DirectDepthMapper(nn.Module):
     r"""Estimates obstacle map given the depth image
-    ToDo: replace numpy histogram counting with differentiable
+    ToDo: replace histogram counting with differentiable
     pytorch soft count like in
     https://papers.nips.cc/paper/7545-unsupervised-learning-of-shape-and-pose-with-differentiable-point-clouds.pdf
     """
@@ -91,7 +118,11 @@ class DirectDepthMapper(nn.Module):
         self.map_cell_size = map_cell_size
         return
 
-    def forward(self, depth, pose=torch.eye(4).float()):  # noqa: B008
+    def get_obstacles_pcl(self, depth, pose):
+        r"""Returns the global 3d points of the depth image within the
+        obstacle height range, or :py:`None` if too few points are within
+        the depth range.
+        """
         self.device = depth.device
         # Works for FOV = 90 degrees
         # Should be adjusted, if FOV changed
@@ -106,6 +137,18 @@ class DirectDepthMapper(nn.Module):
         )
         survived_points = local_3d_pcl[idxs]
         if len(survived_points) < 20:
+            return None
+        global_3d_pcl = reproject_local_to_global(survived_points, pose)[:, :3]
+        # Because originally y looks down and from agent camera height
+        global_3d_pcl[:, 1] = -global_3d_pcl[:, 1] + self.camera_height
+        idxs = (global_3d_pcl[:, 1] > self.h_min_th) * (
+            global_3d_pcl[:, 1] < self.h_max_th
+        )
+        return global_3d_pcl[idxs]
+
+    def forward(self, depth, pose=torch.eye(4).float()):  # noqa: B008
+        global_3d_pcl = self.get_obstacles_pcl(depth, pose)
+        if global_3d_pcl is None:
             map_size_in_cells = (
                 get_map_size_in_cells(self.map_size_meters, self.map_cell_size)
                 - 1
@@ -114,14 +157,38 @@ class DirectDepthMapper(nn.Module):
                 (map_size_in_cells, map_size_in_cells), device=self.device
             )
             return init_map
-        global_3d_pcl = reproject_local_to_global(survived_points, pose)[:, :3]
-        # Because originally y looks down and from agent camera height
-        global_3d_pcl[:, 1] = -global_3d_pcl[:, 1] + self.camera_height
-        idxs = (global_3d_pcl[:, 1] > self.h_min_th) * (
-            global_3d_pcl[:, 1] < self.h_max_th
-        )
-        global_3d_pcl = global_3d_pcl[idxs]
         obstacle_map = pcl_to_obstacles(
             global_3d_pcl, self.map_size_meters, self.map_cell_size
         )
         return obstacle_map
+
+    def update_map(
+        self,
+        obstacle_map,
+        depth,
+        pose=torch.eye(4).float(),  # noqa: B008
+    ):
+        r"""Max-merges the obstacles of the depth image into
+        :p:`obstacle_map` in place, touching only the window of the map
+        covered by the observed points, so the cost does not depend on the
+        map size.
+
+        :param obstacle_map: global obstacle map, the last two dimensions
+            are the map cells.
+        :return: :p:`obstacle_map`
+        """
+        global_3d_pcl = self.get_obstacles_pcl(depth, pose)
+        if global_3d_pcl is None:
+            return obstacle_map
+        obstacles = pcl_to_obstacles_window(
+            global_3d_pcl, self.map_size_meters, self.map_cell_size
+        )
+        if obstacles is None:
+            return obstacle_map
+        window, (row, col) = obstacles
+        region = obstacle_map[
+            ..., row : row + window.size(0), col : col + window.size(1)  # noqa
+        ]
+        window = window[: region.size(-2), : region.size(-1)]
+        region.copy_(torch.max(region, window.to(region.device)))
+        return obstacle_map
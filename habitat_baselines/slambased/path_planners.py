@@ -4,6 +4,8 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+from typing import List, Tuple
+
 import numpy as np
 import torch
 from matplotlib import pyplot as plt
@@ -34,6 +36,123 @@ def init_neights_to_channels(ks=3):
     return weights
 
 
+@torch.jit.script
+def relax_costs(
+    g_map: torch.Tensor,
+    c_map: torch.Tensor,
+    neights2channels_weight: torch.Tensor,
+) -> torch.Tensor:
+    r"""Updates the cost of every cell with the cheapest cost through one of
+    its neighbours.
+    """
+    return torch.min(
+        g_map,
+        (
+            F.conv2d(
+                F.pad(g_map, [1, 1, 1, 1], mode="replicate"),
+                neights2channels_weight,
+            )
+            + c_map
+        ).min(dim=1, keepdim=True)[0],
+    )
+
+
+@torch.jit.script
+def propagate_costs(
+    g_map: torch.Tensor,
+    close_list_map: torch.Tensor,
+    open_list_map: torch.Tensor,
+    obstacles: torch.Tensor,
+    c_map: torch.Tensor,
+    neights2channels_weight: torch.Tensor,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+    r"""One full-map step of the star search, for a batch of maps."""
+    g_map = relax_costs(g_map, c_map, neights2channels_weight)
+    close_list_map = torch.max(close_list_map, open_list_map)
+    open_list_map = F.relu(
+        F.max_pool2d(open_list_map, 3, stride=1, padding=1)
+        - close_list_map
+        - obstacles
+    )
+    return g_map, close_list_map, open_list_map
+
+
+@torch.jit.script
+def batched_star_search(
+    g_map: torch.Tensor,
+    close_list_map: torch.Tensor,
+    open_list_map: torch.Tensor,
+    obstacles: torch.Tensor,
+    c_map: torch.Tensor,
+    neights2channels_weight: torch.Tensor,
+    goal_idxs: torch.Tensor,
+    max_steps: int,
+    check_every: int,
+    inf: float,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    r"""Runs the star search for a batch of :py:`(N, 1, H, W)` maps until
+    the goal of every map is closed with a finite cost, or for
+    :p:`max_steps` steps. Convergence is only checked every
+    :p:`check_every` steps, which avoids a device synchronization per step.
+
+    :return: g, close list and open list maps, and whether the search of
+        each map converged.
+    """
+    n = g_map.size(0)
+    batch_idxs = torch.arange(n, device=g_map.device)
+    converged = torch.zeros(n, dtype=torch.bool, device=g_map.device)
+    step = 0
+    while step < max_steps:
+        g_map, close_list_map, open_list_map = propagate_costs(
+            g_map,
+            close_list_map,
+            open_list_map,
+            obstacles,
+            c_map,
+            neights2channels_weight,
+        )
+        step += 1
+        if step % check_every == 0 or step == max_steps:
+            converged = (
+                close_list_map.view(n, -1)[batch_idxs, goal_idxs] >= 1.0
+            ) & (g_map.view(n, -1)[batch_idxs, goal_idxs] < 0.1 * inf)
+            if bool(converged.all()):
+                break
+    return g_map, close_list_map, open_list_map, converged
+
+
+@torch.jit.script
+def relax_costs_until_converged(
+    g_map: torch.Tensor,
+    c_map: torch.Tensor,
+    neights2channels_weight: torch.Tensor,
+    goal_idx: int,
+    max_steps: int,
+    check_every: int,
+    inf: float,
+) -> Tuple[torch.Tensor, bool]:
+    r"""Relaxes the costs of a map, whose costs are upper bounds of the true
+    costs, until the costs of all cells not more expensive than the goal
+    stop changing. A cell can only get cheaper through a neighbour that got
+    cheaper in the previous step, so those costs are final then.
+
+    :return: relaxed cost map and whether it converged within
+        :p:`max_steps` steps.
+    """
+    step = 0
+    while step < max_steps:
+        prev_g_map = g_map
+        g_map = relax_costs(g_map, c_map, neights2channels_weight)
+        step += 1
+        if step % check_every == 0 or step == max_steps:
+            goal_cost = g_map.view(-1)[goal_idx]
+            if bool(goal_cost < 0.1 * inf) and not bool(
+                ((g_map != prev_g_map) & (g_map <= goal_cost)).any()
+            ):
+                return g_map, True
+    return g_map, False
+
+
 class SoftArgMin(nn.Module):
     def __init__(self, beta=5):
         super(SoftArgMin, self).__init__()
@@ -72,11 +191,14 @@ class DifferentiableStarPlanner(nn.Module):
         beta=100,
         connectivity="eight",
         device=torch.device("cpu"),  # noqa: B008
+        check_convergence_every=1,
         **kwargs
     ):
         super(DifferentiableStarPlanner, self).__init__()
         self.eps = 1e-12
         self.max_steps = max_steps
+        self.check_convergence_every = check_convergence_every
+        self.reset_cost_to_go()
         self.visualize = visualize
         self.inf = 1e7
         self.ob_cost = 10000.0
@@ -275,56 +397,233 @@ class DifferentiableStarPlanner(nn.Module):
                     - self.obstacles[:, :, ymin:ymax, xmin:xmax]
                 )
             else:
-                self.g_map = torch.min(
-                    self.g_map,
-                    (
-                        self.neights2channels(
-                            F.pad(self.g_map, (1, 1, 1, 1), "replicate")
-                        )
-                        + c_map
-                    ).min(dim=1, keepdim=True)[0],
-                )
-                self.close_list_map = torch.max(
-                    self.close_list_map, self.open_list_map
-                )
-                self.open_list_map = F.relu(
-                    F.max_pool2d(self.open_list_map, 3, stride=1, padding=1)
-                    - self.close_list_map
-                    - self.obstacles
-                )
+                self.propagate_full_map(c_map)
             step += 1
             if step >= self.max_steps:
                 stopped_by_max_iter = True
                 break
-            not_done = (
-                self.close_list_map.view(-1)[goal_idx].item() < 1.0
-            ) or (self.g_map.view(-1)[goal_idx].item() >= 0.1 * self.inf)
+            if step % self.check_convergence_every == 0:
+                not_done = bool(
+                    (
+                        (self.close_list_map.view(-1)[goal_idx] < 1.0)
+                        | (self.g_map.view(-1)[goal_idx] >= 0.1 * self.inf)
+                    ).item()
+                )
             rad += 1
         if not stopped_by_max_iter:
             for _ in range(additional_steps):
                 # now propagating beyong start point
-                self.g_map = torch.min(
-                    self.g_map,
-                    (
-                        self.neights2channels(
-                            F.pad(self.g_map, (1, 1, 1, 1), "replicate")
-                        )
-                        + c_map
-                    ).min(dim=1, keepdim=True)[0],
-                )
-                self.close_list_map = torch.max(
-                    self.close_list_map, self.open_list_map
-                )
-                self.open_list_map = F.relu(
-                    F.max_pool2d(self.open_list_map, 3, stride=1, padding=1)
-                    - self.close_list_map
-                    - self.obstacles
-                )
+                self.propagate_full_map(c_map)
+        self.save_cost_to_go()
         if return_path:
             out_path, cost = self.reconstruct_path()
             return out_path, cost
         return None
 
+    def save_cost_to_go(self):
+        self.cost_to_go = self.g_map
+        self.cost_to_go_obstacles = self.obstacles
+        self.cost_to_go_start_map = self.start_map
+
+    def reset_cost_to_go(self):
+        self.cost_to_go = None
+        self.cost_to_go_obstacles = None
+        self.cost_to_go_start_map = None
+
+    def replan(
+        self,
+        obstacles,
+        coords,
+        start_map,
+        goal_map,
+        non_obstacle_cost_map=None,
+        additional_steps=50,
+        return_path=True,
+    ):
+        r"""Incremental version of :ref:`forward`, which reuses the costs of
+        the previous search if it started from the same cell.
+
+        The costs of the cells whose cheapest path may pass through a cell
+        with a changed obstacle value are reset, i.e. all cells at least as
+        expensive as the cheapest changed cell or neighbour of a changed
+        cell. The remaining costs are still costs of valid paths, and the
+        map is relaxed from them until the costs up to the goal are final.
+        Falls back to a full search otherwise.
+
+        :p:`non_obstacle_cost_map` is assumed to be unchanged since the last
+        search.
+        """
+        start_map = start_map.to(self.device)
+        if (
+            self.cost_to_go is None
+            or self.cost_to_go.size() != start_map.size()
+            or not torch.equal(start_map, self.cost_to_go_start_map)
+        ):
+            return self.forward(
+                obstacles,
+                coords,
+                start_map,
+                goal_map,
+                non_obstacle_cost_map,
+                additional_steps,
+                return_path,
+            )
+
+        self.obstacles = self.preprocess_obstacle_map(
+            obstacles.to(self.device)
+        )
+        self.start_map = start_map
+        self.goal_map = goal_map.to(self.device)
+        self.coords = coords.to(self.device)
+        self.height = obstacles.size(2)
+        self.width = obstacles.size(3)
+        goal_idx = int(torch.max(self.goal_map.view(-1), 0)[1].item())
+        c_map = self.calculate_local_path_costs(non_obstacle_cost_map)
+
+        g_map = self.cost_to_go.clone()
+        changed = (self.obstacles != self.cost_to_go_obstacles).float()
+        affected = F.max_pool2d(changed, 3, stride=1, padding=1) > 0
+        if bool(affected.any()):
+            min_affected_cost = g_map[affected].min()
+            g_map[g_map >= min_affected_cost] = self.inf
+            g_map = torch.min(g_map, self.init_g_map())
+
+        self.start_coords = (
+            (self.coords * self.start_map).sum(dim=(2, 3)).squeeze()
+        )
+        self.goal_coords = (
+            (self.coords * self.goal_map).sum(dim=(2, 3)).squeeze()
+        )
+        max_steps = 4 * int(
+            torch.sqrt(
+                ((self.start_coords - self.goal_coords) ** 2).sum() + 1e-6
+            ).item()
+        )
+        g_map, converged = relax_costs_until_converged(
+            g_map,
+            c_map,
+            self.neights2channels.weight,
+            goal_idx,
+            max_steps + additional_steps,
+            self.check_convergence_every,
+            self.inf,
+        )
+        if not converged:
+            return self.forward(
+                obstacles,
+                coords,
+                start_map,
+                goal_map,
+                non_obstacle_cost_map,
+                additional_steps,
+                return_path,
+            )
+
+        self.g_map = g_map
+        self.close_list_map = (g_map < 0.1 * self.inf).float()
+        self.been_there = torch.zeros_like(self.goal_map)
+        self.save_cost_to_go()
+        if return_path:
+            out_path, cost = self.reconstruct_path()
+            return out_path, cost
+        return None
+
+    def propagate_full_map(self, c_map):
+        (
+            self.g_map,
+            self.close_list_map,
+            self.open_list_map,
+        ) = propagate_costs(
+            self.g_map,
+            self.close_list_map,
+            self.open_list_map,
+            self.obstacles,
+            c_map,
+            self.neights2channels.weight,
+        )
+
+    def plan_batch(
+        self,
+        obstacles,
+        coords,
+        start_maps,
+        goal_maps,
+        non_obstacle_cost_map=None,
+        additional_steps=50,
+        return_path=True,
+    ) -> List[Tuple[List[torch.Tensor], torch.Tensor]]:
+        r"""Plans for a batch of start and goal pairs in one search, e.g. for
+        several agents or several goals.
+
+        The search propagates over the full maps of all pairs until every
+        goal is reached, checking for convergence every
+        :py:`check_convergence_every` steps, and the paths are then
+        reconstructed one by one.
+
+        :param obstacles: :py:`(N, 1, H, W)` obstacle maps, or a single
+            :py:`(1, 1, H, W)` map shared by all pairs.
+        :param coords: :py:`(1, 2, H, W)` cell coordinates.
+        :param start_maps: :py:`(N, 1, H, W)` one-hot start maps.
+        :param goal_maps: :py:`(N, 1, H, W)` one-hot goal maps.
+        :return: :py:`(path, cost)` of each pair, or the g maps of all pairs
+            if :p:`return_path` is :py:`False`.
+        """
+        num_plans = start_maps.size(0)
+        obstacles = self.preprocess_obstacle_map(obstacles.to(self.device))
+        self.obstacles = obstacles.expand(num_plans, -1, -1, -1).contiguous()
+        self.start_map = start_maps.to(self.device)
+        self.goal_map = goal_maps.to(self.device)
+        self.coords = coords.to(self.device)
+        self.height = obstacles.size(2)
+        self.width = obstacles.size(3)
+        goal_idxs = torch.max(self.goal_map.view(num_plans, -1), 1)[1]
+        c_map = self.calculate_local_path_costs(non_obstacle_cost_map)
+
+        start_coords = (self.coords * self.start_map).sum(dim=(2, 3))
+        goal_coords = (self.coords * self.goal_map).sum(dim=(2, 3))
+        max_steps = 4 * int(
+            torch.sqrt(((start_coords - goal_coords) ** 2).sum(dim=1) + 1e-6)
+            .max()
+            .item()
+        )
+
+        g_map, close_list_map, open_list_map, _ = batched_star_search(
+            self.init_g_map(),
+            self.init_closelistmap(),
+            self.init_openlistmap(),
+            self.obstacles,
+            c_map,
+            self.neights2channels.weight,
+            goal_idxs,
+            max_steps,
+            self.check_convergence_every,
+            self.inf,
+        )
+        for _ in range(additional_steps):
+            g_map, close_list_map, open_list_map = propagate_costs(
+                g_map,
+                close_list_map,
+                open_list_map,
+                self.obstacles,
+                c_map,
+                self.neights2channels.weight,
+            )
+        if not return_path:
+            return g_map
+
+        plans = []
+        all_obstacles = self.obstacles
+        for i in range(num_plans):
+            self.obstacles = all_obstacles[i : i + 1]
+            self.g_map = g_map[i : i + 1]
+            self.close_list_map = close_list_map[i : i + 1]
+            self.coords = coords.to(self.device)
+            self.start_coords = start_coords[i]
+            self.goal_coords = goal_coords[i]
+            self.been_there = torch.zeros_like(self.g_map)
+            plans.append(self.reconstruct_path())
+        return plans
+
     def calculate_local_path_costs(self, non_obstacle_cost_map=None):
         coords = self.coords
         h = coords.size(2)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import collections
+import os
+import os.path as osp
+import threading
+import uuid
+from typing import Any, Optional
+
+import torch
+
+from habitat import logger
+
+
+def snapshot_state(state: Any) -> Any:
+    r"""Copies the tensors of a state, e.g. a checkpoint, to the CPU, so that
+    it can be saved while training goes on.
+
+    Dicts, lists, tuples and deques are copied recursively, other objects are
+    kept as they are and must not be modified until the state is saved.
+    """
+    if torch.is_tensor(state):
+        return state.detach().to(device="cpu", copy=True)
+    elif isinstance(state, dict):
+        return type(state)(
+            (k, snapshot_state(v)) for k, v in state.items()
+        )  # type: ignore
+    elif isinstance(state, collections.deque):
+        return collections.deque(
+            (snapshot_state(v) for v in state), maxlen=state.maxlen
+        )
+    elif isinstance(state, (list, tuple)) and not hasattr(state, "_fields"):
+        return type(state)(snapshot_state(v) for v in state)
+    else:
+        return state
+
+
+class AsyncCheckpointWriter:
+    r"""Saves checkpoints with :py:`torch.save` in a background thread.
+
+    The state is copied to the CPU by :ref:`save` and written to a temporary
+    file which is then renamed, so that a checkpoint file is always complete,
+    even if the job is killed while saving. At most one checkpoint is being
+    written, :ref:`save` waits for the previous one.
+    """
+
+    def __init__(self) -> None:
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def save(self, state: Any, filename: str) -> None:
+        r"""Starts saving a checkpoint.
+
+        Args:
+            state: the checkpoint to save.
+            filename: path of the checkpoint file.
+        """
+        self.wait()
+        state = snapshot_state(state)
+        # Not a daemon thread, so that the process waits for the checkpoint
+        # to be written before exiting
+        self._thread = threading.Thread(
+            target=self._write, args=(state, filename)
+        )
+        self._thread.start()
+
+    def wait(self) -> None:
+        r"""Waits for the checkpoint being written, if any."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Saving a checkpoint failed") from error
+
+    def close(self) -> None:
+        self.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write(self, state: Any, filename: str) -> None:
+        tmp_filename = osp.join(
+            osp.dirname(filename),
+            f".{osp.basename(filename)}.{uuid.uuid4().hex}.tmp",
+        )
+        try:
+            torch.save(state, tmp_filename)
+            os.replace(tmp_filename, filename)
+        except Exception as e:
+            logger.error(f"Saving checkpoint {filename} failed: {e}")
+            self._error = e
+            if osp.exists(tmp_filename):
+                os.remove(tmp_filename)
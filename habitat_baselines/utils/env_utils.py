@@ -8,7 +8,7 @@ import random
 from typing import List, Type, Union
 
 import habitat
-from habitat import Config, Env, RLEnv, VectorEnv, make_dataset
+from habitat import Config, Dataset, Env, RLEnv, VectorEnv, make_dataset
 
 
 def make_env_fn(
@@ -37,6 +37,9 @@ def construct_envs(
     config: Config,
     env_class: Union[Type[Env], Type[RLEnv]],
     workers_ignore_signals: bool = False,
+    num_scene_splits: int = 1,
+    scene_split_index: int = 0,
+    scene_split_seed: int = 0,
 ) -> VectorEnv:
     r"""Create VectorEnv object with specified config and env class type.
     To allow better performance, dataset are split into small ones for
@@ -46,6 +49,12 @@ def construct_envs(
     :param necessary to create individual environments.
     :param env_class: class type of the envs to be created.
     :param workers_ignore_signals: Passed to :ref:`habitat.VectorEnv`'s constructor
+    :param num_scene_splits: number of disjoint splits of the scenes, e.g. the
+        number of distributed workers.
+    :param scene_split_index: index of the split of the scenes shared by the
+        envs, see :ref:`habitat.Dataset.get_scene_split`.
+    :param scene_split_seed: seed of the split of the scenes, must be the same
+        for all the splits.
 
     :return: VectorEnv object created according to specification.
     """
@@ -58,6 +67,11 @@ def construct_envs(
     if "*" in config.TASK_CONFIG.DATASET.CONTENT_SCENES:
         scenes = dataset.get_scenes_to_load(config.TASK_CONFIG.DATASET)
 
+    if num_scene_splits > 1:
+        scenes = Dataset.get_scene_split(
+            scenes, num_scene_splits, scene_split_index, scene_split_seed
+        )
+
     if num_environments > 1:
         if len(scenes) == 0:
             raise RuntimeError(
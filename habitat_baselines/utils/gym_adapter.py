@@ -4,13 +4,25 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import Any, Dict, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import gym
 import numpy as np
+import torch
 from gym import spaces
 
 from habitat.core.simulator import Observations
+from habitat.core.vector_env import VectorEnv
+from habitat.utils.visualizations.maps import TopDownMapRenderer
 from habitat.utils.visualizations.utils import observations_to_image
 
 
@@ -46,6 +58,116 @@ def smash_observation_space(obs_space, limit_keys):
     return obs_space
 
 
+class ObservationFlattener:
+    """
+    Flattens observations into the `spaces.Box` built by
+    `smash_observation_space`. The offset of each observation in the output
+    is computed once, so flattening only copies the observations into an
+    output array, which can be reused between calls.
+
+    :param obs_space: The observation space of the environment.
+    :param limit_keys: The observations to flatten, in order.
+    """
+
+    def __init__(self, obs_space: spaces.Dict, limit_keys: Sequence[str]):
+        self._slices: List[Tuple[str, slice]] = []
+        start_i = 0
+        for k in limit_keys:
+            end_i = start_i + int(np.prod(obs_space.spaces[k].shape))
+            self._slices.append((k, slice(start_i, end_i)))
+            start_i = end_i
+        self.dim = start_i
+
+    def flatten(
+        self, obs: Observations, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        :param obs: The observations of an environment.
+        :param out: The `(dim,)` array to write to, a new one if `None`.
+        """
+        if out is None:
+            out = np.empty((self.dim,), dtype=np.float32)
+        for k, obs_slice in self._slices:
+            out[obs_slice] = np.reshape(obs[k], -1)
+        return out
+
+    def flatten_batch(
+        self,
+        batch_obs: Sequence[Observations],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        :param batch_obs: The observations of several environments.
+        :param out: The `(len(batch_obs), dim)` array to write to, a new one
+            if `None`.
+        """
+        if out is None:
+            out = np.empty((len(batch_obs), self.dim), dtype=np.float32)
+        for i, obs in enumerate(batch_obs):
+            self.flatten(obs, out[i])
+        return out
+
+
+class _InfoSchemaChanged(Exception):
+    pass
+
+
+class InfoFlattener:
+    """
+    Does the same as `flatten_dict` followed by a conversion of the values to
+    floats, but reuses the keys of the previous info dictionary when they did
+    not change, which is the case between most steps.
+    """
+
+    def __init__(self):
+        # (key, flattened key, schema of the sub dictionary or None) tuples
+        self._schema: Optional[List[Tuple[Any, str, Any]]] = None
+
+    @classmethod
+    def _get_schema(cls, d: Dict[Any, Any], parent_key: str = ""):
+        schema = []
+        for k, v in d.items():
+            new_key = parent_key + str(k) if parent_key else str(k)
+            schema.append(
+                (
+                    k,
+                    new_key,
+                    cls._get_schema(v, new_key)
+                    if isinstance(v, dict)
+                    else None,
+                )
+            )
+        return schema
+
+    @classmethod
+    def _flatten(
+        cls, d: Dict[Any, Any], schema, out: Dict[str, float]
+    ) -> None:
+        if not isinstance(d, dict) or len(d) != len(schema):
+            raise _InfoSchemaChanged
+        for k, new_key, sub_schema in schema:
+            v = d[k]
+            if sub_schema is not None:
+                cls._flatten(v, sub_schema, out)
+            elif isinstance(v, dict):
+                raise _InfoSchemaChanged
+            else:
+                out[new_key] = float(v)
+
+    def __call__(self, info: Dict[Any, Any]) -> Dict[str, float]:
+        flat_info: Dict[str, float] = {}
+        if self._schema is not None:
+            try:
+                self._flatten(info, self._schema, flat_info)
+                return flat_info
+            except (_InfoSchemaChanged, KeyError):
+                flat_info = {}
+
+        self._schema = self._get_schema(info)
+        self._flatten(info, self._schema, flat_info)
+        return flat_info
+
+
 class HabGymWrapper(gym.Env):
     """
     Wraps a Habitat RLEnv into a format compatible with the standard OpenAI Gym
@@ -111,6 +233,7 @@ class HabGymWrapper(gym.Env):
             }
         )
         self._last_obs: Optional[Observations] = None
+        self._top_down_map_renderer = TopDownMapRenderer()
         self.action_mapping = {}
         self._save_orig_obs = save_orig_obs
         self.orig_obs = None
@@ -162,6 +285,21 @@ class HabGymWrapper(gym.Env):
         if len(dict_space) > 1:
             self.observation_space = spaces.Dict(dict_space)
 
+        self._obs_keys = {
+            "observation": self._gym_obs_keys,
+            "desired_goal": self._gym_goal_keys,
+            "achieved_goal": self._gym_achieved_goal_keys,
+        }
+        self._obs_keys = {
+            k: v for k, v in self._obs_keys.items() if k in dict_space
+        }
+        self._obs_flatteners = {
+            k: ObservationFlattener(env.observation_space, v)
+            for k, v in self._obs_keys.items()
+            if isinstance(dict_space[k], spaces.Box)
+        }
+        self._info_flattener = InfoFlattener()
+
         self._env = env
 
     def step(self, action: np.ndarray):
@@ -179,39 +317,60 @@ class HabGymWrapper(gym.Env):
         self._last_obs = obs
         obs = self._transform_obs(obs)
         if self._fix_info_dict:
-            info = flatten_dict(info)
-            info = {k: float(v) for k, v in info.items()}
+            info = self._info_flattener(info)
 
         return obs, reward, done, info
 
-    def _is_space_flat(self, space_name):
-        if isinstance(self.observation_space, spaces.Box):
-            return True
-        return isinstance(
-            self.observation_space.spaces[space_name], spaces.Box
-        )
-
     def _transform_obs(self, obs):
         if self._save_orig_obs:
             self.orig_obs = obs
-        observation = {"observation": [obs[k] for k in self._gym_obs_keys]}
+        observation = {
+            k: self._obs_flatteners[k].flatten(obs)
+            if k in self._obs_flatteners
+            else [obs[obs_k] for obs_k in obs_keys]
+            for k, obs_keys in self._obs_keys.items()
+        }
 
-        if len(self._gym_goal_keys) > 0:
-            observation["desired_goal"] = [obs[k] for k in self._gym_goal_keys]
+        if len(observation) == 1:
+            return observation["observation"]
 
-        if len(self._gym_achieved_goal_keys) > 0:
-            observation["achieved_goal"] = [
-                obs[k] for k in self._gym_achieved_goal_keys
-            ]
+        return observation
+
+    def transform_batch_obs(
+        self,
+        batch_obs: Sequence[Observations],
+        out: Optional[Union[np.ndarray, Dict[str, np.ndarray]]] = None,
+    ):
+        """
+        Transforms the observations of several copies of the environment, as
+        returned by a `VectorEnv`, like `reset` and `step` do for a single
+        one. The flattened observations are stacked into
+        `(len(batch_obs), dim)` arrays.
+
+        :param batch_obs: The observations of the environments.
+        :param out: The arrays to write the flattened observations to, with
+            the structure of the returned observations, new ones if `None`.
+        """
+        if out is not None and not isinstance(out, dict):
+            out = {"observation": out}
+        observation = {
+            k: self._obs_flatteners[k].flatten_batch(
+                batch_obs, None if out is None else out[k]
+            )
+            if k in self._obs_flatteners
+            else [[obs[obs_k] for obs_k in obs_keys] for obs in batch_obs]
+            for k, obs_keys in self._obs_keys.items()
+        }
 
-        for k, v in observation.items():
-            if self._is_space_flat(k):
-                observation[k] = np.concatenate(v)
         if len(observation) == 1:
             return observation["observation"]
 
         return observation
 
+    @property
+    def number_of_episodes(self) -> Optional[int]:
+        return self._env.number_of_episodes
+
     def reset(self) -> Union[np.ndarray, Dict[str, np.ndarray]]:
         obs = self._env.reset()
         self._last_obs = obs
@@ -221,7 +380,9 @@ class HabGymWrapper(gym.Env):
         frame = None
         if mode == "rgb_array":
             frame = observations_to_image(
-                self._last_obs, self._env._env.get_metrics()
+                self._last_obs,
+                self._env._env.get_metrics(),
+                self._top_down_map_renderer,
             )
         else:
             raise ValueError(f"Render mode {mode} not currently supported.")
@@ -230,3 +391,191 @@ class HabGymWrapper(gym.Env):
 
     def close(self):
         self._env.close()
+
+
+class _SharedBufferEnv(gym.Wrapper):
+    """
+    Worker side of `HabGymVectorEnv`. Writes the observations, rewards and
+    dones of the wrapped environment into buffers shared with the main
+    process instead of sending them back, only the infos are sent.
+    """
+
+    def __init__(self, env: gym.Env):
+        super().__init__(env)
+        self._index = 0
+        self._obs_buffers: Dict[str, np.ndarray] = {}
+        self._reward_buffer: Optional[np.ndarray] = None
+        self._done_buffer: Optional[np.ndarray] = None
+
+    def set_shared_buffers(
+        self,
+        index: int,
+        obs_buffers: Dict[str, torch.Tensor],
+        reward_buffer: torch.Tensor,
+        done_buffer: torch.Tensor,
+    ) -> None:
+        self._index = index
+        self._obs_buffers = {k: v.numpy() for k, v in obs_buffers.items()}
+        self._reward_buffer = reward_buffer.numpy()
+        self._done_buffer = done_buffer.numpy()
+
+    def _write_obs(self, obs) -> None:
+        if not isinstance(obs, dict):
+            obs = {"observation": obs}
+        for k, v in obs.items():
+            self._obs_buffers[k][self._index] = v
+
+    def reset(self, **kwargs):
+        self._write_obs(self.env.reset(**kwargs))
+
+    def step(self, action):
+        obs, reward, done, info = self.env.step(action)
+        self._write_obs(obs)
+        self._reward_buffer[self._index] = reward
+        self._done_buffer[self._index] = done
+        if done:
+            # The observation in the buffer is replaced by the one of the
+            # next episode when auto-resetting
+            info["terminal_observation"] = obs
+
+        return None, reward, done, info
+
+
+def _make_shared_buffer_env(
+    make_env_fn: Callable[..., gym.Env], env_fn_args: Tuple
+) -> _SharedBufferEnv:
+    return _SharedBufferEnv(make_env_fn(*env_fn_args))
+
+
+class HabGymVectorEnv(gym.vector.VectorEnv):
+    """
+    Runs several copies of a gym environment with flat observations, like
+    `HabGymWrapper`, in worker processes with a `habitat.VectorEnv`, under the
+    `gym.vector.VectorEnv` interface. The environments are reset automatically
+    at the end of their episodes, the last observation of an episode is then
+    in the `terminal_observation` entry of its info.
+
+    The workers write the observations, rewards and dones into buffers shared
+    with the main process, which are returned as stacked arrays without
+    being sent through pipes.
+
+    :param make_env_fn: Function creating an environment.
+    :param env_fn_args: The arguments of `make_env_fn` for each environment.
+    :param copy: Whether to return copies of the shared buffers, if `False`
+        the returned arrays are overwritten by the next step or reset.
+    :param multiprocessing_start_method: See `habitat.VectorEnv`.
+    :param workers_ignore_signals: See `habitat.VectorEnv`.
+    """
+
+    def __init__(
+        self,
+        make_env_fn: Callable[..., gym.Env],
+        env_fn_args: Sequence[Tuple],
+        copy: bool = True,
+        multiprocessing_start_method: str = "forkserver",
+        workers_ignore_signals: bool = False,
+    ):
+        self._envs = VectorEnv(
+            make_env_fn=_make_shared_buffer_env,
+            env_fn_args=[(make_env_fn, args) for args in env_fn_args],
+            auto_reset_done=True,
+            multiprocessing_start_method=multiprocessing_start_method,
+            workers_ignore_signals=workers_ignore_signals,
+        )
+        super().__init__(
+            self._envs.num_envs,
+            self._envs.observation_spaces[0],
+            self._envs.action_spaces[0],
+        )
+        self.copy = copy
+
+        obs_spaces = (
+            self.single_observation_space.spaces
+            if isinstance(self.single_observation_space, spaces.Dict)
+            else {"observation": self.single_observation_space}
+        )
+        for k, obs_space in obs_spaces.items():
+            if not isinstance(obs_space, spaces.Box):
+                self._envs.close()
+                raise ValueError(
+                    f"Cannot share the observation {k}, it is not a Box"
+                )
+        self._obs_buffers = {
+            k: torch.from_numpy(
+                np.zeros(
+                    (self.num_envs, *obs_space.shape), dtype=obs_space.dtype
+                )
+            ).share_memory_()
+            for k, obs_space in obs_spaces.items()
+        }
+        self._reward_buffer = torch.zeros(
+            self.num_envs, dtype=torch.float64
+        ).share_memory_()
+        self._done_buffer = torch.zeros(
+            self.num_envs, dtype=torch.bool
+        ).share_memory_()
+        self._envs.call(
+            ["set_shared_buffers"] * self.num_envs,
+            [
+                dict(
+                    index=index,
+                    obs_buffers=self._obs_buffers,
+                    reward_buffer=self._reward_buffer,
+                    done_buffer=self._done_buffer,
+                )
+                for index in range(self.num_envs)
+            ],
+        )
+
+        self._obs_arrays = {k: v.numpy() for k, v in self._obs_buffers.items()}
+        self._rewards = self._reward_buffer.numpy()
+        self._dones = self._done_buffer.numpy()
+
+    def _get_obs(self) -> Union[np.ndarray, Dict[str, np.ndarray]]:
+        obs = {
+            k: np.copy(v) if self.copy else v
+            for k, v in self._obs_arrays.items()
+        }
+        if isinstance(self.single_observation_space, spaces.Dict):
+            return obs
+        return obs["observation"]
+
+    def reset_wait(
+        self,
+        seed: Optional[Union[int, List[int]]] = None,
+        return_info: bool = False,
+        options: Optional[dict] = None,
+    ):
+        if seed is not None:
+            raise ValueError(
+                "The environments are seeded from TASK_CONFIG.SEED"
+            )
+        self._envs.reset()
+        self._dones[:] = False
+
+        if return_info:
+            return self._get_obs(), [{} for _ in range(self.num_envs)]
+        return self._get_obs()
+
+    def step_async(self, actions):
+        self._envs.async_step(
+            [{"action": action} for action in actions]  # type: ignore
+        )
+
+    def step_wait(self):
+        infos = [info for _, _, _, info in self._envs.wait_step()]
+
+        return (
+            self._get_obs(),
+            np.copy(self._rewards) if self.copy else self._rewards,
+            np.copy(self._dones) if self.copy else self._dones,
+            infos,
+        )
+
+    def call(self, name: str, **kwargs) -> Tuple[Any, ...]:
+        return tuple(
+            self._envs.call([name] * self.num_envs, [kwargs] * self.num_envs)
+        )
+
+    def close_extras(self, **kwargs):
+        self._envs.close()
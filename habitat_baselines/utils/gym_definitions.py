@@ -15,7 +15,10 @@ import habitat_baselines.utils.env_utils
 from habitat_baselines.common.environments import get_env_class
 from habitat_baselines.config.default import _C
 from habitat_baselines.config.default import get_config as baselines_get_config
-from habitat_baselines.utils.gym_adapter import HabGymWrapper
+from habitat_baselines.utils.gym_adapter import (
+    HabGymVectorEnv,
+    HabGymWrapper,
+)
 from habitat_baselines.utils.render_wrapper import HabRenderWrapper
 
 GYM_AUTO_NAME_KEY = "GYM_AUTO_NAME"
@@ -40,6 +43,7 @@ def _make_habitat_gym_env(
     cfg_file_path: str,
     override_options: List[Any] = None,
     use_render_mode: bool = False,
+    rank: int = 0,
 ):
     if override_options is None:
         override_options = []
@@ -61,6 +65,10 @@ def _make_habitat_gym_env(
         )
 
     config = baselines_get_config(cfg_file_path, override_options)
+    if rank > 0:
+        config.defrost()
+        config.TASK_CONFIG.SEED += rank
+        config.freeze()
     env_class = get_env_class(config.ENV_NAME)
 
     env = habitat_baselines.utils.env_utils.make_env_fn(
@@ -73,6 +81,33 @@ def _make_habitat_gym_env(
     return env
 
 
+def make_habitat_vector_env(
+    cfg_file_path: str,
+    num_envs: int,
+    override_options: List[Any] = None,
+    use_render_mode: bool = False,
+    **kwargs,
+) -> HabGymVectorEnv:
+    """
+    Creates a `gym.vector.VectorEnv` running `num_envs` copies of the
+    environment of `HabitatGym-v0` in worker processes. The copies are seeded
+    with `TASK_CONFIG.SEED` plus their index.
+
+    :param kwargs: Passed to `HabGymVectorEnv`.
+    """
+    if override_options is None:
+        override_options = []
+
+    return HabGymVectorEnv(
+        _make_habitat_gym_env,
+        [
+            (cfg_file_path, list(override_options), use_render_mode, rank)
+            for rank in range(num_envs)
+        ],
+        **kwargs,
+    )
+
+
 # Generic supporting general configs
 register(
     id="HabitatGym-v0",
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import copy
+import os
+import queue
+import threading
+import uuid
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+import imageio
+import numpy as np
+import torch
+
+from habitat import logger
+from habitat.utils.visualizations.maps import TopDownMapRenderer
+from habitat.utils.visualizations.utils import (
+    get_video_file_name,
+    observations_to_image,
+)
+from habitat_baselines.common.tensorboard_utils import TensorboardWriter
+from habitat_baselines.utils.common import get_episode_video_name
+
+# Keys of the step info used to compose the frame
+RENDERED_INFO_KEYS = ("collisions", "top_down_map")
+
+
+def is_rendered_sensor(sensor_name: str) -> bool:
+    r"""Whether the observation of a sensor is drawn by
+    :ref:`observations_to_image`.
+    """
+    return (
+        "rgb" in sensor_name
+        or "depth" in sensor_name
+        or sensor_name == "imagegoal"
+    )
+
+
+class _EpisodeVideo:
+    r"""Frames of an episode being rendered. Frames are streamed to a
+    temporary file when writing to disk and only kept in memory for
+    tensorboard, which takes the whole video at once.
+    """
+
+    def __init__(
+        self, video_option: List[str], video_dir: Optional[str], fps: int
+    ) -> None:
+        self.frames: Optional[List[np.ndarray]] = (
+            [] if "tensorboard" in video_option else None
+        )
+        self.tmp_path: Optional[str] = None
+        self.writer = None
+        if "disk" in video_option:
+            assert video_dir is not None
+            self.tmp_path = os.path.join(
+                video_dir, f".{uuid.uuid4().hex}.incomplete.mp4"
+            )
+            self.writer = imageio.get_writer(self.tmp_path, fps=fps, quality=5)
+
+    def append(self, frame: np.ndarray) -> None:
+        if self.writer is not None:
+            self.writer.append_data(frame)
+        if self.frames is not None:
+            self.frames.append(frame)
+
+    def discard(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            os.remove(self.tmp_path)
+
+
+class VideoRenderer:
+    r"""Composes the frames of evaluation episodes and writes their videos
+    in background threads, off the evaluation loop.
+
+    :ref:`add_frame` only copies the visual observations and the top-down
+    map of the step, composing the frame with :ref:`observations_to_image`
+    and encoding the video is done by the workers. All messages of an
+    episode go to the same worker, so its frames stay in order. The queue of
+    every worker is bounded and :ref:`add_frame` blocks when the workers
+    fall behind, instead of holding an unbounded number of frames.
+
+    Threads are used rather than processes as the tensorboard writer cannot
+    be sent to another process, the heavy parts of the work (resizing with
+    OpenCV and encoding with FFMPEG) release the GIL.
+    """
+
+    def __init__(
+        self,
+        video_option: List[str],
+        video_dir: Optional[str],
+        tb_writer: TensorboardWriter,
+        num_workers: int = 2,
+        max_queued_frames: int = 64,
+        fps: int = 10,
+    ) -> None:
+        r"""
+        Args:
+            video_option: string list of "tensorboard" or "disk" or both.
+            video_dir: path to target video directory.
+            tb_writer: tensorboard writer object for uploading video.
+            num_workers: number of rendering threads. Frames are rendered
+                inline by the caller if 0.
+            max_queued_frames: maximum number of messages waiting for each
+                worker.
+            fps: fps for generated video.
+        """
+        self._video_option = video_option
+        self._video_dir = video_dir
+        self._tb_writer = tb_writer
+        self._fps = fps
+        self._error: Optional[BaseException] = None
+        # Episodes rendered inline when there are no workers
+        self._episodes: Dict[Hashable, _EpisodeVideo] = {}
+        self._top_down_map_renderer = TopDownMapRenderer()
+
+        self._queues: List[queue.Queue] = [
+            queue.Queue(maxsize=max_queued_frames) for _ in range(num_workers)
+        ]
+        self._workers = [
+            threading.Thread(
+                target=self._worker_loop, args=(frame_queue,), daemon=True
+            )
+            for frame_queue in self._queues
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def add_frame(
+        self,
+        episode_key: Hashable,
+        observation: Dict[str, Union[torch.Tensor, np.ndarray]],
+        info: Dict[str, Any],
+    ) -> None:
+        r"""Adds the frame of a step to the video of an episode.
+
+        Args:
+            episode_key: unique key of the episode, e.g. its scene and
+                episode ids.
+            observation: observations of the step of the episode, only the
+                visual sensors are rendered.
+            info: info of the step of the episode.
+        """
+        # Observations and info can be reused by the caller once this
+        # returns, so the queued frame owns copies of them
+        observation = {
+            k: v.to(device="cpu", copy=True).numpy()
+            if torch.is_tensor(v)
+            else np.array(v, copy=True)
+            for k, v in observation.items()
+            if is_rendered_sensor(k)
+        }
+        info = copy.deepcopy(
+            {k: info[k] for k in RENDERED_INFO_KEYS if k in info}
+        )
+        self._put(episode_key, ("frame", episode_key, observation, info))
+
+    def finish_episode(
+        self,
+        episode_key: Hashable,
+        episode_id: Union[int, str],
+        checkpoint_idx: int,
+        metrics: Dict[str, float],
+    ) -> None:
+        r"""Writes the video of an episode. Episodes without frames are
+        skipped.
+
+        Args:
+            episode_key: key of the episode given to :ref:`add_frame`.
+            episode_id: episode id for video naming.
+            checkpoint_idx: checkpoint index for video naming.
+            metrics: metrics of the episode for video naming.
+        """
+        self._put(
+            episode_key,
+            ("finish", episode_key, episode_id, checkpoint_idx, metrics),
+        )
+
+    def close(self) -> None:
+        r"""Waits for all finished episodes to be written. Videos of
+        unfinished episodes are discarded.
+        """
+        self._stop_workers()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop_workers()
+        if exc_type is None:
+            self._raise_error()
+        elif self._error is not None:
+            # Logged rather than raised, not to hide the exception raised in
+            # the with block
+            logger.error(f"Rendering of a video failed: {self._error}")
+            self._error = None
+
+    def _stop_workers(self) -> None:
+        for frame_queue in self._queues:
+            frame_queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._queues = []
+        self._workers = []
+        for episode in self._episodes.values():
+            episode.discard()
+        self._episodes = {}
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Rendering of a video failed") from error
+
+    def _put(self, episode_key: Hashable, message: tuple) -> None:
+        self._raise_error()
+        if len(self._queues) == 0:
+            self._handle(self._episodes, self._top_down_map_renderer, message)
+        else:
+            self._queues[hash(episode_key) % len(self._queues)].put(message)
+
+    def _worker_loop(self, frame_queue: queue.Queue) -> None:
+        episodes: Dict[Hashable, _EpisodeVideo] = {}
+        # The buffers of a renderer cannot be shared between threads
+        top_down_map_renderer = TopDownMapRenderer()
+        while True:
+            message = frame_queue.get()
+            if message is None:
+                break
+            try:
+                self._handle(episodes, top_down_map_renderer, message)
+            except Exception as e:
+                logger.error(f"Rendering of a video failed: {e}")
+                self._error = e
+
+        for episode in episodes.values():
+            episode.discard()
+
+    def _handle(
+        self,
+        episodes: Dict[Hashable, _EpisodeVideo],
+        top_down_map_renderer: TopDownMapRenderer,
+        message: tuple,
+    ) -> None:
+        if message[0] == "frame":
+            _, episode_key, observation, info = message
+            if episode_key not in episodes:
+                episodes[episode_key] = _EpisodeVideo(
+                    self._video_option, self._video_dir, self._fps
+                )
+            episodes[episode_key].append(
+                observations_to_image(observation, info, top_down_map_renderer)
+            )
+            return
+
+        _, episode_key, episode_id, checkpoint_idx, metrics = message
+        episode = episodes.pop(episode_key, None)
+        if episode is None:
+            return
+
+        video_name = get_episode_video_name(
+            episode_id, checkpoint_idx, metrics
+        )
+        if episode.writer is not None:
+            episode.writer.close()
+            video_path = os.path.join(
+                self._video_dir, get_video_file_name(video_name)
+            )
+            os.makedirs(os.path.dirname(video_path), exist_ok=True)
+            os.replace(episode.tmp_path, video_path)
+            logger.info(f"Video created: {video_path}")
+        if episode.frames is not None:
+            self._tb_writer.add_video_from_np_images(
+                f"episode{episode_id}",
+                checkpoint_idx,
+                episode.frames,
+                fps=self._fps,
+            )
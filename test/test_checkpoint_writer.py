@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import collections
+import os
+import os.path as osp
+
+import pytest
+
+torch = pytest.importorskip("torch")
+habitat_baselines = pytest.importorskip("habitat_baselines")
+
+from habitat_baselines.utils.checkpoint_writer import (
+    AsyncCheckpointWriter,
+    snapshot_state,
+)
+
+
+def test_snapshot_state():
+    t = torch.ones(3, requires_grad=True)
+    state = dict(
+        t=t,
+        nested=dict(l=[t, 1], tup=(t, "a")),
+        window=collections.deque([t], maxlen=5),
+    )
+    snapshot = snapshot_state(state)
+
+    with torch.no_grad():
+        t.add_(1)
+
+    assert torch.equal(snapshot["t"], torch.ones(3))
+    assert not snapshot["t"].requires_grad
+    assert torch.equal(snapshot["nested"]["l"][0], torch.ones(3))
+    assert snapshot["nested"]["l"][1] == 1
+    assert isinstance(snapshot["nested"]["tup"], tuple)
+    assert snapshot["window"].maxlen == 5
+    assert torch.equal(snapshot["window"][0], torch.ones(3))
+
+
+def test_async_checkpoint_writer(tmpdir):
+    filename = osp.join(str(tmpdir), "ckpt.pth")
+    t = torch.zeros(10)
+    with AsyncCheckpointWriter() as writer:
+        for i in range(3):
+            t.fill_(i)
+            writer.save(dict(t=t, i=i), filename)
+            # The state was copied when the write started
+            t.fill_(-1)
+
+    ckpt = torch.load(filename)
+    assert ckpt["i"] == 2
+    assert torch.equal(ckpt["t"], torch.full((10,), 2.0))
+    # No temporary file is left behind
+    assert os.listdir(str(tmpdir)) == ["ckpt.pth"]
+
+    writer = AsyncCheckpointWriter()
+    writer.save(dict(t=t), osp.join(str(tmpdir), "missing", "ckpt.pth"))
+    with pytest.raises(RuntimeError):
+        writer.wait()
+    # The error is only raised once
+    writer.close()
+    assert os.listdir(str(tmpdir)) == ["ckpt.pth"]
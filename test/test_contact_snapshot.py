@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from types import SimpleNamespace
+
+import attr
+import numpy as np
+import pytest
+
+from habitat.tasks.rearrange.contact_snapshot import ContactSnapshot
+from habitat.tasks.rearrange.rearrange_task import RearrangeTask
+from habitat.tasks.rearrange.utils import (
+    CollisionDetails,
+    coll_name_matches,
+    get_match_link,
+    rearrange_collision,
+)
+
+ROBOT_ID = 1
+ROBOT_BASE_LINKS = [0, 1]
+
+
+@attr.s(auto_attribs=True)
+class _ContactPoint:
+    object_id_a: int
+    object_id_b: int
+    link_id_a: int
+    link_id_b: int
+    normal_force: float
+    contact_distance: float
+
+
+def _random_contact_points(rng, num_contacts):
+    return [
+        _ContactPoint(
+            *rng.randint(0, 6, size=2).tolist(),
+            *rng.randint(-1, 4, size=2).tolist(),
+            normal_force=float(rng.randn()),
+            contact_distance=float(rng.rand()),
+        )
+        for _ in range(num_contacts)
+    ]
+
+
+def test_contact_snapshot():
+    rng = np.random.RandomState(0)
+    for num_contacts in [0, 1, 50]:
+        contact_points = _random_contact_points(rng, num_contacts)
+        contacts = ContactSnapshot.from_contact_points(contact_points)
+        assert len(contacts) == num_contacts
+
+        involves = contacts.involves([1, 2])
+        assert involves.tolist() == [
+            c.object_id_a in [1, 2] or c.object_id_b in [1, 2]
+            for c in contact_points
+        ]
+
+        base_links = contacts.involves_links(1, [0, 1])
+        expected_base_links = []
+        for c in contact_points:
+            if c.object_id_a == 1:
+                expected_base_links.append(c.link_id_a in [0, 1])
+            else:
+                expected_base_links.append(
+                    c.object_id_b == 1 and c.link_id_b in [0, 1]
+                )
+        assert base_links.tolist() == expected_base_links
+
+        assert contacts.get_other_ids(1, ~involves).tolist() == []
+        assert contacts.get_other_ids(1).tolist() == [
+            c.object_id_b if c.object_id_a == 1 else c.object_id_a
+            for c in contact_points
+            if 1 in [c.object_id_a, c.object_id_b]
+        ]
+
+        object_forces = [
+            abs(c.normal_force)
+            for c in contact_points
+            if 1 in [c.object_id_a, c.object_id_b]
+            and c.object_id_a != c.object_id_b
+        ]
+        assert np.isclose(
+            contacts.get_object_max_force(1), max(object_forces, default=0)
+        )
+        assert contacts.get_object_max_force(None) == 0
+        assert np.isclose(
+            contacts.get_max_force(~involves),
+            max(
+                [
+                    abs(c.normal_force)
+                    for c, i in zip(contact_points, involves)
+                    if not i
+                ],
+                default=0,
+            ),
+        )
+
+
+def _list_rearrange_collision(
+    contact_points,
+    added_objs,
+    snapped_obj_id,
+    count_obj_colls,
+    ignore_names,
+    ignore_base,
+):
+    r"""rearrange_collision filtering the list of contact points, as before
+    the contact snapshot.
+    """
+
+    def should_keep(x):
+        if ignore_base:
+            match_link = get_match_link(x, ROBOT_ID)
+            if match_link is not None and match_link in ROBOT_BASE_LINKS:
+                return False
+
+        if ignore_names is not None:
+            if any(coll_name_matches(x, name) for name in ignore_names):
+                return False
+        return True
+
+    colls = list(filter(should_keep, contact_points))
+    robot_coll_ids = []
+    robot_obj_colls = 0
+    robot_scene_colls = 0
+    for match in [c for c in colls if coll_name_matches(c, ROBOT_ID)]:
+        if any(coll_name_matches(match, obj_id) for obj_id in added_objs):
+            robot_obj_colls += 1
+        else:
+            robot_scene_colls += 1
+
+        if match.object_id_a == ROBOT_ID:
+            robot_coll_ids.append(match.object_id_b)
+        else:
+            robot_coll_ids.append(match.object_id_a)
+
+    obj_scene_colls = 0
+    if count_obj_colls and snapped_obj_id is not None:
+        for match in [
+            c for c in colls if coll_name_matches(c, snapped_obj_id)
+        ]:
+            if not coll_name_matches(match, ROBOT_ID):
+                obj_scene_colls += 1
+
+    coll_details = CollisionDetails(
+        obj_scene_colls=min(obj_scene_colls, 1),
+        robot_obj_colls=min(robot_obj_colls, 1),
+        robot_scene_colls=min(robot_scene_colls, 1),
+        robot_coll_ids=robot_coll_ids,
+        all_colls=[(x.object_id_a, x.object_id_b) for x in colls],
+    )
+    return coll_details.total_collisions > 0, coll_details
+
+
+def _list_coll_forces(contact_points, snapped_obj_id, ignore_collisions):
+    r"""RearrangeTask.get_coll_forces on the list of contact points, as
+    before the contact snapshot.
+    """
+
+    def get_max_force(check_id):
+        forces = [
+            abs(x.normal_force)
+            for x in contact_points
+            if check_id in [x.object_id_a, x.object_id_b]
+            and x.object_id_a != x.object_id_b
+        ]
+        return max(forces, default=0)
+
+    forces = [
+        abs(x.normal_force)
+        for x in contact_points
+        if x.object_id_a not in ignore_collisions
+        and x.object_id_b not in ignore_collisions
+    ]
+    return (
+        get_max_force(ROBOT_ID),
+        get_max_force(snapped_obj_id),
+        max(forces, default=0),
+    )
+
+
+def _make_sim(contact_points, added_objs, snapped_obj_id):
+    return SimpleNamespace(
+        robot=SimpleNamespace(
+            get_robot_sim_id=lambda: ROBOT_ID,
+            is_base_link=lambda link: link in ROBOT_BASE_LINKS,
+            sim_obj=SimpleNamespace(object_id=ROBOT_ID),
+        ),
+        get_contact_snapshot=lambda: ContactSnapshot.from_contact_points(
+            contact_points
+        ),
+        scene_obj_ids=added_objs,
+        grasp_mgr=SimpleNamespace(snap_idx=snapped_obj_id),
+    )
+
+
+@pytest.mark.parametrize("ignore_base", [False, True])
+@pytest.mark.parametrize("ignore_names", [None, [], [3], [0, 4]])
+@pytest.mark.parametrize("count_obj_colls", [False, True])
+def test_rearrange_collision_matches_list_filtering(
+    ignore_base, ignore_names, count_obj_colls
+):
+    rng = np.random.RandomState(0)
+    added_objs = [2, 3]
+    for num_contacts in [0, 1, 5, 50]:
+        for snapped_obj_id in [None, 2, 5]:
+            contact_points = _random_contact_points(rng, num_contacts)
+            sim = _make_sim(contact_points, added_objs, snapped_obj_id)
+
+            did_collide, coll_details = rearrange_collision(
+                sim,
+                count_obj_colls,
+                ignore_names=ignore_names,
+                ignore_base=ignore_base,
+                get_extra_coll_data=True,
+            )
+            expected_did_collide, expected_details = _list_rearrange_collision(
+                contact_points,
+                added_objs,
+                snapped_obj_id,
+                count_obj_colls,
+                ignore_names,
+                ignore_base,
+            )
+            assert did_collide == expected_did_collide
+            assert coll_details == expected_details
+
+            ignore_collisions = ignore_names or []
+            task = SimpleNamespace(
+                _sim=sim, _ignore_collisions=ignore_collisions
+            )
+            assert np.allclose(
+                RearrangeTask.get_coll_forces(task),
+                _list_coll_forces(
+                    contact_points, snapped_obj_id, ignore_collisions
+                ),
+            )
@@ -180,6 +180,65 @@ def test_get_splits_func(num_episodes: int, num_splits: int):
     )
 
 
+@pytest.mark.parametrize(
+    "num_episodes,num_splits,allow_uneven_splits",
+    [(1000, 7, True), (1000, 7, False), (1024, 64, False)],
+)
+def test_get_split(num_episodes, num_splits, allow_uneven_splits):
+    dataset = _construct_dataset(num_episodes)
+    scene_key = lambda ep: ep.scene_id  # noqa: E731
+    splits = [
+        dataset.get_split(
+            num_splits,
+            split_index,
+            seed=1,
+            allow_uneven_splits=allow_uneven_splits,
+        )
+        for split_index in range(num_splits)
+    ]
+    expected_lengths = Dataset._get_split_lengths(
+        num_episodes, num_splits, allow_uneven_splits=allow_uneven_splits
+    )
+    assert [split.num_episodes for split in splits] == expected_lengths
+    episode_ids = [ep.episode_id for split in splits for ep in split.episodes]
+    assert len(set(episode_ids)) == len(episode_ids)
+    for split in splits:
+        # episodes are collated by scene
+        scene_ids = [
+            scene_id for scene_id, _ in groupby(split.episodes, key=scene_key)
+        ]
+        assert len(scene_ids) == len(set(scene_ids))
+
+    # a split only depends on the seed, split index and number of splits
+    for seed, is_same_split in [(1, True), (2, False)]:
+        split = dataset.get_split(
+            num_splits,
+            3,
+            seed=seed,
+            allow_uneven_splits=allow_uneven_splits,
+        )
+        assert (split.episodes == splits[3].episodes) == is_same_split
+
+    with pytest.raises(ValueError):
+        dataset.get_split(num_splits, num_splits, seed=1)
+
+
+def test_get_scene_split():
+    scenes = ["scene_id_" + str(ii) for ii in range(11)]
+    splits = [
+        Dataset.get_scene_split(scenes, 4, split_index, seed=1)
+        for split_index in range(4)
+    ]
+    assert sorted(sum(splits, [])) == sorted(scenes)
+    assert [len(split) for split in splits] == [3, 3, 3, 2]
+    assert splits[1] == Dataset.get_scene_split(
+        list(reversed(scenes)), 4, 1, seed=1
+    )
+
+    with pytest.raises(ValueError):
+        Dataset.get_scene_split(scenes, 12, 0, seed=1)
+
+
 def test_sample_episodes():
     dataset = _construct_dataset(1000)
     ep_iter = dataset.get_episode_iterator(
@@ -4,6 +4,8 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import time
+
 import numpy as np
 import pytest
 
@@ -24,7 +26,11 @@ from habitat_baselines.rl.ppo.policy import PointNavBaselinePolicy
 
 
 def _worker_fn(
-    world_rank: int, world_size: int, port: int, unused_params: bool
+    world_rank: int,
+    world_size: int,
+    port: int,
+    unused_params: bool,
+    freeze_unused_params: bool,
 ):
     device = (
         torch.device("cuda")
@@ -72,7 +78,6 @@ def _worker_fn(
         max_grad_norm=ppo_cfg.max_grad_norm,
         use_normalized_advantage=ppo_cfg.use_normalized_advantage,
     )
-    agent.init_distributed()
     rollouts = RolloutStorage(
         ppo_cfg.num_steps,
         2,
@@ -87,6 +92,13 @@ def _worker_fn(
     for k, v in rollouts.buffers["observations"].items():
         rollouts.buffers["observations"][k] = torch.randn_like(v)
 
+    if freeze_unused_params:
+        frozen = agent.freeze_unused_params(rollouts)
+        assert ("unused.weight" in frozen) == unused_params
+        agent.init_distributed(find_unused_params=False)
+    else:
+        agent.init_distributed()
+
     # Add two steps so batching works
     rollouts.advance_rollout()
     rollouts.advance_rollout()
@@ -115,12 +127,93 @@ def _worker_fn(
             for i in range(world_size):
                 assert torch.isclose(grads[i], grads[world_rank]).all()
 
+    if hasattr(agent._evaluate_actions_wrapper.ddp, "register_comm_hook"):
+        assert agent.pop_comm_time() > 0
+    assert agent.pop_comm_time() == 0
+
 
 @pytest.mark.parametrize("unused_params", [True, False])
-def test_ddppo_reduce(unused_params: bool):
+@pytest.mark.parametrize("freeze_unused_params", [True, False])
+def test_ddppo_reduce(unused_params: bool, freeze_unused_params: bool):
     world_size = 2
     torch.multiprocessing.spawn(
         _worker_fn,
-        args=(world_size, 8748 + int(unused_params), unused_params),
+        args=(
+            world_size,
+            8748 + int(unused_params) + 2 * int(freeze_unused_params),
+            unused_params,
+            freeze_unused_params,
+        ),
         nprocs=world_size,
     )
+
+
+def _mean_and_var_worker_fn(world_rank: int, world_size: int, port: int):
+    from habitat_baselines.rl.ddppo.algo.ddppo import (
+        distributed_mean_and_var,
+    )
+
+    tcp_store = distrib.TCPStore(  # type: ignore
+        "127.0.0.1", port, world_size, world_rank == 0
+    )
+    distrib.init_process_group(
+        "gloo", store=tcp_store, rank=world_rank, world_size=world_size
+    )
+
+    all_values = torch.randn(
+        world_size, 16, generator=torch.Generator().manual_seed(0)
+    )
+    # Offset the workers so that their means differ
+    all_values += torch.arange(world_size, dtype=torch.float32)[:, None]
+    mean, var = distributed_mean_and_var(all_values[world_rank])
+
+    assert torch.isclose(mean, all_values.mean())
+    assert torch.isclose(var, all_values.var(unbiased=False))
+
+
+def test_distributed_mean_and_var():
+    world_size = 2
+    torch.multiprocessing.spawn(
+        _mean_and_var_worker_fn,
+        args=(world_size, 8758),
+        nprocs=world_size,
+    )
+
+
+class _CountingStore:
+    def __init__(self):
+        self.values = {"num_done": "0"}
+        self.num_gets = 0
+
+    def get(self, key):
+        self.num_gets += 1
+        return self.values[key].encode()
+
+
+def test_rollouts_done_poller():
+    from habitat_baselines.rl.ddppo.ddp_utils import RolloutsDonePoller
+
+    store = _CountingStore()
+    poller = RolloutsDonePoller(store, "num_done", poll_interval=0.01)
+    time.sleep(0.05)
+    # nothing is polled until a rollout is activated
+    assert store.num_gets == 0 and poller.num_done == 0
+
+    store.values["num_done"] = "3"
+    poller.activate()
+    deadline = time.time() + 5.0
+    while poller.num_done != 3 and time.time() < deadline:
+        time.sleep(0.001)
+    assert poller.num_done == 3
+
+    time.sleep(0.1)
+    # the polling rate is bounded
+    assert store.num_gets <= 0.1 / 0.01 + 2
+
+    # the value of the previous rollout is never reported
+    poller.reset()
+    assert poller.num_done == 0
+    num_gets = store.num_gets
+    time.sleep(0.05)
+    assert poller.num_done == 0 and store.num_gets <= num_gets + 1
+    poller.close()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os.path as osp
+import pickle
+
+import numpy as np
+import pytest
+
+pytest.importorskip("habitat_baselines")
+
+from habitat_baselines.il.data.feature_store import (
+    EpisodeFeatureStore,
+    feature_store_exists,
+    get_file_key,
+    write_feature_store,
+)
+
+
+def test_feature_store_round_trip(tmpdir):
+    feature_store_path = osp.join(str(tmpdir), "features")
+    episode_features = {
+        episode_id: np.random.rand(num_frames, 8).astype(np.float32)
+        for episode_id, num_frames in [(3, 5), (0, 1), (7, 12)]
+    }
+    assert not feature_store_exists(feature_store_path)
+
+    write_feature_store(
+        feature_store_path,
+        iter(episode_features.items()),
+        num_frames=18,
+        key="ckpt_a",
+    )
+    assert feature_store_exists(feature_store_path)
+    assert feature_store_exists(feature_store_path, "ckpt_a")
+    assert not feature_store_exists(feature_store_path, "ckpt_b")
+
+    store = EpisodeFeatureStore(feature_store_path)
+    assert store.key == "ckpt_a"
+    assert len(store) == 3
+    assert 7 in store and 1 not in store
+    for episode_id, feats in episode_features.items():
+        assert np.array_equal(store[episode_id], feats)
+
+    # the memory map is not pickled, e.g. to DataLoader workers
+    unpickled_store = pickle.loads(pickle.dumps(store))
+    assert unpickled_store._features is None
+    assert np.array_equal(unpickled_store[3], episode_features[3])
+
+    # features computed with another checkpoint replace the store
+    write_feature_store(
+        feature_store_path,
+        iter([(0, np.ones((2, 4), dtype=np.float32))]),
+        num_frames=2,
+        key="ckpt_b",
+    )
+    assert feature_store_exists(feature_store_path, "ckpt_b")
+    store = EpisodeFeatureStore(feature_store_path)
+    assert len(store) == 1
+    assert np.array_equal(store[0], np.ones((2, 4)))
+
+
+def test_get_file_key(tmpdir):
+    paths = [osp.join(str(tmpdir), name) for name in ["a.ckpt", "b.ckpt"]]
+    for path, content in zip(paths, [b"weights", b"other weights"]):
+        with open(path, "wb") as f:
+            f.write(content)
+    assert get_file_key(paths[0]) == get_file_key(paths[0])
+    assert get_file_key(paths[0]) != get_file_key(paths[1])
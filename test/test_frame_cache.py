@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+import os
+import os.path as osp
+import tarfile
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+lmdb = pytest.importorskip("lmdb")
+pytest.importorskip("habitat_baselines")
+
+from habitat_baselines.il.data import frame_cache
+
+SCENES = ["data/scene_a.glb", "data/scene_b.glb", "data/scene_c.glb"]
+
+
+class _FakeSim:
+    r"""Renders constant frames, failing on the second frame of
+    :p:`fail_scene` to simulate an interrupted build.
+    """
+
+    def __init__(self, scene, fail_scene, rendered_scenes):
+        self.scene = scene
+        self.fail_scene = fail_scene
+        self.num_frames = 0
+        rendered_scenes.append(scene)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def semantic_annotations(self):
+        return SimpleNamespace(
+            objects=[
+                SimpleNamespace(
+                    id="obj_{}".format(i),
+                    category=SimpleNamespace(index=lambda i=i: i),
+                )
+                for i in range(2)
+            ]
+        )
+
+    def get_observations_at(self, position, rotation):
+        self.num_frames += 1
+        if self.scene == self.fail_scene and self.num_frames == 2:
+            raise RuntimeError("Interrupted")
+        value = SCENES.index(self.scene)
+        return {
+            "rgb": np.full((4, 4, 3), value, dtype=np.uint8),
+            "depth": np.full((4, 4, 1), value, dtype=np.float32),
+            "semantic": np.ones((4, 4), dtype=np.int64),
+        }
+
+
+@pytest.fixture
+def fake_sim(monkeypatch):
+    state = SimpleNamespace(fail_scene=None, rendered_scenes=[])
+    monkeypatch.setattr(
+        frame_cache,
+        "_make_scene_sim",
+        lambda sim_config, scene: _FakeSim(
+            scene, state.fail_scene, state.rendered_scenes
+        ),
+    )
+    return state
+
+
+def _poses(num_poses):
+    return [
+        ([float(i), 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]) for i in range(num_poses)
+    ]
+
+
+def test_lmdb_frame_cache_exists(tmpdir):
+    dataset_path = osp.join(str(tmpdir), "lmdb")
+    assert not frame_cache.lmdb_frame_cache_exists(dataset_path)
+    os.makedirs(dataset_path)
+    assert not frame_cache.lmdb_frame_cache_exists(dataset_path)
+
+    # caches of older versions have no progress file
+    with open(osp.join(dataset_path, "data.mdb"), "w"):
+        pass
+    assert frame_cache.lmdb_frame_cache_exists(dataset_path)
+
+    progress_path = osp.join(dataset_path, frame_cache.LMDB_PROGRESS_FILENAME)
+    for complete in [False, True]:
+        with open(progress_path, "w") as f:
+            json.dump({"scenes_done": [], "complete": complete}, f)
+        assert frame_cache.lmdb_frame_cache_exists(dataset_path) == complete
+
+
+def test_build_lmdb_frame_cache_resume(tmpdir, fake_sim):
+    dataset_path = osp.join(str(tmpdir), "lmdb")
+    scene_samples = {scene: _poses(3) for scene in SCENES}
+
+    # interrupted in the first scene, then in the second one
+    for fail_scene in SCENES[:2]:
+        fake_sim.fail_scene = fail_scene
+        with pytest.raises(RuntimeError):
+            frame_cache.build_lmdb_frame_cache(
+                None, scene_samples, dataset_path, num_workers=0
+            )
+        # the partial database must not pass for a complete legacy cache
+        assert not frame_cache.lmdb_frame_cache_exists(dataset_path)
+
+    fake_sim.fail_scene = None
+    fake_sim.rendered_scenes.clear()
+    frame_cache.build_lmdb_frame_cache(
+        None, scene_samples, dataset_path, num_workers=0
+    )
+    assert fake_sim.rendered_scenes == SCENES[1:]
+    assert frame_cache.lmdb_frame_cache_exists(dataset_path)
+
+    lmdb_env = lmdb.open(dataset_path, readonly=True)
+    with lmdb_env.begin() as txn:
+        assert txn.stat()["entries"] == 3 * 3 * len(SCENES)
+        for sample_idx in range(3 * len(SCENES)):
+            rgb = np.frombuffer(
+                txn.get("{0:0=6d}_rgb".format(sample_idx).encode()),
+                dtype=np.uint8,
+            )
+            assert (rgb == sample_idx // 3).all()
+    lmdb_env.close()
+
+
+def test_build_tar_frame_cache_resume(tmpdir, fake_sim):
+    frame_dataset_path = osp.join(str(tmpdir), "frames")
+    scene_episode_poses = {
+        scene: [("ep_{}_{}".format(i, j), _poses(2)) for j in range(2)]
+        for i, scene in enumerate(SCENES)
+    }
+
+    fake_sim.fail_scene = SCENES[1]
+    with pytest.raises(RuntimeError):
+        frame_cache.build_tar_frame_cache(
+            None, scene_episode_poses, frame_dataset_path, num_workers=0
+        )
+    # only the completed shard is in place, the interrupted one is not
+    assert sorted(os.listdir(frame_dataset_path)) == [
+        "scene_a.tar",
+        "scene_b.tar.incomplete",
+    ]
+    assert not frame_cache.tar_frame_cache_exists(frame_dataset_path)
+
+    fake_sim.fail_scene = None
+    fake_sim.rendered_scenes.clear()
+    urls = frame_cache.build_tar_frame_cache(
+        None, scene_episode_poses, frame_dataset_path, num_workers=0
+    )
+    assert fake_sim.rendered_scenes == SCENES[1:]
+    assert frame_cache.tar_frame_cache_exists(frame_dataset_path)
+    assert urls == [
+        osp.join(frame_dataset_path, "scene_{}.tar".format(name))
+        for name in "abc"
+    ]
+    assert not any(
+        filename.endswith(".incomplete")
+        for filename in os.listdir(frame_dataset_path)
+    )
+    for i, url in enumerate(urls):
+        with tarfile.open(url) as tar:
+            assert tar.getnames() == [
+                "ep_{}_{}.00{}.jpg".format(i, j, k)
+                for j in range(2)
+                for k in range(2)
+            ]
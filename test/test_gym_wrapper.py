@@ -15,7 +15,13 @@ import habitat_baselines.utils.env_utils
 import habitat_baselines.utils.gym_definitions
 from habitat_baselines.common.environments import get_env_class
 from habitat_baselines.config.default import get_config as baselines_get_config
-from habitat_baselines.utils.gym_adapter import HabGymWrapper
+from habitat_baselines.utils.gym_adapter import (
+    HabGymWrapper,
+    InfoFlattener,
+    ObservationFlattener,
+    flatten_dict,
+    smash_observation_space,
+)
 from habitat_baselines.utils.render_wrapper import HabRenderWrapper
 
 
@@ -110,3 +116,90 @@ def test_auto_gym_wrapper(test_cfg_path):
     hab_gym.reset()
     hab_gym.step(hab_gym.action_space.sample())
     hab_gym.close()
+
+
+@pytest.mark.parametrize(
+    "config_file", ["habitat_baselines/config/rearrange/rl_pick.yaml"]
+)
+def test_gym_vector_env(config_file):
+    """
+    Test the vectorized Gym environment returns stacked arrays and resets the
+    environments at the end of their episodes.
+    """
+    num_envs = 2
+    env = habitat_baselines.utils.gym_definitions.make_habitat_vector_env(
+        config_file,
+        num_envs,
+        override_options=["TASK_CONFIG.ENVIRONMENT.MAX_EPISODE_STEPS", 5],
+    )
+    assert isinstance(env, gym.vector.VectorEnv)
+    obs = env.reset()
+    assert isinstance(obs, np.ndarray)
+    assert obs.shape == env.observation_space.shape
+    assert obs.shape[0] == num_envs
+
+    num_dones = 0
+    for _ in range(5):
+        obs, rewards, dones, infos = env.step(env.action_space.sample())
+        assert obs.shape == env.observation_space.shape
+        assert rewards.shape == (num_envs,) and dones.shape == (num_envs,)
+        assert len(infos) == num_envs
+        for done, info in zip(dones, infos):
+            if done:
+                num_dones += 1
+                assert (
+                    info["terminal_observation"].shape
+                    == env.single_observation_space.shape
+                )
+
+    # Every episode lasts at most 5 steps
+    assert num_dones >= num_envs
+    env.close()
+
+
+def test_observation_flattener():
+    obs_space = spaces.Dict(
+        {
+            "a": spaces.Box(low=-1.0, high=1.0, shape=(3,)),
+            "b": spaces.Box(low=-1.0, high=1.0, shape=(2, 2)),
+            "c": spaces.Box(low=-1.0, high=1.0, shape=(1,)),
+        }
+    )
+    keys = ["b", "a"]
+    flattener = ObservationFlattener(obs_space, keys)
+    assert flattener.dim == smash_observation_space(obs_space, keys).shape[0]
+
+    batch_obs = [
+        {k: np.random.rand(*v.shape) for k, v in obs_space.spaces.items()}
+        for _ in range(3)
+    ]
+    expected = np.stack(
+        [
+            np.concatenate([obs[k].reshape(-1) for k in keys])
+            for obs in batch_obs
+        ]
+    ).astype(np.float32)
+
+    assert np.array_equal(flattener.flatten(batch_obs[0]), expected[0])
+    out = np.zeros((3, flattener.dim), dtype=np.float32)
+    assert flattener.flatten_batch(batch_obs, out) is out
+    assert np.array_equal(out, expected)
+
+
+def test_info_flattener():
+    info_flattener = InfoFlattener()
+    infos = [
+        {"a": 1, "b": {"c": 2.0, "d": {"e": True}}},
+        {"a": 3, "b": {"c": 4.0, "d": {"e": False}}},
+        # The keys change
+        {"a": 3, "b": {"c": 4.0, "f": 1}},
+        {"a": 3, "b": 5},
+        {"a": {"g": 1}, "b": 5},
+        {"a": 1},
+    ]
+    for info in infos:
+        flat_info = info_flattener(info)
+        assert flat_info == {
+            k: float(v) for k, v in flatten_dict(info).items()
+        }
+        assert all(type(v) is float for v in flat_info.values())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import multiprocessing
+
+import numpy as np
+
+from habitat.tasks.rearrange import utils
+from habitat.tasks.rearrange.utils import CacheHelper, KeyedCacheHelper
+
+
+def _write_start_states(cache, worker_idx, num_values):
+    for i in range(num_values):
+        cache.save(f"{worker_idx}_{i}", (np.full(3, i), float(i), worker_idx))
+
+
+def test_keyed_cache(tmpdir, monkeypatch):
+    monkeypatch.setattr(utils, "CACHE_PATH", str(tmpdir))
+    cache = KeyedCacheHelper("start_pos", "lookup", rel_dir="dataset")
+    assert cache.get("0_0") is None
+    assert cache.load() == {}
+
+    num_workers, num_values = 4, 25
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        ctx.Process(
+            target=_write_start_states, args=(cache, worker_idx, num_values)
+        )
+        for worker_idx in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    values = cache.load()
+    assert len(values) == num_workers * num_values
+    start_pos, start_rot, worker_idx = values["2_7"]
+    assert np.array_equal(start_pos, np.full(3, 7))
+    assert start_rot == 7.0 and worker_idx == 2
+
+    cache.update({"2_7": "overwritten", "new": 1})
+    assert cache.get("2_7") == "overwritten"
+    other_cache = KeyedCacheHelper("start_pos", "lookup", rel_dir="dataset")
+    assert len(other_cache.load()) == num_workers * num_values + 1
+    cache.close()
+    other_cache.close()
+
+
+def test_keyed_cache_import_cache(tmpdir, monkeypatch):
+    monkeypatch.setattr(utils, "CACHE_PATH", str(tmpdir))
+    cache = KeyedCacheHelper("start_pos", "lookup", rel_dir="dataset")
+    legacy_cache = CacheHelper("start_pos", "lookup", {}, rel_dir="dataset")
+    cache.import_cache(legacy_cache)
+    assert cache.load() == {}
+
+    legacy_cache.save({"0": "legacy", "1": "legacy"})
+    cache.save("1", "keyed")
+    cache.import_cache(legacy_cache)
+    assert cache.load() == {"0": "legacy", "1": "keyed"}
+
+    # the legacy cache is not loaded again, e.g. by the next task
+    def fail_load(*args, **kwargs):
+        raise AssertionError("The legacy cache was loaded again.")
+
+    monkeypatch.setattr(CacheHelper, "load", fail_load)
+    cache.update({"0": "keyed"})
+    other_cache = KeyedCacheHelper("start_pos", "lookup", rel_dir="dataset")
+    other_cache.import_cache(legacy_cache)
+    assert other_cache.load() == {"0": "keyed", "1": "keyed"}
+    cache.close()
+    other_cache.close()
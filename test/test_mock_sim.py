@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import numpy as np
+
+import habitat
+from habitat.config.default import get_config
+from habitat.sims import make_sim
+from habitat.sims.mock.mock_simulator import (
+    MockSimActions,
+    make_mock_dataset,
+)
+
+CFG_TEST = "configs/test/habitat_mock_sim_pointnav.yaml"
+
+
+def test_mock_sim():
+    config = get_config(CFG_TEST)
+    with make_sim(config.SIMULATOR.TYPE, config=config.SIMULATOR) as sim:
+        obs = sim.reset()
+        assert obs["rgb"].shape == (256, 256, 3)
+        assert obs["rgb"].dtype == np.uint8
+        assert obs["depth"].shape == (256, 256, 1)
+        assert 0.0 <= obs["depth"].min() <= obs["depth"].max() <= 1.0
+
+        sim.set_agent_state([0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0])
+        sim.step(MockSimActions.MOVE_FORWARD)
+        position = sim.get_agent_state().position
+        assert np.allclose(position, [0.0, 0.0, -0.25])
+        assert not sim.previous_step_collided
+        assert np.isclose(
+            sim.geodesic_distance(position, [[0.0, 0.0, 1.75], [3.0, 0, 0]]),
+            2.0,
+        )
+
+        # turn back and walk into the edge of the floor
+        for _ in range(18):
+            sim.step(MockSimActions.TURN_LEFT)
+        for _ in range(45):
+            obs = sim.step(MockSimActions.MOVE_FORWARD)
+        assert sim.previous_step_collided
+        assert np.allclose(sim.get_agent_state().position, [0.0, 0.0, 10.0])
+
+
+def test_mock_sim_env():
+    config = get_config(CFG_TEST)
+    dataset = make_mock_dataset(config, num_episodes=4)
+    assert len(dataset.episodes) == 4
+
+    with habitat.Env(config=config, dataset=dataset) as env:
+        for _ in range(3):
+            obs = env.reset()
+            assert np.allclose(
+                env.sim.get_agent_state().position,
+                env.current_episode.start_position,
+            )
+            assert np.isclose(
+                env.get_metrics()["distance_to_goal"],
+                env.current_episode.info["geodesic_distance"],
+                atol=1e-4,
+            )
+            while not env.episode_over:
+                obs = env.step(
+                    np.random.choice(
+                        [
+                            MockSimActions.MOVE_FORWARD,
+                            MockSimActions.TURN_LEFT,
+                            MockSimActions.TURN_RIGHT,
+                        ]
+                    )
+                )
+                assert obs["pointgoal_with_gps_compass"].shape == (2,)
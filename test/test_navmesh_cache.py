@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import os
+
+import attr
+import numpy as np
+
+from habitat.tasks.rearrange.navmesh_cache import NavMeshCache
+
+
+@attr.s(auto_attribs=True)
+class _NavMeshSettings:
+    agent_radius: float = 0.4
+    agent_height: float = 1.5
+
+
+class _PathFinder:
+    r"""Stands for the pathfinder, the NavMesh is a string."""
+
+    def __init__(self, navmesh=""):
+        self.navmesh = navmesh
+
+    def load_nav_mesh(self, path):
+        with open(path) as f:
+            self.navmesh = f.read()
+        return True
+
+    def save_nav_mesh(self, path):
+        with open(path, "w") as f:
+            f.write(self.navmesh)
+
+
+def test_navmesh_cache_key():
+    transformation = np.eye(4)
+    key = NavMeshCache.get_key(
+        "scene", [("table", transformation, None)], _NavMeshSettings()
+    )
+    assert key == NavMeshCache.get_key(
+        "scene",
+        [("table", transformation + 1e-7, None)],
+        _NavMeshSettings(),
+    )
+    assert key != NavMeshCache.get_key(
+        "other_scene", [("table", transformation, None)], _NavMeshSettings()
+    )
+    assert key != NavMeshCache.get_key(
+        "scene", [("table", transformation, [0.5])], _NavMeshSettings()
+    )
+    assert key != NavMeshCache.get_key(
+        "scene",
+        [("table", transformation, None)],
+        _NavMeshSettings(agent_radius=0.3),
+    )
+
+
+def test_navmesh_cache(tmpdir):
+    cache_dir = os.path.join(str(tmpdir), "navmeshes")
+    cache = NavMeshCache(max_size=2, cache_dir=cache_dir)
+    for key in ["a", "b", "c"]:
+        cache.save(key, _PathFinder(f"navmesh {key}"))
+
+    pathfinder = _PathFinder()
+    for key in ["c", "a"]:
+        assert cache.load(key, pathfinder)
+        assert pathfinder.navmesh == f"navmesh {key}"
+    assert not cache.load("d", pathfinder)
+
+    # another worker sharing the directory
+    other_cache = NavMeshCache(max_size=0, cache_dir=cache_dir)
+    assert other_cache.load("b", pathfinder)
+    assert pathfinder.navmesh == "navmesh b"
+    assert sorted(os.listdir(cache_dir)) == [
+        f"{key}.navmesh" for key in ["a", "b", "c"]
+    ]
+
+    memory_cache = NavMeshCache(max_size=1)
+    memory_cache.save("a", _PathFinder("navmesh a"))
+    memory_cache.save("b", _PathFinder("navmesh b"))
+    assert not memory_cache.load("a", pathfinder)
+    assert memory_cache.load("b", pathfinder)
+    for c in [cache, other_cache, memory_cache]:
+        c.close()
@@ -12,6 +12,7 @@ import numpy as np
 import pytest
 
 import habitat
+from habitat.config import Config
 from habitat.config.default import get_config
 from habitat.core.embodied_task import Episode
 from habitat.core.logging import logger
@@ -230,3 +231,75 @@ def test_pointnav_episode_generator():
         assert (
             dataset.to_json()
         ), "Generated episodes aren't json serializable."
+
+
+def test_pointnav_episode_generator_batched():
+    config = get_config(CFG_TEST)
+    config.defrost()
+    config.DATASET.SPLIT = "val"
+    config.ENVIRONMENT.MAX_EPISODE_STEPS = 500
+    config.freeze()
+    if not PointNavDatasetV1.check_config_paths_exist(config.DATASET):
+        pytest.skip("Test skipped as dataset files are missing.")
+    with habitat.Env(config) as env:
+        env.seed(config.SEED)
+        random.seed(config.SEED)
+        np.random.seed(config.SEED)
+        episodes = list(
+            pointnav_generator.generate_pointnav_episode_batched(
+                sim=env.sim,
+                num_episodes=NUM_EPISODES,
+                shortest_path_success_distance=config.TASK.SUCCESS.SUCCESS_DISTANCE,
+                shortest_path_max_steps=config.ENVIRONMENT.MAX_EPISODE_STEPS,
+                batch_size=32,
+            )
+        )
+        assert len(episodes) == NUM_EPISODES
+        for episode in episodes:
+            assert (
+                abs(episode.start_position[1] - episode.goals[0].position[1])
+                <= 0.5
+            )
+            assert (
+                1 <= episode.info["geodesic_distance"] <= 30
+            ), "Generated episode violates geodesic distance limits."
+
+        env.episode_iterator = iter(episodes)
+        for episode in episodes:
+            check_shortest_path(env, episode)
+
+
+class _FlatFloorSim:
+    r"""Stands in for the simulator on a flat 10x10 floor without
+    obstacles, with geodesic distances longer than the euclidean ones.
+    """
+
+    def __init__(self):
+        self.habitat_config = Config({"SCENE": "flat_floor"})
+
+    def sample_navigable_point(self):
+        return [np.random.uniform(0, 10), 0.0, np.random.uniform(0, 10)]
+
+    def island_radius(self, point):
+        return 5.0
+
+    def geodesic_distance(self, position_a, position_b):
+        return 1.2 * np.linalg.norm(
+            np.array(position_a) - np.array(position_b[0])
+        )
+
+
+def test_pointnav_episode_generator_batched_start_diversity():
+    np.random.seed(0)
+    episodes = list(
+        pointnav_generator.generate_pointnav_episode_batched(
+            sim=_FlatFloorSim(),
+            num_episodes=100,
+            is_gen_shortest_path=False,
+            batch_size=256,
+        )
+    )
+    assert len(episodes) == 100
+    # Sources must not be the first candidates of every target
+    start_positions = {tuple(episode.start_position) for episode in episodes}
+    assert len(start_positions) > 50
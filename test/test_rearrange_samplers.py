@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+mn = pytest.importorskip("magnum")
+pytest.importorskip("habitat_sim")
+
+from habitat.datasets.rearrange import samplers
+from habitat.datasets.rearrange.receptacle import (
+    ReceptacleSetMatcher,
+    match_receptacle_sets,
+)
+
+
+def test_transform_points():
+    transform = (
+        mn.Matrix4.translation(mn.Vector3(1.0, -2.0, 0.5))
+        @ mn.Matrix4.rotation(
+            mn.Rad(0.7), mn.Vector3(1.0, 2.0, 3.0).normalized()
+        )
+        @ mn.Matrix4.scaling(mn.Vector3(1.0, 2.0, 3.0))
+    )
+    points = np.random.uniform(-5, 5, size=(20, 3))
+    transformed_points = samplers.transform_points(transform, points)
+    assert transformed_points.shape == (20, 3)
+    for point, transformed_point in zip(points, transformed_points):
+        assert np.allclose(
+            transformed_point,
+            np.array(transform.transform_point(mn.Vector3(*point))),
+            atol=1e-5,
+        )
+
+
+class _FakeReceptacle:
+    def __init__(self, name, parent_object_handle=None):
+        self.name = name
+        self.parent_object_handle = parent_object_handle
+
+    def sample_uniform_local_batch(self, num_samples, sample_region_scale):
+        # the candidate index as the first coordinate
+        samples = np.zeros((num_samples, 3))
+        samples[:, 0] = np.arange(num_samples)
+        return samples
+
+
+def test_receptacle_set_matcher():
+    matcher = ReceptacleSetMatcher(
+        (["table", "shelf"], ["chair"], ["top", "drawer"], ["drawer_2"])
+    )
+    table_top = _FakeReceptacle("receptacle_top", "table_01:0000")
+    # the excluded object substrings are searched in the parent handle,
+    # rather than the characters of the parent handle
+    assert not matcher.excludes(table_top)
+    assert matcher.includes(table_top)
+
+    assert matcher.excludes(_FakeReceptacle("receptacle_top", "chair_01"))
+    assert matcher.excludes(_FakeReceptacle("drawer_2", "shelf_01"))
+    assert not matcher.includes(_FakeReceptacle("receptacle_top", "sofa"))
+    assert not matcher.includes(_FakeReceptacle("seat", "table_01"))
+
+    # stage receptacles are matched by name only
+    stage_top = _FakeReceptacle("stage_top")
+    assert not matcher.excludes(stage_top)
+    assert matcher.includes(stage_top)
+    assert not ReceptacleSetMatcher(([], [], [], [])).includes(stage_top)
+
+
+def test_match_receptacle_sets():
+    matchers = [
+        ReceptacleSetMatcher((["table"], [], ["top"], ["drawer"])),
+        ReceptacleSetMatcher((["shelf"], [], ["drawer", "floor"], [])),
+    ]
+    # decided by the first set including the receptacle
+    assert match_receptacle_sets(matchers, _FakeReceptacle("top", "table_01"))
+    assert not match_receptacle_sets(
+        matchers, _FakeReceptacle("shelf_top", "shelf_01")
+    )
+    # object receptacles fall through to the next set
+    assert match_receptacle_sets(
+        matchers, _FakeReceptacle("shelf_floor", "shelf_01")
+    )
+    # excluded by the first set
+    assert not match_receptacle_sets(
+        matchers, _FakeReceptacle("drawer", "shelf_01")
+    )
+    # stage receptacles are decided by the first set not excluding them
+    assert not match_receptacle_sets(matchers, _FakeReceptacle("floor"))
+    assert match_receptacle_sets(matchers[1:], _FakeReceptacle("floor"))
+    assert not match_receptacle_sets(matchers, _FakeReceptacle("drawer"))
+
+
+def test_batched_placement_acceptance_stats(monkeypatch):
+    sampler = samplers.ObjectSampler(
+        ["object"], [([], [], [], [])], batched_placement=True
+    )
+    sampler.max_placement_attempts = 10
+    sampler.prescreen_chunk_size = 3
+    sampler.receptacle_cull_min_attempts = 15
+    receptacle = _FakeReceptacle("table")
+    sampler.receptacle_candidates = [receptacle]
+
+    prescreen_mask = np.zeros(10, dtype=bool)
+    prescreen_mask[[1, 3, 4, 8]] = True
+    snap_results = []
+    num_rays = []
+    removed_objects = []
+    sim = SimpleNamespace(
+        get_rigid_object_manager=lambda: SimpleNamespace(
+            remove_object_by_handle=removed_objects.append
+        )
+    )
+
+    def prescreen_support_rays(sim, positions, support_object_ids):
+        num_rays.append(len(positions))
+        return prescreen_mask[positions[:, 0].astype(int)]
+
+    monkeypatch.setattr(
+        samplers, "prescreen_support_rays", prescreen_support_rays
+    )
+    monkeypatch.setattr(
+        samplers.sutils,
+        "snap_down",
+        lambda sim, obj, support_object_ids, vdb: snap_results.pop(0),
+    )
+    monkeypatch.setattr(
+        sampler,
+        "_get_receptacle_transform",
+        lambda sim, receptacle: mn.Matrix4.identity_init(),
+    )
+    monkeypatch.setattr(
+        sampler, "_get_support_object_ids", lambda sim, receptacle: [-1]
+    )
+    monkeypatch.setattr(
+        sampler,
+        "_add_new_object",
+        lambda sim, object_handle: SimpleNamespace(handle=object_handle),
+    )
+
+    # accepted at the second candidate passing the prescreen, the fourth one,
+    # rays are only cast for the chunks up to it
+    snap_results[:] = [False, True]
+    assert sampler.sample_placement(sim, "object", receptacle, snap_down=True)
+    assert sampler.receptacle_stats[(None, "table")] == {
+        "attempts": 4,
+        "tried": 2,
+        "accepted": 1,
+    }
+    assert snap_results == []
+    assert num_rays == [3, 3]
+
+    # all the candidates are tried and rejected
+    snap_results[:] = [False] * 4
+    assert (
+        sampler.sample_placement(sim, "object", receptacle, snap_down=True)
+        is None
+    )
+    assert removed_objects == ["object"]
+    assert sampler.receptacle_stats[(None, "table")] == {
+        "attempts": 14,
+        "tried": 6,
+        "accepted": 1,
+    }
+    assert num_rays == [3, 3] + [3, 3, 3, 1]
+    assert sampler.get_receptacle_acceptance_rates() == {
+        (None, "table"): 1 / 14
+    }
+    assert sampler.receptacle_candidates == [receptacle]
+
+    # culled once enough candidates were tried without enough acceptances
+    sampler.receptacle_cull_acceptance_rate = 0.1
+    snap_results[:] = [False] * 4
+    assert (
+        sampler.sample_placement(sim, "object", receptacle, snap_down=True)
+        is None
+    )
+    assert sampler.receptacle_candidates == []
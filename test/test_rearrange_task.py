@@ -8,7 +8,9 @@ import json
 import os.path as osp
 import time
 from glob import glob
+from types import SimpleNamespace
 
+import numpy as np
 import pytest
 
 import habitat
@@ -20,6 +22,11 @@ from habitat.config.default import get_config
 from habitat.core.embodied_task import Episode
 from habitat.core.logging import logger
 from habitat.datasets.rearrange.rearrange_dataset import RearrangeDatasetV0
+from habitat.tasks.rearrange.sub_tasks.pick_task import (
+    START_POS_DIST_THRESH,
+    RearrangePickTaskV1,
+)
+from habitat.tasks.utils import get_angle
 from habitat_baselines.common.environments import get_env_class
 from habitat_baselines.config.default import get_config as baselines_get_config
 
@@ -112,6 +119,62 @@ def test_rearrange_tasks(test_cfg_path):
             env.reset()
 
 
+def test_pick_sample_start_pos():
+    task = SimpleNamespace(_config=SimpleNamespace(BASE_NOISE=0.1))
+    np.random.seed(0)
+    for _ in range(10):
+        targ_pos = np.random.uniform(-5, 5, size=3)
+        orig_start_pos = targ_pos + np.random.normal(0, 0.5, size=3)
+        poses, angles, is_close = RearrangePickTaskV1._sample_start_pos(
+            task, targ_pos, orig_start_pos, 100
+        )
+        assert poses.shape == (100, 3)
+
+        # the per-sample computation of the angle and distance before
+        # batching
+        forward = np.array([1.0, 0, 0])
+        for start_pos, angle_to_obj, close in zip(poses, angles, is_close):
+            rel_targ = targ_pos - start_pos
+            expected_angle = get_angle(forward[[0, 2]], rel_targ[[0, 2]])
+            if np.cross(forward[[0, 2]], rel_targ[[0, 2]]) > 0:
+                expected_angle *= -1.0
+            assert np.isclose(angle_to_obj, expected_angle)
+
+            targ_dist = np.linalg.norm((start_pos - orig_start_pos)[[0, 2]])
+            assert close == (targ_dist <= START_POS_DIST_THRESH)
+
+
+def test_rearrange_navmesh_cache_ignores_robot():
+    config = get_config(CFG_TEST)
+    if not RearrangeDatasetV0.check_config_paths_exist(config.DATASET):
+        pytest.skip(
+            "Please download ReplicaCAD RearrangeDataset Dataset to data folder."
+        )
+
+    with habitat.Env(config=config) as env:
+        env.episodes = env.episodes[:1]
+        env.reset()
+        sim = env.sim
+        navmesh_key = sim._navmesh_key
+
+        recompute_navmesh = sim.recompute_navmesh
+        num_recomputes = 0
+
+        def counting_recompute_navmesh(*args, **kwargs):
+            nonlocal num_recomputes
+            num_recomputes += 1
+            return recompute_navmesh(*args, **kwargs)
+
+        sim.recompute_navmesh = counting_recompute_navmesh
+        for _ in range(2):
+            # same layout, other robot pose
+            sim.robot.base_pos = sim.pathfinder.get_random_navigable_point()
+            sim._navmesh_key = None
+            env.reset()
+            assert sim._navmesh_key == navmesh_key
+        assert num_recomputes == 0
+
+
 # NOTE: set 'debug_visualization' = True to produce videos showing receptacles and final simulation state
 @pytest.mark.parametrize("debug_visualization", [False])
 @pytest.mark.parametrize("num_episodes", [2])
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import numpy as np
+import torch
+
+from habitat_baselines.slambased.mappers import (
+    DirectDepthMapper,
+    pcl_to_obstacles,
+)
+from habitat_baselines.slambased.path_planners import (
+    DifferentiableStarPlanner,
+)
+from habitat_baselines.slambased.reprojection import (
+    get_map_size_in_cells,
+    project2d_pcl_into_worldmap,
+)
+from habitat_baselines.slambased.utils import generate_2dgrid
+
+
+def _unique_count_obstacles(pts3d, map_size, cell_size):
+    map_size_in_cells = get_map_size_in_cells(map_size, cell_size) - 1
+    obstacle_map = np.zeros((map_size_in_cells, map_size_in_cells))
+    pts2d = torch.cat([pts3d[:, 2:3], pts3d[:, 0:1]], dim=1)
+    data_idxs = torch.round(
+        project2d_pcl_into_worldmap(pts2d, map_size, cell_size)
+    )
+    u, counts = np.unique(
+        data_idxs.numpy().astype(np.int64), axis=0, return_counts=True
+    )
+    obstacle_map[u[:, 0], u[:, 1]] = counts
+    return obstacle_map
+
+
+def test_pcl_to_obstacles():
+    torch.manual_seed(0)
+    pts3d = torch.randn(5000, 3) * 3
+    obstacle_map = pcl_to_obstacles(pts3d, map_size=40, cell_size=0.2)
+    assert np.array_equal(
+        obstacle_map.numpy(),
+        _unique_count_obstacles(pts3d, map_size=40, cell_size=0.2),
+    )
+
+
+def test_direct_depth_mapper_update_map():
+    torch.manual_seed(0)
+    mapper = DirectDepthMapper(
+        h_min=-1.0, h_max=2.0, map_size=40, map_cell_size=0.1
+    )
+    global_map = torch.zeros(1, 1, 400, 400)
+    expected_map = torch.zeros(400, 400)
+    for _ in range(3):
+        depth = torch.rand(64, 64) * 3.0 + 0.2
+        pose = torch.eye(4)
+        pose[(0, 2), 3] = torch.rand(2) * 4.0 - 2.0
+        expected_map = torch.max(expected_map, mapper(depth, pose))
+        mapper.update_map(global_map, depth, pose)
+
+    assert expected_map.sum() > 0
+    assert torch.equal(global_map[0, 0], expected_map)
+
+
+def _one_hot_map(height, width, y, x):
+    one_hot_map = torch.zeros(1, 1, height, width)
+    one_hot_map[0, 0, y, x] = 1.0
+    return one_hot_map
+
+
+def test_planner_plan_batch():
+    height, width = 40, 40
+    obstacles = torch.zeros(1, 1, height, width)
+    obstacles[0, 0, 10:30, 20] = 1.0
+    coords = generate_2dgrid(height, width, False)
+    start_goal_pairs = [
+        ((20, 5), (20, 35)),
+        ((5, 5), (35, 30)),
+        ((12, 12), (14, 15)),
+    ]
+    start_maps = torch.cat(
+        [_one_hot_map(height, width, *start) for start, _ in start_goal_pairs]
+    )
+    goal_maps = torch.cat(
+        [_one_hot_map(height, width, *goal) for _, goal in start_goal_pairs]
+    )
+
+    planner = DifferentiableStarPlanner(preprocess=True)
+    single_costs = [
+        planner(
+            obstacles, coords, start_maps[i : i + 1], goal_maps[i : i + 1]
+        )[1]
+        for i in range(len(start_goal_pairs))
+    ]
+
+    batched_planner = DifferentiableStarPlanner(
+        preprocess=True, check_convergence_every=8
+    )
+    plans = batched_planner.plan_batch(
+        obstacles, coords, start_maps, goal_maps
+    )
+    assert len(plans) == len(start_goal_pairs)
+    for (path, cost), single_cost, (start, _) in zip(
+        plans, single_costs, start_goal_pairs
+    ):
+        assert torch.allclose(cost, single_cost)
+        assert torch.norm(path[-1] - torch.tensor(start).float()) < 0.3
+
+
+def test_planner_replan():
+    height, width = 60, 60
+    obstacles = torch.zeros(1, 1, height, width)
+    obstacles[0, 0, 10:50, 30] = 1.0
+    coords = generate_2dgrid(height, width, False)
+    goal_map = _one_hot_map(height, width, 30, 55)
+
+    planner = DifferentiableStarPlanner(preprocess=True)
+    incremental_planner = DifferentiableStarPlanner(
+        preprocess=True, check_convergence_every=4
+    )
+    for step in range(8):
+        if step == 3:
+            # new obstacle between the agent and the goal
+            obstacles[0, 0, 25:35, 20] = 1.0
+        if step == 6:
+            obstacles[0, 0, 25:35, 20] = 0.0
+        agent_map = _one_hot_map(height, width, 30, 5 + step)
+        _, cost = planner(obstacles, coords, goal_map, agent_map)
+        path, incremental_cost = incremental_planner.replan(
+            obstacles, coords, goal_map, agent_map
+        )
+        assert torch.allclose(cost, incremental_cost)
+        assert torch.norm(path[-1] - torch.tensor([30.0, 55.0])) < 0.3
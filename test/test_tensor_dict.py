@@ -88,3 +88,62 @@ def test_tensor_dict_map():
     tensor_dict.map_in_place(lambda x: x + 1)
 
     assert res == tensor_dict
+
+
+@pytest.mark.skipif(torch is None, reason="Test requires pytorch")
+def test_tensor_dict_flat_items():
+    tensor_dict = TensorDict.from_tree(
+        dict(a=torch.randn(2), b=dict(c=torch.randn(3)))
+    )
+    flat_items = tensor_dict.flat_items()
+    assert [keys for keys, _ in flat_items] == [("a",), ("b", "c")]
+    assert flat_items[1][1] is tensor_dict["b"]["c"]
+    assert tensor_dict.flat_items() is flat_items
+
+    # Changing the keys of a nested TensorDict invalidates the leaves
+    tensor_dict["b"]["d"] = torch.randn(4)
+    flat_items = tensor_dict.flat_items()
+    assert [keys for keys, _ in flat_items] == [("a",), ("b", "c"), ("b", "d")]
+
+    tensor_dict.map_in_place(lambda v: v + 1)
+    assert tensor_dict.flat_items()[0][1] is tensor_dict["a"]
+
+
+@pytest.mark.skipif(torch is None, reason="Test requires pytorch")
+def test_tensor_dict_view():
+    tensor_dict = TensorDict.from_tree(
+        dict(
+            a=torch.zeros(4, 3), b=dict(c=torch.zeros(4, 2, dtype=torch.long))
+        )
+    )
+    view = tensor_dict.view_at(slice(1, 3))
+
+    view.set(dict(a=torch.ones(2, 3), b=dict(c=np.full((2, 2), 2))))
+    expected = TensorDict.from_tree(
+        dict(
+            a=torch.zeros(4, 3), b=dict(c=torch.zeros(4, 2, dtype=torch.long))
+        )
+    )
+    expected.set(
+        slice(1, 3), dict(a=torch.ones(2, 3), b=dict(c=np.full((2, 2), 2)))
+    )
+    for (keys, v), (expected_keys, expected_v) in zip(
+        tensor_dict.flat_items(), expected.flat_items()
+    ):
+        assert keys == expected_keys
+        assert torch.equal(v, expected_v)
+
+    # Missing keys are not set, like with strict=False
+    view.set(dict(a=torch.full((2, 3), 3.0)))
+    assert (tensor_dict["a"][1:3] == 3).all()
+    assert (tensor_dict["b"]["c"][1:3] == 2).all()
+
+    res = view.get()
+    assert isinstance(res["b"], TensorDict)
+    assert (res["a"] == tensor_dict["a"][1:3]).all()
+    assert res["b"]["c"].shape == (2, 2)
+
+    # Replaced tensors are picked up
+    tensor_dict["a"] = torch.zeros(4, 3)
+    view.set(dict(a=torch.ones(2, 3)))
+    assert tensor_dict["a"].sum() == 6
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import numpy as np
+import pytest
+import torch
+
+from habitat.utils.visualizations.utils import observations_to_image
+from habitat_baselines.utils import video_renderer as video_renderer_module
+from habitat_baselines.utils.video_renderer import VideoRenderer
+
+
+class _VideoRecorder:
+    def __init__(self):
+        self.videos = {}
+
+    def add_video_from_np_images(self, video_name, step_idx, images, fps=10):
+        self.videos[video_name] = images
+
+
+@pytest.mark.parametrize("num_workers", [0, 3])
+def test_video_renderer(num_workers):
+    tb_writer = _VideoRecorder()
+    rng = np.random.RandomState(0)
+    expected_videos = {}
+    with VideoRenderer(
+        ["tensorboard"],
+        None,
+        tb_writer,
+        num_workers=num_workers,
+        max_queued_frames=2,
+    ) as video_renderer:
+        for episode_id in range(6):
+            frames = []
+            for _ in range(episode_id + 1):
+                observation = {
+                    "rgb": torch.from_numpy(
+                        rng.randint(0, 255, size=(8, 8, 3), dtype=np.uint8)
+                    ),
+                    "depth": torch.rand(8, 8, 1),
+                    "pointgoal": torch.rand(2),
+                }
+                info = {"collisions": {"is_collision": False}}
+                frames.append(observations_to_image(observation, info))
+                video_renderer.add_frame(episode_id, observation, info)
+                # the renderer must not depend on the caller's buffers
+                observation["rgb"].zero_()
+                info["collisions"]["is_collision"] = True
+
+            if episode_id < 5:
+                video_renderer.finish_episode(
+                    episode_id, episode_id, 0, {"spl": 1.0}
+                )
+                expected_videos[f"episode{episode_id}"] = frames
+
+    assert tb_writer.videos.keys() == expected_videos.keys()
+    for name, frames in expected_videos.items():
+        assert len(tb_writer.videos[name]) == len(frames)
+        for frame, expected_frame in zip(tb_writer.videos[name], frames):
+            assert np.array_equal(frame, expected_frame)
+
+
+def test_video_renderer_exit_keeps_error(monkeypatch):
+    def fail_render(observation, info, top_down_map_renderer=None):
+        raise ValueError("Render failed")
+
+    monkeypatch.setattr(
+        video_renderer_module, "observations_to_image", fail_render
+    )
+    observation = {"rgb": torch.zeros(8, 8, 3, dtype=torch.uint8)}
+
+    # the rendering error is raised when the block succeeds
+    with pytest.raises(RuntimeError, match="Rendering of a video failed"):
+        with VideoRenderer(
+            ["tensorboard"], None, _VideoRecorder(), num_workers=1
+        ) as video_renderer:
+            video_renderer.add_frame(0, observation, {})
+
+    # and does not hide the exception raised in the block
+    with pytest.raises(KeyError):
+        with VideoRenderer(
+            ["tensorboard"], None, _VideoRecorder(), num_workers=1
+        ) as video_renderer:
+            video_renderer.add_frame(0, observation, {})
+            raise KeyError("Evaluation failed")
@@ -5,7 +5,9 @@
 # LICENSE file in the root directory of this source tree.
 
 import numpy as np
+import pytest
 
+from habitat.utils.visualizations import fog_of_war, maps
 from habitat.utils.visualizations.utils import observations_to_image
 
 
@@ -33,6 +35,24 @@ def test_observations_to_image():
     ), "Resulted image resolution doesn't match."
 
 
+def test_observations_to_image_top_down_map_renderer():
+    renderer = maps.TopDownMapRenderer()
+    for i in range(3):
+        observations = {"rgb": np.random.rand(128, 128, 3)}
+        info = {
+            "top_down_map": {
+                "map": np.random.randint(0, 20, size=(300, 200)),
+                "fog_of_war_mask": np.random.randint(0, 2, size=(300, 200)),
+                "agent_map_coord": (10 * i, 20),
+                "agent_angle": np.random.random(),
+            },
+        }
+        assert np.array_equal(
+            observations_to_image(observations, info, renderer),
+            observations_to_image(observations, info),
+        )
+
+
 def test_different_dim_observations_to_image():
     observations = {
         "1_rgb": np.random.rand(512, 512, 3),
@@ -57,3 +77,129 @@ def test_different_dim_observations_to_image():
         1570,
         3,
     ), "Resulted image resolution doesn't match."
+
+
+def test_reveal_fog_of_war():
+    top_down_map = np.full((100, 100), maps.MAP_VALID_POINT, dtype=np.uint8)
+    top_down_map[60, 40:60] = maps.MAP_INVALID_POINT
+    fog_of_war_mask = np.zeros_like(top_down_map)
+
+    # looking along the first axis with a wall across the field of view
+    revealed_mask = fog_of_war.reveal_fog_of_war(
+        top_down_map,
+        fog_of_war_mask,
+        np.array([50, 50]),
+        0.0,
+        fov=90,
+        max_line_len=30,
+    )
+    assert fog_of_war_mask.sum() == 0, "The input mask must not change."
+    assert revealed_mask[50, 50] == 1
+    assert revealed_mask[50:60, 50].all()
+    assert revealed_mask[61:, 50].sum() == 0, "Cells behind walls are hidden."
+    assert revealed_mask[:49].sum() == 0, "Cells behind the agent are hidden."
+
+    # the same view reuses the precomputed rays of the heading
+    assert np.array_equal(
+        revealed_mask,
+        fog_of_war.reveal_fog_of_war(
+            top_down_map,
+            fog_of_war_mask,
+            np.array([50, 50]),
+            0.001,
+            fov=90,
+            max_line_len=30,
+        ),
+    )
+
+
+@pytest.mark.parametrize("wall", ["gap", "random"])
+def test_reveal_fog_of_war_matches_rays(wall):
+    rng = np.random.RandomState(0)
+    top_down_map = np.full((200, 200), maps.MAP_VALID_POINT, dtype=np.uint8)
+    if wall == "gap":
+        # light must only pass through the gap, not leak around the wall
+        top_down_map[110, :] = maps.MAP_INVALID_POINT
+        top_down_map[110, 100] = maps.MAP_VALID_POINT
+    else:
+        top_down_map[rng.rand(200, 200) < 0.05] = maps.MAP_INVALID_POINT
+    top_down_map[100, 100] = maps.MAP_VALID_POINT
+
+    fov, max_line_len = 90, 80
+    for current_angle in rng.uniform(0, 2 * np.pi, size=8):
+        revealed_mask = fog_of_war.reveal_fog_of_war(
+            top_down_map,
+            np.zeros_like(top_down_map),
+            np.array([100, 100]),
+            current_angle,
+            fov=fov,
+            max_line_len=max_line_len,
+        )
+
+        # the rays of the fan drawn one by one
+        num_rays = int(round(2 * np.pi * max_line_len))
+        first_ray, num_fan_rays = fog_of_war._get_fan_rays(
+            current_angle, np.deg2rad(fov), max_line_len
+        )
+        expected_mask = np.zeros_like(top_down_map)
+        fog_of_war._draw_loop(
+            top_down_map,
+            expected_mask,
+            np.array([100, 100]),
+            0.0,
+            max_line_len,
+            2
+            * np.pi
+            * np.arange(first_ray, first_ray + num_fan_rays)
+            / num_rays,
+        )
+        assert np.array_equal(revealed_mask, expected_mask)
+
+
+def test_colorize_topdown_map():
+    top_down_map = np.random.randint(0, 20, size=(4, 50, 60), dtype=np.uint8)
+    fog_of_war_mask = np.random.randint(0, 2, size=(4, 50, 60), dtype=np.uint8)
+
+    colored_map = maps.TOP_DOWN_MAP_COLORS[top_down_map]
+    desat_mask = (top_down_map != maps.MAP_INVALID_POINT) & (
+        fog_of_war_mask == 0
+    )
+    colored_map[desat_mask] = (colored_map[desat_mask] * 0.5).astype(np.uint8)
+
+    out = np.empty((4, 50, 60, 3), dtype=np.uint8)
+    assert np.array_equal(
+        maps.colorize_topdown_map(top_down_map, fog_of_war_mask, 0.5, out=out),
+        colored_map,
+    )
+    assert np.array_equal(out, colored_map)
+
+
+def test_topdown_map_renderer():
+    topdown_map_infos = [
+        {
+            "map": np.random.randint(0, 20, size=shape, dtype=np.uint8),
+            "fog_of_war_mask": np.random.randint(
+                0, 2, size=shape, dtype=np.uint8
+            )
+            if i != 2
+            else None,
+            "agent_map_coord": (10 * i, 20),
+            "agent_angle": np.deg2rad(30 * i),
+        }
+        for i, shape in enumerate(
+            [(300, 200), (300, 200), (300, 200), (80, 90)]
+        )
+    ]
+    renderer = maps.TopDownMapRenderer()
+    for _ in range(2):
+        rendered_maps = renderer.render(topdown_map_infos, output_height=128)
+        assert len(rendered_maps) == len(topdown_map_infos)
+        for rendered_map, topdown_map_info in zip(
+            rendered_maps, topdown_map_infos
+        ):
+            assert np.array_equal(
+                rendered_map,
+                maps.colorize_draw_agent_and_fit_to_height(
+                    topdown_map_info, 128
+                ),
+            )
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Facebook, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import io
+import json
+import os
+import os.path as osp
+import tarfile
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+wds = pytest.importorskip("webdataset")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("habitat_baselines")
+
+import webdataset.filters as filters
+
+from habitat_baselines.il.data.data import EQADataset
+from habitat_baselines.il.data.frame_cache import (
+    SHARD_MANIFEST_FILENAME,
+    get_frame_dataset_urls,
+)
+from habitat_baselines.il.trainers import vqa_trainer
+
+NUM_SCENES = 4
+EPISODES_PER_SCENE = 3
+NUM_FRAMES = 5
+
+
+def _write_frame_shards(frame_dataset_path):
+    r"""Writes one shard per scene, each frame is filled with the id of its
+    episode.
+    """
+    os.makedirs(frame_dataset_path)
+    shards = []
+    for scene_idx in range(NUM_SCENES):
+        shard = "scene_{}.tar".format(scene_idx)
+        with tarfile.open(osp.join(frame_dataset_path, shard), "w") as tar:
+            for episode_idx in range(EPISODES_PER_SCENE):
+                episode_id = scene_idx * EPISODES_PER_SCENE + episode_idx
+                for frame_idx in range(NUM_FRAMES):
+                    _, jpg = cv2.imencode(
+                        ".jpg", np.full((8, 8, 3), 10 * episode_id, np.uint8)
+                    )
+                    tar_info = tarfile.TarInfo(
+                        "{0:0=4d}.{1:0=3d}.jpg".format(episode_id, frame_idx)
+                    )
+                    tar_info.size = len(jpg.tobytes())
+                    tar.addfile(tar_info, io.BytesIO(jpg.tobytes()))
+        shards.append(shard)
+    with open(osp.join(frame_dataset_path, SHARD_MANIFEST_FILENAME), "w") as f:
+        json.dump({"shards": shards}, f)
+
+
+class _FrameShardDataset(wds.Dataset):
+    r"""Stands in for the VQA :ref:`EQADataset` on synthetic frame shards."""
+
+    group_by_keys_ = EQADataset.group_by_keys_
+
+    def __init__(self, frame_dataset_path):
+        num_episodes = NUM_SCENES * EPISODES_PER_SCENE
+        self.frame_dataset_path = frame_dataset_path
+        self.num_frames = NUM_FRAMES
+        self.episodes = [
+            SimpleNamespace(episode_id=episode_id)
+            for episode_id in range(num_episodes)
+        ]
+        self.questions = torch.arange(num_episodes).view(-1, 1)
+        self.answers = torch.arange(num_episodes)
+        self.q_vocab = self.ans_vocab = None
+        group_by_keys = filters.Curried(self.group_by_keys_)
+        super().__init__(
+            urls=get_frame_dataset_urls(frame_dataset_path),
+            initial_pipeline=[group_by_keys()],
+        )
+
+
+@pytest.mark.parametrize("cache_decoded_frames", [False, True])
+def test_vqa_loader_yields_every_episode_once(
+    tmpdir, monkeypatch, cache_decoded_frames
+):
+    frame_dataset_path = osp.join(str(tmpdir), "frames")
+    _write_frame_shards(frame_dataset_path)
+    monkeypatch.setattr(
+        vqa_trainer,
+        "EQADataset",
+        lambda config, input_type, num_frames: _FrameShardDataset(
+            frame_dataset_path
+        ),
+    )
+    trainer = SimpleNamespace(
+        config=SimpleNamespace(
+            IL=SimpleNamespace(
+                VQA=SimpleNamespace(
+                    num_frames=NUM_FRAMES,
+                    batch_size=2,
+                    num_workers=2,
+                    cache_decoded_frames=cache_decoded_frames,
+                )
+            )
+        ),
+        device=torch.device("cpu"),
+    )
+
+    _, loader = vqa_trainer.VQATrainer._make_vqa_dataset_and_loader(trainer)
+    episode_ids = []
+    for _ in range(2):
+        epoch_episode_ids = []
+        for episode_id, question, answer, frame_queue in loader:
+            assert frame_queue.dtype == torch.uint8
+            assert frame_queue.shape[1:] == (NUM_FRAMES, 3, 8, 8)
+            for i in range(len(episode_id)):
+                assert question[i, 0] == answer[i] == episode_id[i]
+                assert (
+                    frame_queue[i].float() - 10 * episode_id[i]
+                ).abs().max() <= 2
+            epoch_episode_ids.extend(episode_id.tolist())
+        episode_ids.append(sorted(epoch_episode_ids))
+
+    # every episode exactly once per epoch across the workers
+    assert episode_ids == [list(range(NUM_SCENES * EPISODES_PER_SCENE))] * 2
+    if cache_decoded_frames:
+        assert osp.exists(
+            "{}_decoded_{}.npy".format(frame_dataset_path, NUM_FRAMES)
+        )